@@ -0,0 +1,188 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import collections
+from multiprocessing import cpu_count
+
+# Python 2 needs the trollius and futures backports, as listed in
+# requirements-aio.txt
+
+try:
+    import asyncio
+except ImportError:
+    import trollius as asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor, \
+    ProcessPoolExecutor
+
+from catalog import GENERATORS, warmUp
+from threads import renderCall
+
+# whether this process has imported the generators and registered fonts
+
+_warm = False
+
+
+def _warmUp():
+    """
+    Runs catalog.warmUp once in this process.
+    """
+
+    global _warm
+    if not _warm:
+        warmUp()
+        _warm = True
+
+
+def _warmRender(name, params, directory):
+    """
+    Renders a call on an executor worker as threads.renderCall, warming the
+    worker up before its first render. The Python 2 backport of
+    ProcessPoolExecutor has no initializer to do it when a worker starts.
+    """
+
+    _warmUp()
+    return renderCall(name, params, directory)
+
+
+class AsyncRenderer(object):
+    """
+    Renders generator calls for an asyncio event loop. Each render runs on
+    an executor, so the loop keeps serving other requests meanwhile, and
+    returns a future of the PDF bytes.
+
+        renderer = AsyncRenderer('process', limit=4, loop=loop)
+        graph = renderer.render('cartesian', {'gridspace': 18})
+        todo = renderer.generator('itemizedTodo')(items=['Reading'])
+        (graph, todo) = loop.run_until_complete(asyncio.gather(graph,
+                                                todo))
+
+    At most limit calls render at once and maxqueue more wait for them;
+    calls beyond that raise asyncio.QueueFull at once rather than queue
+    without bound. Cancelling a waiting call drops it, and cancelling a
+    running one drops its result; a render already on a worker keeps its
+    slot until the worker is done, so the bound holds.
+
+    Use a process executor to keep the latency of the loop flat while
+    large sheets render, as threads share the interpreter lock with it.
+
+    Keyword arguments:
+    executor -- 'process', 'thread' or a concurrent.futures Executor
+    workers -- workers of a new executor; the number of CPUs if None
+    limit -- number of concurrent renders; the number of workers if None
+    maxqueue -- number of calls waiting for a render slot
+    directory -- location of the PDF cache, no cache if None
+    loop -- event loop of the calls; the current loop if None
+    """
+
+    def __init__(self, executor='process', workers=None, limit=None,
+                 maxqueue=64, directory=None, loop=None):
+        workers = workers or cpu_count()
+        self.owned = not isinstance(executor, Executor)
+        if executor == 'process':
+            executor = ProcessPoolExecutor(workers)
+        elif executor == 'thread':
+            _warmUp()
+            executor = ThreadPoolExecutor(workers)
+        elif self.owned:
+            raise ValueError("Unknown executor '" + str(executor) + "'.")
+        self.executor = executor
+        self.limit = limit or workers
+        self.maxqueue = maxqueue
+        self.directory = directory
+        self.loop = loop
+        self.running = 0
+        self.waiting = collections.deque()
+
+    def render(self, name, params):
+        """
+        Starts a generator call and returns a future of its PDF bytes, or
+        of the error of the render. Raises asyncio.QueueFull if limit calls
+        are rendering and maxqueue more are waiting.
+
+        Keyword arguments:
+        name -- name of the generator, a key of catalog.GENERATORS
+        params -- dict of keyword arguments for the generator
+        """
+
+        if name not in GENERATORS:
+            raise ValueError("Unknown generator '" + str(name) + "'.")
+
+        loop = self.loop or asyncio.get_event_loop()
+        if self.running >= self.limit and len(self.waiting) \
+                >= self.maxqueue:
+            raise asyncio.QueueFull('Render queue is full.')
+
+        result = asyncio.Future(loop=loop)
+        entry = (loop, result, name, params)
+        self.waiting.append(entry)
+
+        def _dropped(result):
+            if result.cancelled() and entry in self.waiting:
+                self.waiting.remove(entry)
+
+        result.add_done_callback(_dropped)
+        self._next()
+        return result
+
+    def generator(self, name):
+        """
+        Returns the asynchronous version of a generator: a function of its
+        keyword arguments returning a future of the PDF bytes.
+
+        Keyword arguments:
+        name -- name of the generator, a key of catalog.GENERATORS
+        """
+
+        if name not in GENERATORS:
+            raise ValueError("Unknown generator '" + str(name) + "'.")
+
+        def _generator(**params):
+            return self.render(name, params)
+
+        _generator.__name__ = name
+        return _generator
+
+    def _next(self):
+        """
+        Starts waiting calls while there are free render slots.
+        """
+
+        while self.waiting and self.running < self.limit:
+            (loop, result, name, params) = self.waiting.popleft()
+            if not result.done():
+                self._start(loop, result, name, params)
+
+    def _start(self, loop, result, name, params):
+        self.running += 1
+        job = loop.run_in_executor(self.executor, _warmRender, name,
+                                   params, self.directory)
+
+        def _finished(job):
+            self.running -= 1
+            self._next()
+            if job.cancelled():
+                result.cancel()
+            elif result.done():
+                job.exception()  # retrieved, so it is not logged
+            elif job.exception() is not None:
+                result.set_exception(job.exception())
+            else:
+                result.set_result(job.result())
+
+        def _cancelled(result):
+            if result.cancelled():
+                job.cancel()  # only stops a job still queued on a worker
+
+        job.add_done_callback(_finished)
+        result.add_done_callback(_cancelled)
+
+    def close(self, wait=True):
+        """
+        Shuts down the executor if this renderer created it.
+
+        Keyword arguments:
+        wait -- wait for running renders to finish
+        """
+
+        if self.owned:
+            self.executor.shutdown(wait)
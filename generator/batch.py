@@ -0,0 +1,173 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import sys
+import time
+import traceback
+from multiprocessing import Pool, cpu_count
+from os import path
+
+from catalog import getGenerator
+
+
+def readManifest(manifest, outdir='.'):
+    """
+    Returns the jobs of a JSON-lines manifest as a list of dicts with keys
+    'line', 'generator', 'output', 'kwargs' and 'error'. Blank lines and
+    lines starting with '#' are skipped. A line that is not a valid job
+    gives a job whose 'error' is set, which is reported rather than
+    rendered, so one bad line does not abort the batch.
+
+    Each line is an object such as
+        {"generator": "cartesian", "output": "grid.pdf",
+         "kwargs": {"gridspace": 18}}
+    where 'output' is optional and relative to outdir.
+
+    Keyword arguments:
+    manifest -- readable text stream of the manifest
+    outdir -- directory of the PDF documents
+    """
+
+    jobs = list()
+    for (n, line) in enumerate(manifest, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        try:
+            jobs.append(_parseJob(n, line, outdir))
+        except Exception:
+            jobs.append({
+                'line': n,
+                'generator': None,
+                'output': None,
+                'kwargs': dict(),
+                'error': _lastError(),
+                })
+
+    return jobs
+
+
+def _parseJob(n, line, outdir):
+    """
+    Returns the job of manifest line n, or raises ValueError, KeyError or
+    TypeError if the line is not a valid job.
+    """
+
+    entry = json.loads(line)
+    if not isinstance(entry, dict):
+        raise TypeError('A job should be a JSON object.')
+    name = entry['generator']
+    kwargs = entry.get('kwargs', dict())
+    if not isinstance(kwargs, dict):
+        raise TypeError("The 'kwargs' of a job should be a JSON object.")
+    output = entry.get('output') or '%05d-%s.pdf' % (n, name)
+
+    return {
+        'line': n,
+        'generator': name,
+        'output': path.join(outdir, output),
+        'kwargs': kwargs,
+        'error': None,
+        }
+
+
+def _lastError():
+    """
+    Returns the last line of the traceback being handled, such as
+    "KeyError: 'generator'".
+    """
+
+    return traceback.format_exc().strip().splitlines()[-1]
+
+
+def renderJob(job):
+    """
+    Renders a single job and returns its report as a dict with keys
+    'line', 'output', 'bytes', 'seconds' and 'error'. A job that failed
+    to parse is reported with its error and not rendered.
+
+    Keyword arguments:
+    job -- a job as returned by readManifest()
+    """
+
+    report = {
+        'line': job['line'],
+        'output': job['output'],
+        'bytes': 0,
+        'seconds': 0,
+        'error': job.get('error'),
+        }
+    if report['error'] is not None:
+        return report
+
+    start = time.time()
+    try:
+        getGenerator(job['generator'])(job['output'], **job['kwargs'])
+        report['bytes'] = path.getsize(job['output'])
+    except Exception:
+        report['error'] = _lastError()
+    report['seconds'] = round(time.time() - start, 4)
+
+    return report
+
+
+def runBatch(jobs, report, processes=None):
+    """
+    Renders all jobs on a process pool and writes one JSON report line per
+    job, in order of completion. Returns the number of failed jobs.
+
+    Keyword arguments:
+    jobs -- list of jobs as returned by readManifest()
+    report -- writable text stream of the report
+    processes -- size of the pool; the number of CPUs if None
+    """
+
+    processes = processes or cpu_count()
+    chunksize = max(1, len(jobs) // (processes * 8))
+
+    failed = 0
+    pool = Pool(processes)
+    try:
+        for result in pool.imap_unordered(renderJob, jobs, chunksize):
+            failed += result['error'] is not None
+            report.write(json.dumps(result, sort_keys=True) + '\n')
+            report.flush()
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+    return failed
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(
+        description='Render the PDF documents of a JSON-lines manifest.')
+    parser.add_argument('manifest', help="manifest file, '-' for stdin")
+    parser.add_argument('-o', '--outdir', default='.',
+                        help='directory of the PDF documents')
+    parser.add_argument('-r', '--report', default='-',
+                        help="report file, '-' for stdout")
+    parser.add_argument('-j', '--processes', type=int, default=None,
+                        help='number of worker processes')
+    args = parser.parse_args()
+
+    if args.manifest == '-':
+        jobs = readManifest(sys.stdin, args.outdir)
+    else:
+        with open(args.manifest) as manifest:
+            jobs = readManifest(manifest, args.outdir)
+
+    if args.report == '-':
+        failed = runBatch(jobs, sys.stdout, args.processes)
+    else:
+        with open(args.report, 'w') as report:
+            failed = runBatch(jobs, report, args.processes)
+
+    sys.exit(1 if failed else 0)
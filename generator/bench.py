@@ -0,0 +1,283 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import re
+import resource
+import sys
+import time
+import zlib
+from multiprocessing import Pool
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2, fall back to the peak resident set size
+    tracemalloc = None
+
+from catalog import getGenerator
+
+TABLOID = (792.0, 1224.0)
+TOPICS = ['Topic %d' % n for n in range(1, 21)]
+
+# benchmark cases as (generator, kwargs), each moving one parameter or a
+# few together to an extreme
+
+CASES = [
+    ('cartesian', {}),
+    ('cartesian', {'gridspace': 5}),
+    ('cartesian', {'gridspace': 72}),
+    ('cartesian', {'layout': (4, 6)}),
+    ('cartesian', {'checkered': 1}),
+    ('cartesian', {'rainbow': 1, 'seed': 1}),
+    ('cartesian', {'rainbow': 1, 'gridspace': 5, 'seed': 1}),
+    ('cartesian', {'pagesize': TABLOID}),
+    ('cartesian', {'direct': 1, 'gridspace': 5}),
+    ('cartesian', {'tiled': 1, 'gridspace': 5}),
+    ('cartesian', {'pages': 100}),
+    ('dual', {}),
+    ('dual', {'gridspace': 5, 'linefreq': 4}),
+    ('dual', {'layout': (4, 6)}),
+    ('dual', {'rainbow': 1, 'seed': 1}),
+    ('dual', {'pagesize': TABLOID}),
+    ('dotted', {}),
+    ('dotted', {'gridspace': 5}),
+    ('dotted', {'gridspace': 5, 'fastdots': 1}),
+    ('dotted', {'layout': (4, 6)}),
+    ('dotted', {'rainbow': 1, 'seed': 1}),
+    ('dotted', {'pagesize': TABLOID}),
+    ('lined', {}),
+    ('lined', {'linespace': 8}),
+    ('lined', {'layout': (4, 6)}),
+    ('lined', {'rainbow': 1, 'linespace': 8, 'seed': 1}),
+    ('lined', {'pagesize': TABLOID}),
+    ('itemizedTodo', {'items': TOPICS[:1]}),
+    ('itemizedTodo', {'items': TOPICS[:6]}),
+    ('itemizedTodo', {'items': TOPICS[:20]}),
+    ('itemizedTodo', {'items': TOPICS[:6], 'halfpage': 1}),
+    ('itemizedTodo', {'items': TOPICS[:6], 'booklet': 1}),
+    ('itemizedTodo', {'items': TOPICS[:6], 'pages': 52}),
+    ('timeSchedule', {}),
+    ('timeSchedule', {'timerange': (0, 23), 'halfpage': 1, 'booklet': 1}),
+    ('timeSchedule', {'weeks': 16}),
+    ('monthCalendar', {'year': 2019, 'month': 1}),
+    ('monthCalendar', {'year': 2019, 'month': 1, 'months': 12}),
+    ('yearOverview', {'year': 2019}),
+    ('yearOverview', {'year': 2019, 'years': 10}),
+    ('cascadingYear', {'year': 2019}),
+    ('cascadingYear', {'year': 2019, 'years': 10}),
+    ]
+
+# relative increase of each metric that counts as a regression
+
+TOLERANCES = {
+    'seconds': 0.20,
+    'memory_kb': 0.20,
+    'bytes': 0.01,
+    'operators': 0.0,
+    }
+
+# timing differences below this are noise, however large relatively
+
+MIN_SECONDS = 0.005
+
+
+def caseName(name, kwargs):
+    """
+    Returns a short, stable name of a benchmark case.
+
+    Keyword arguments:
+    name -- name of the generator
+    kwargs -- keyword arguments of the case
+    """
+
+    def _short(value):
+        if isinstance(value, (list, tuple)):
+            if all(isinstance(item, (int, float)) for item in value):
+                return 'x'.join('%g' % item for item in value)
+            return '%d' % len(value)
+        return '%g' % value
+
+    args = ','.join('%s=%s' % (arg, _short(kwargs[arg])) for arg in
+                    sorted(kwargs))
+    return name + '[' + args + ']'
+
+
+def countOperators(data):
+    """
+    Returns the number of operators in the content streams of a PDF
+    document: pages, forms and patterns, but not fonts or images.
+
+    Keyword arguments:
+    data -- bytes of the PDF document
+    """
+
+    from reportlab.lib.rl_accel import asciiBase85Decode
+
+    count = 0
+    for match in re.finditer(br'\sobj\s*<<((?:(?!endobj).)*?)>>\s*stream'
+                             br'\r?\n(.*?)endstream', data, re.S):
+        (info, stream) = match.groups()
+        if b'/Length1' in info or b'/Subtype /Image' in info:
+            continue
+        if b'/ASCII85Decode' in info:
+            stream = asciiBase85Decode(stream.strip().decode('latin-1'))
+            if not isinstance(stream, bytes):
+                stream = stream.encode('latin-1')
+        if b'/FlateDecode' in info:
+            stream = zlib.decompress(stream)
+
+        stream = re.sub(br'\((?:\\.|[^\\)])*\)', b' ', stream)
+        count += len(re.findall(br'(?<![\w/.\-])[A-Za-z\'"][\w*\'"]*',
+                     stream))
+
+    return count
+
+
+def runCase(case):
+    """
+    Renders a case and returns its result as a dict with keys 'case',
+    'seconds' (best of the repeats), 'memory_kb', 'memory_kind', 'bytes'
+    and 'operators'. Runs in a fresh worker process for each case.
+    """
+
+    (name, kwargs, repeat) = case
+    generator = getGenerator(name)
+    data = generator(None, **kwargs)  # warm up imports and fonts
+
+    best = None
+    for n in range(repeat):
+        start = time.time()
+        generator(None, **kwargs)
+        elapsed = time.time() - start
+        best = (elapsed if best is None else min(best, elapsed))
+
+    if tracemalloc is not None:
+        tracemalloc.start()
+        generator(None, **kwargs)
+        memory = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+        kind = 'tracemalloc'
+    else:
+        memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        kind = 'maxrss'
+
+    return {
+        'case': caseName(name, kwargs),
+        'seconds': round(best, 5),
+        'memory_kb': memory,
+        'memory_kind': kind,
+        'bytes': len(data),
+        'operators': countOperators(data),
+        }
+
+
+def runBenchmarks(pattern=None, repeat=3):
+    """
+    Runs the benchmark cases and returns their results by case name.
+
+    Keyword arguments:
+    pattern -- regular expression selecting cases by name; all if None
+    repeat -- number of timed renders per case
+    """
+
+    cases = [(name, kwargs, repeat) for (name, kwargs) in CASES
+             if pattern is None or re.search(pattern, caseName(name,
+             kwargs))]
+
+    results = dict()
+    pool = Pool(1, maxtasksperchild=1)
+    try:
+        for result in pool.imap(runCase, cases):
+            results[result['case']] = result
+            sys.stderr.write('%-50s %9.4f s %8d kB %9d B %9d ops\n'
+                             % (result['case'], result['seconds'],
+                             result['memory_kb'], result['bytes'],
+                             result['operators']))
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+    return results
+
+
+def compareResults(baseline, current, scale=1.0):
+    """
+    Returns the regressions of current results against a baseline as a
+    list of (case, metric, before, after) tuples.
+
+    Keyword arguments:
+    baseline -- results by case name, as returned by runBenchmarks()
+    current -- results by case name, as returned by runBenchmarks()
+    scale -- factor on all tolerances
+    """
+
+    regressions = list()
+    for case in sorted(current):
+        if case not in baseline:
+            continue
+        (before, after) = (baseline[case], current[case])
+        for (metric, tolerance) in sorted(TOLERANCES.items()):
+            if metric == 'memory_kb' and before['memory_kind'] \
+                != after['memory_kind']:
+                continue
+            if metric == 'seconds' and after[metric] - before[metric] \
+                < MIN_SECONDS:
+                continue
+            if after[metric] > before[metric] * (1 + tolerance * scale):
+                regressions.append((case, metric, before[metric],
+                                   after[metric]))
+
+    return regressions
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(
+        description='Benchmark the generators and compare to a baseline.')
+    commands = parser.add_subparsers(dest='command')
+
+    run = commands.add_parser('run', help='run the benchmark cases')
+    run.add_argument('-o', '--output', default='bench.json',
+                     help='results file, a baseline for later runs')
+    run.add_argument('-k', '--pattern', default=None,
+                     help='regular expression selecting cases by name')
+    run.add_argument('-r', '--repeat', type=int, default=3,
+                     help='timed renders per case')
+    run.add_argument('-b', '--baseline', default=None,
+                     help='baseline results to compare against')
+
+    compare = commands.add_parser('compare', help='compare two results')
+    compare.add_argument('baseline', help='baseline results file')
+    compare.add_argument('current', help='current results file')
+
+    for command in (run, compare):
+        command.add_argument('-t', '--tolerance', type=float, default=1.0,
+                             help='factor on the regression tolerances')
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        current = runBenchmarks(args.pattern, args.repeat)
+        with open(args.output, 'w') as output:
+            json.dump(current, output, indent=1, sort_keys=True)
+        if args.baseline is None:
+            sys.exit(0)
+        with open(args.baseline) as baseline:
+            baseline = json.load(baseline)
+    else:
+        with open(args.baseline) as baseline:
+            baseline = json.load(baseline)
+        with open(args.current) as current:
+            current = json.load(current)
+
+    regressions = compareResults(baseline, current, args.tolerance)
+    for (case, metric, before, after) in regressions:
+        print('REGRESSION %-50s %-10s %12s -> %s' % (case, metric, before,
+              after))
+    print('%d cases compared, %d regressions' % (len(set(baseline)
+          & set(current)), len(regressions)))
+    sys.exit(1 if regressions else 0)
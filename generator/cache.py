@@ -0,0 +1,250 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from os import path
+
+from catalog import getGenerator, normalizeParams, resolveParams, \
+    codeVersion
+from support import _privateDirectory
+
+try:
+    import fcntl
+except ImportError:  # no cross-process locking on this platform
+    fcntl = None
+
+# rendered PDFs, in a directory private to the user
+
+DEFAULT_DIRECTORY = path.join(os.environ.get('XDG_CACHE_HOME')
+                              or path.expanduser(path.join('~', '.cache')),
+                              'give-a-sheet', 'pdf')
+DEFAULT_MAXBYTES = 256 * 1024 * 1024
+LOW_WATER = 0.9  # fraction of maxbytes left after an eviction
+
+# size of each cache directory as directory: bytes, scanned once by this
+# process and after each eviction, and counting its stores in between
+
+_sizes = dict()
+_sizesLock = threading.Lock()
+
+# renders in progress in this process as key: threading.Event
+
+_inflight = dict()
+_inflightLock = threading.Lock()
+
+
+def cacheKey(name, params):
+    """
+    Returns the content address of a generator call, a digest of the
+    generator name, the code version and the normalized arguments, with
+    the current year and month filled in. Returns None for a call that
+    renders a different document each time, a rainbow without a seed.
+
+    Keyword arguments:
+    name -- name of the generator, a key of catalog.GENERATORS
+    params -- dict of keyword arguments for the generator
+    """
+
+    normal = normalizeParams(name, resolveParams(name, params))
+    if normal.get('rainbow') and normal.get('seed') is None:
+        return None
+
+    normal = sorted(normal.items())
+    blob = json.dumps([name, codeVersion(), normal], sort_keys=True)
+    return hashlib.sha1(blob.encode('utf-8')).hexdigest()
+
+
+def cachedPDF(name, params, directory=None, maxbytes=DEFAULT_MAXBYTES):
+    """
+    Returns the PDF bytes of a generator call, rendering and storing them
+    only if no identical call is cached. Concurrent identical calls, from
+    threads or processes sharing the directory, wait for a single render.
+    Calls without a cache key are rendered every time, and so are all calls
+    if the directory is not private to this user, as anyone who may write
+    to it could plant the PDF of a predictable key.
+
+    Keyword arguments:
+    name -- name of the generator, a key of catalog.GENERATORS
+    params -- dict of keyword arguments for the generator
+    directory -- cache location; DEFAULT_DIRECTORY if None
+    maxbytes -- size bound of the cache, least recently used PDFs are evicted
+    """
+
+    directory = directory or DEFAULT_DIRECTORY
+    params = resolveParams(name, params)
+    key = cacheKey(name, params)
+    if key is None or not _privateDirectory(directory):
+        return getGenerator(name)(None, **normalizeParams(name, params))
+    fname = path.join(directory, key[:2], key + '.pdf')
+
+    data = _readEntry(fname)
+    if data is not None:
+        return data
+
+    # coalesce identical calls within this process
+
+    with _inflightLock:
+        event = _inflight.get(key)
+        owner = event is None
+        if owner:
+            event = _inflight[key] = threading.Event()
+
+    if not owner:
+        event.wait()
+        data = _readEntry(fname)
+        if data is not None:
+            return data
+        return cachedPDF(name, params, directory, maxbytes)
+
+    try:
+        (data, stored) = _renderEntry(name, params, fname)
+    finally:
+        with _inflightLock:
+            del _inflight[key]
+        event.set()
+
+    if stored:
+        _account(directory, len(data), maxbytes)
+    return data
+
+
+def _readEntry(fname):
+    """
+    Returns the bytes of a cached PDF and marks it as recently used, or
+    None if it is not cached.
+    """
+
+    try:
+        with open(fname, 'rb') as entry:
+            data = entry.read()
+        os.utime(fname, None)
+    except (IOError, OSError):
+        return None
+    return data
+
+
+def _renderEntry(name, params, fname):
+    """
+    Renders a generator call under a lock on its cache entry, so other
+    processes wait rather than render the same PDF, and stores the bytes.
+    Returns (data, stored), where stored is false if another process
+    rendered the entry meanwhile.
+    """
+
+    folder = path.dirname(fname)
+    if not path.isdir(folder):
+        try:
+            os.makedirs(folder, 0o700)
+        except OSError:
+            pass  # created concurrently
+
+    lock = _lockEntry(fname + '.lock')
+    try:
+        data = _readEntry(fname)
+        if data is not None:
+            return (data, False)  # rendered by another process meanwhile
+
+        kwargs = normalizeParams(name, params)
+        data = getGenerator(name)(None, **kwargs)
+
+        (handle, tmpname) = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        with os.fdopen(handle, 'wb') as entry:
+            entry.write(data)
+        os.rename(tmpname, fname)
+    finally:
+        lock.close()  # releases the flock
+
+    return (data, True)
+
+
+def _lockEntry(lockname):
+    """
+    Returns the open lock file of a cache entry, locked by this process.
+    An eviction may delete the file before it is locked, so it is opened
+    again until the locked file is the one the entry names.
+    """
+
+    while True:
+        lock = open(lockname, 'a')
+        if fcntl is None:
+            return lock
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            if os.stat(lockname).st_ino == os.fstat(lock.fileno()).st_ino:
+                return lock
+        except OSError:
+            pass  # deleted by an eviction
+        lock.close()
+
+
+def _account(directory, size, maxbytes):
+    """
+    Counts a stored PDF towards the size of the cache, and evicts the least
+    recently used PDFs once the cache exceeds maxbytes. The directory is
+    only walked on its first use and on eviction, not for every render.
+    """
+
+    with _sizesLock:
+        if directory in _sizes:
+            _sizes[directory] += size
+        else:
+            _sizes[directory] = _evict(directory, maxbytes)
+        if _sizes[directory] > maxbytes:
+            _sizes[directory] = _evict(directory, int(maxbytes * LOW_WATER))
+
+
+def _evict(directory, maxbytes):
+    """
+    Deletes the least recently used PDFs until the cache fits in maxbytes,
+    and returns the size of the cache.
+    """
+
+    entries = list()
+    total = 0
+    for (folder, dirs, files) in os.walk(directory):
+        for fname in files:
+            if not fname.endswith('.pdf'):
+                continue
+            fname = path.join(folder, fname)
+            try:
+                stat = os.stat(fname)
+            except OSError:
+                continue  # evicted concurrently
+            entries.append((stat.st_mtime, stat.st_size, fname))
+            total += stat.st_size
+
+    entries.sort()
+    for (mtime, size, fname) in entries:
+        if total <= maxbytes:
+            break
+        try:
+            os.remove(fname)
+        except OSError:
+            pass
+        _removeLock(fname + '.lock')
+        total -= size
+
+    return total
+
+
+def _removeLock(lockname):
+    """
+    Deletes the lock file of an evicted PDF, unless a render holds it or
+    waits for it. Without flock there is no telling, so it is kept.
+    """
+
+    if fcntl is None:
+        return
+    try:
+        with open(lockname, 'a') as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except (IOError, OSError):
+                return  # in use
+            os.remove(lockname)
+    except (IOError, OSError):
+        pass
@@ -0,0 +1,610 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import calendar
+import datetime
+from reportlab.lib.units import inch
+from reportlab.lib.pagesizes import letter
+
+from logo import placeLogo
+from coloring import grey
+from support import registerFonts, openOutput, newCanvas, saveOutput
+from todo import FONTS
+from profiling import stage, count
+from layout import pageLayout, calendarCells, TITLE_H, WEEKS, \
+    MONTH_LABEL_SIZE, DAY_LABEL_W, DAYS_LABEL_SIZE
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+          'August', 'September', 'October', 'November', 'December']
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday',
+        'Saturday', 'Sunday']
+
+FONT_TITLE = 'LearningCurve'
+FONT_LABELS = 'FreeUniversal-Bold'
+FONT_DATES = 'FreeUniversal'
+
+
+# ASCII Model of a month
+
+# = : title
+# @ : weekdays, shared by every page
+# # : dates, drawn for each month
+
+#############################################################################
+###### ========================                                        ######
+######                                                                 ######
+###### @@@@@@@@ @@@@@@@@ @@@@@@@@ @@@@@@@@ @@@@@@@@ @@@@@@@@ @@@@@@@@ ######
+######                                      1        2        3        ######
+######                                                                 ######
+###### 4        5        6        7        8        9        10       ######
+######                                                                 ######
+###### ...                                                             ######
+#############################################################################
+
+def monthCalendar(
+    filename=None,
+    year=None,
+    month=None,
+    months=1,
+    pagesize=letter,
+    margins=0.5 * inch,
+    sundayfirst=0,
+    gridline=1,
+    gridcolor=20,
+    weekendcolor=5,
+    precision=None,
+    compression=None,
+    **excessParams
+    ):
+    """
+    Generates a month calendar with a landscape page for each month. The
+    grid, weekday labels and weekend shading are drawn once and shared by
+    every page, so only the title and dates are drawn for each month.
+
+    Keyword arguments:
+    filename -- output PDF document name or writable binary stream; the PDF
+        bytes are returned if None
+    year -- year of the first month, None for the current year
+    month -- first month in range [1,12], None for the current month
+    months -- number of consecutive months, one page each
+    pagesize -- size of page as (width, height) tuple, turned to landscape
+    margins -- size of margins around page
+    sundayfirst -- weeks start on Sunday, else on Monday
+    gridline -- thickness of lines around cells
+    gridcolor -- color of grid lines around cells
+    weekendcolor -- color of the weekend columns, 0 for none
+    precision -- decimals of coordinates in compact content streams, None
+        to write them in full
+    compression -- zlib level of content streams, 0 (fastest) to 9
+        (smallest), None for the default
+    """
+
+    (year, month) = _start(year, month)
+    if months < 1:
+        raise ValueError('A calendar has at least one page.')
+
+    # full spread: landscape orientation
+
+    pagesize = pagesize[::-1]
+    (page_w, page_h) = pagesize
+
+    with stage('layout'):
+        (cell_w, cell_h) = calendarCells((page_w - 2 * margins, page_h - 2
+                                         * margins), 7, WEEKS, TITLE_H
+                                         + DAYS_LABEL_SIZE)
+    (x_o, y_o) = (margins, margins)  # lower left of the dates
+    grid_top = y_o + WEEKS * cell_h
+    (days, weekend) = _weekdays(sundayfirst)
+
+    # canvas attributes
+
+    output = openOutput(filename)
+    page = newCanvas(output, pagesize, precision, compression)
+    page.setTitle('Month Calendar by Give Sheet')
+    page.setAuthor('Andre Aboulian via Give Sheet')
+    page.setSubject('Page Template')
+    page.setKeywords([
+        'month',
+        'calendar',
+        'planner',
+        'givesheet',
+        'pdf',
+        'grid',
+        'template',
+        'paper',
+        ])
+
+    registerFonts(FONTS)
+
+    # weekdays, weekend and grid, the same on every page
+
+    def _drawMonth():
+        _shadeColumns(page, (x_o, y_o), (cell_w, WEEKS * cell_h), weekend,
+                      weekendcolor)
+        _drawGrid(page, (x_o, y_o), (7, WEEKS), (cell_w, cell_h),
+                  DAYS_LABEL_SIZE, gridline, gridcolor)
+        _labelRow(page, (x_o, grid_top), cell_w, DAYS_LABEL_SIZE, days,
+                  FONT_LABELS, 10)
+
+    # dates of each month
+
+    for (year, month) in _months(year, month, months):
+        _template(page, 'GiveSheetMonth', _drawMonth)
+        placeLogo(margins, pagesize, page, quadrant=4)
+
+        with stage('dates'):
+            text = page.beginText()
+            text.setFont(FONT_TITLE, 24)
+            text.setTextOrigin(x_o, page_h - margins - TITLE_H + 10)
+            text.textOut(MONTHS[month - 1] + ' ' + str(year))
+
+            text.setFont(FONT_DATES, 12)
+            weeks = _monthWeeks(year, month, sundayfirst)
+            for (row, week) in enumerate(weeks):
+                for (col, date) in enumerate(week):
+                    if date:
+                        text.setTextOrigin(x_o + col * cell_w + 4, grid_top
+                                           - row * cell_h - 14)
+                        text.textOut(str(date))
+                        count('dates')
+
+            page.setFillColor(grey(100))
+            page.drawText(text)
+        page.showPage()
+
+    return saveOutput(page, filename, output)
+
+
+def yearOverview(
+    filename=None,
+    year=None,
+    years=1,
+    pagesize=letter,
+    margins=0.5 * inch,
+    spacer=0.25 * inch,
+    layout=(3, 4),
+    sundayfirst=0,
+    gridline=1,
+    gridcolor=20,
+    weekendcolor=5,
+    precision=None,
+    compression=None,
+    **excessParams
+    ):
+    """
+    Generates a year overview with the twelve months of a year on one page,
+    and a page for each year. The weekday labels and weekend shading of a
+    month are drawn once and placed for every month.
+
+    Keyword arguments:
+    filename -- output PDF document name or writable binary stream; the PDF
+        bytes are returned if None
+    year -- first year, None for the current year
+    years -- number of consecutive years, one page each
+    pagesize -- size of page as (width, height) tuple
+    margins -- size of margins around page
+    spacer -- size of spacing between months
+    layout -- number of months per row and column in (x, y) tuple, filled
+        row by row from the top; at least 12
+    sundayfirst -- weeks start on Sunday, else on Monday
+    gridline -- thickness of the line beneath each month name
+    gridcolor -- color of the line beneath each month name
+    weekendcolor -- color of the weekend columns, 0 for none
+    precision -- decimals of coordinates in compact content streams, None
+        to write them in full
+    compression -- zlib level of content streams, 0 (fastest) to 9
+        (smallest), None for the default
+    """
+
+    (year, month) = _start(year, 1)
+    if years < 1:
+        raise ValueError('A calendar has at least one page.')
+
+    (page_w, page_h) = pagesize
+
+    with stage('layout'):
+        ((area_w, area_h), locations) = pageLayout((page_w, page_h
+                - TITLE_H), margins, spacer, layout)
+        if len(locations) < 12:
+            raise ValueError('The layout has fewer than 12 sections.')
+        (cell_w, cell_h) = calendarCells((area_w, area_h), 7, WEEKS,
+                                         MONTH_LABEL_SIZE + DAYS_LABEL_SIZE)
+
+    # months row by row from the top left
+
+    (up_w, up_h) = layout
+    locations = [locations[i % up_w * up_h + up_h - 1 - i // up_w] for i in
+                 xrange(12)]
+    grid_h = WEEKS * cell_h
+    (days, weekend) = _weekdays(sundayfirst)
+
+    # canvas attributes
+
+    output = openOutput(filename)
+    page = newCanvas(output, pagesize, precision, compression)
+    page.setTitle('Year Overview by Give Sheet')
+    page.setAuthor('Andre Aboulian via Give Sheet')
+    page.setSubject('Page Template')
+    page.setKeywords([
+        'year',
+        'overview',
+        'calendar',
+        'planner',
+        'givesheet',
+        'pdf',
+        'template',
+        'paper',
+        ])
+
+    registerFonts(FONTS)
+
+    # weekdays, weekend and rule of a month, the same for every month
+
+    def _drawMonth():
+        _shadeColumns(page, (0, 0), (cell_w, grid_h), weekend, weekendcolor)
+        _labelRow(page, (0, grid_h), cell_w, DAYS_LABEL_SIZE, [day[:2] for
+                  day in days], FONT_LABELS, 7)
+        page.setStrokeColor(grey(gridcolor))
+        page.setLineWidth(gridline)
+        page.line(0, grid_h + DAYS_LABEL_SIZE, 7 * cell_w, grid_h
+                  + DAYS_LABEL_SIZE)
+
+    widths = dict()  # width of each date
+
+    for year in xrange(year, year + years):
+        for (x, y) in locations:
+            page.saveState()
+            page.translate(x, y)
+            _template(page, 'GiveSheetYearMonth', _drawMonth, (-area_w,
+                      -area_h, 2 * area_w, 2 * area_h))
+            page.restoreState()
+        placeLogo(margins, pagesize, page, quadrant=4)
+
+        # names and dates of the months, centered in their cells
+
+        with stage('dates'):
+            text = page.beginText()
+            text.setFont(FONT_TITLE, 28)
+            text.setTextOrigin(margins, page_h - margins - TITLE_H + 10)
+            text.textOut(str(year))
+
+            for (month, (x, y)) in enumerate(locations, 1):
+                text.setFont(FONT_LABELS, 10)
+                text.setTextOrigin(x + 2, y + grid_h + DAYS_LABEL_SIZE + 4)
+                text.textOut(MONTHS[month - 1])
+
+                text.setFont(FONT_DATES, 8)
+                weeks = _monthWeeks(year, month, sundayfirst)
+                for (row, week) in enumerate(weeks):
+                    for (col, date) in enumerate(week):
+                        if not date:
+                            continue
+                        if date not in widths:
+                            widths[date] = page.stringWidth(str(date),
+                                    FONT_DATES, 8)
+                        text.setTextOrigin(x + (col + 0.5) * cell_w - 0.5
+                                           * widths[date], y + grid_h
+                                           - (row + 0.5) * cell_h - 3)
+                        text.textOut(str(date))
+                        count('dates')
+
+            page.setFillColor(grey(100))
+            page.drawText(text)
+        page.showPage()
+
+    return saveOutput(page, filename, output)
+
+
+def cascadingYear(
+    filename=None,
+    year=None,
+    years=1,
+    pagesize=letter,
+    margins=0.5 * inch,
+    gridline=1,
+    gridcolor=20,
+    weekendcolor=10,
+    precision=None,
+    compression=None,
+    **excessParams
+    ):
+    """
+    Generates a cascading year calendar, with a column for each month and a
+    row for each date, and a page for each year. The grid and the month and
+    date labels are drawn once and shared by every page, so only the
+    weekdays and shading are drawn for each year.
+
+    Keyword arguments:
+    filename -- output PDF document name or writable binary stream; the PDF
+        bytes are returned if None
+    year -- first year, None for the current year
+    years -- number of consecutive years, one page each
+    pagesize -- size of page as (width, height) tuple
+    margins -- size of margins around page
+    gridline -- thickness of lines around cells
+    gridcolor -- color of grid lines around cells, and of dates a month
+        lacks
+    weekendcolor -- color of the weekend cells, 0 for none
+    precision -- decimals of coordinates in compact content streams, None
+        to write them in full
+    compression -- zlib level of content streams, 0 (fastest) to 9
+        (smallest), None for the default
+    """
+
+    (year, month) = _start(year, 1)
+    if years < 1:
+        raise ValueError('A calendar has at least one page.')
+
+    (page_w, page_h) = pagesize
+
+    with stage('layout'):
+        (cell_w, cell_h) = calendarCells((page_w - 2 * margins
+                                         - DAY_LABEL_W, page_h - 2
+                                         * margins), 12, 31, TITLE_H
+                                         + DAYS_LABEL_SIZE)
+    (x_o, y_o) = (margins + DAY_LABEL_W, margins)  # lower left of the dates
+    grid_top = y_o + 31 * cell_h
+
+    # canvas attributes
+
+    output = openOutput(filename)
+    page = newCanvas(output, pagesize, precision, compression)
+    page.setTitle('Cascading Year Calendar by Give Sheet')
+    page.setAuthor('Andre Aboulian via Give Sheet')
+    page.setSubject('Page Template')
+    page.setKeywords([
+        'year',
+        'cascading',
+        'calendar',
+        'planner',
+        'givesheet',
+        'pdf',
+        'grid',
+        'template',
+        'paper',
+        ])
+
+    registerFonts(FONTS)
+
+    # months, dates and grid, the same on every page
+
+    def _drawYear():
+        _drawGrid(page, (x_o, y_o), (12, 31), (cell_w, cell_h),
+                  DAYS_LABEL_SIZE, gridline, gridcolor)
+        _labelRow(page, (x_o, grid_top), cell_w, DAYS_LABEL_SIZE,
+                  [name[:3] for name in MONTHS], FONT_LABELS, 9)
+        text = page.beginText()
+        text.setFont(FONT_DATES, 8)
+        for date in xrange(1, 32):
+            label = str(date)
+            text.setTextOrigin(x_o - 3 - page.stringWidth(label, FONT_DATES,
+                               8), grid_top - (date - 0.5) * cell_h - 3)
+            text.textOut(label)
+        page.setFillColor(grey(100))
+        page.drawText(text)
+
+    for year in xrange(year, year + years):
+
+        # shading beneath the grid: weekends, and dates a month lacks
+
+        with stage('dates'):
+            weekends = page.beginPath()
+            lacking = page.beginPath()
+            text = page.beginText()
+            text.setFont(FONT_DATES, 7)
+            for month in xrange(1, 13):
+                x = x_o + (month - 1) * cell_w
+                length = calendar.monthrange(year, month)[1]
+                for date in xrange(1, 32):
+                    y = grid_top - date * cell_h
+                    if date > length:
+                        lacking.rect(x, y, cell_w, cell_h)
+                        continue
+                    weekday = datetime.date(year, month, date).weekday()
+                    if weekday >= 5:
+                        weekends.rect(x, y, cell_w, cell_h)
+                    text.setTextOrigin(x + 2, y + 0.5 * cell_h - 2.5)
+                    text.textOut(DAYS[weekday][:2])
+                    count('dates')
+
+            page.saveState()
+            if weekendcolor != 0:
+                page.setFillColor(grey(weekendcolor))
+                page.drawPath(weekends, stroke=0, fill=1)
+            page.setFillColor(grey(gridcolor))
+            page.drawPath(lacking, stroke=0, fill=1)
+            page.restoreState()
+
+        _template(page, 'GiveSheetCascade', _drawYear)
+        placeLogo(margins, pagesize, page, quadrant=4)
+
+        text.setFont(FONT_TITLE, 28)
+        text.setTextOrigin(margins, page_h - margins - TITLE_H + 10)
+        text.textOut(str(year))
+        page.setFillColor(grey(100))
+        page.drawText(text)
+        page.showPage()
+
+    return saveOutput(page, filename, output)
+
+
+def _start(year, month):
+    """
+    Returns the (year, month) a calendar starts with, the current ones for
+    None.
+    """
+
+    today = datetime.date.today()
+    year = (today.year if year is None else int(year))
+    month = (today.month if month is None else int(month))
+    if not 1 <= month <= 12:
+        raise ValueError('Month should be in range [1,12].')
+    return (year, month)
+
+
+def _months(year, month, number):
+    """
+    Returns a list of (year, month) tuples of consecutive months.
+    """
+
+    first = year * 12 + month - 1
+    return [(n // 12, n % 12 + 1) for n in xrange(first, first + number)]
+
+
+def _weekdays(sundayfirst):
+    """
+    Returns the names of the days in order of the columns of a week, and
+    the columns of the weekend.
+    """
+
+    days = (DAYS[6:] + DAYS[:6] if sundayfirst else DAYS)
+    return (days, [days.index('Saturday'), days.index('Sunday')])
+
+
+def _monthWeeks(year, month, sundayfirst):
+    """
+    Returns the weeks of a month as lists of seven dates, 0 outside the
+    month.
+    """
+
+    return calendar.Calendar((6 if sundayfirst else 0)).monthdayscalendar(
+        year, month)
+
+
+def _template(page, name, draw, bbox=None):
+    """
+    Places the static part of a calendar page, drawn as a form the first
+    time it is used in a document.
+
+    Keyword arguments:
+    page -- a Canvas instance on which to draw
+    name -- name of the form
+    draw -- function of no arguments that draws the static part
+    bbox -- bounding box of the form as (x0, y0, x1, y1), the page if None
+    """
+
+    if not page.hasForm(name):
+        with stage('template'):
+            page.beginForm(name, *(bbox or ()))
+            draw()
+            page.endForm()
+    page.doForm(name)
+
+
+def _drawGrid(
+    page,
+    origin,
+    cells,
+    size,
+    labels,
+    gridline,
+    gridcolor,
+    ):
+    """
+    Draws a calendar grid with a row of labels on top, its outer box and
+    the line beneath the labels in one path and its inner lines, half as
+    thick, in another.
+
+    Keyword arguments:
+    page -- a Canvas instance on which to draw
+    origin -- lower left corner of the cells as an (x, y) tuple
+    cells -- number of cells as an (x, y) tuple
+    size -- size of a cell as (width, height) tuple
+    labels -- height of the row of labels
+    gridline -- thickness of lines around cells
+    gridcolor -- color of grid lines around cells
+    """
+
+    (x0, y0) = origin
+    (cells_x, cells_y) = cells
+    (cell_w, cell_h) = size
+    (x1, y1) = (x0 + cells_x * cell_w, y0 + cells_y * cell_h)
+
+    count('cells', cells_x * cells_y)
+
+    page.saveState()
+    page.setStrokeColor(grey(gridcolor))
+
+    page.setLineWidth(0.5 * gridline)
+    path = page.beginPath()
+    for x in xrange(1, cells_x):
+        path.moveTo(x0 + x * cell_w, y0)
+        path.lineTo(x0 + x * cell_w, y1 + labels)
+    for y in xrange(1, cells_y):
+        path.moveTo(x0, y0 + y * cell_h)
+        path.lineTo(x1, y0 + y * cell_h)
+    page.drawPath(path, stroke=1, fill=0)
+
+    page.setLineWidth(gridline)
+    path = page.beginPath()
+    path.rect(x0, y0, x1 - x0, y1 + labels - y0)
+    path.moveTo(x0, y1)
+    path.lineTo(x1, y1)
+    page.drawPath(path, stroke=1, fill=0)
+
+    page.restoreState()
+
+
+def _labelRow(
+    page,
+    origin,
+    width,
+    height,
+    labels,
+    font,
+    size,
+    ):
+    """
+    Draws a row of labels, each centered in a column, as one text object.
+
+    Keyword arguments:
+    page -- a Canvas instance on which to draw
+    origin -- lower left corner of the row as an (x, y) tuple
+    width -- width of a column
+    height -- height of the row
+    labels -- list of labels, one for each column
+    font -- name of the font of the labels
+    size -- font size of the labels
+    """
+
+    (x0, y0) = origin
+    text = page.beginText()
+    text.setFont(font, size)
+    for (i, label) in enumerate(labels):
+        text.setTextOrigin(x0 + (i + 0.5) * width - 0.5
+                           * page.stringWidth(label, font, size), y0 + 0.5
+                           * (height - 0.7 * size))
+        text.textOut(label)
+    page.saveState()
+    page.setFillColor(grey(100))
+    page.drawText(text)
+    page.restoreState()
+
+
+def _shadeColumns(page, origin, size, columns, color):
+    """
+    Fills whole columns of a grid, such as those of the weekend.
+
+    Keyword arguments:
+    page -- a Canvas instance on which to draw
+    origin -- lower left corner of the grid as an (x, y) tuple
+    size -- width of a column and height of the grid as a tuple
+    columns -- indices of the columns to fill
+    color -- color of the columns, 0 for none
+    """
+
+    if color == 0:
+        return
+    (x0, y0) = origin
+    (width, height) = size
+    page.saveState()
+    page.setFillColor(grey(color))
+    path = page.beginPath()
+    for column in columns:
+        path.rect(x0 + column * width, y0, width, height)
+    page.drawPath(path, stroke=0, fill=1)
+    page.restoreState()
+
+
+if __name__ == '__main__':
+    monthCalendar('output.pdf', year=2019, month=1, months=12)
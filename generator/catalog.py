@@ -0,0 +1,204 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import ast
+import hashlib
+from os import path, listdir
+
+# public generators as name: (module, function)
+
+GENERATORS = {
+    'cartesian': ('graph', 'cartesian'),
+    'dual': ('graph', 'dual'),
+    'dotted': ('graph', 'dotted'),
+    'lined': ('lined', 'lined'),
+    'itemizedTodo': ('todo', 'itemizedTodo'),
+    'timeSchedule': ('todo', 'timeSchedule'),
+    'monthCalendar': ('calendars', 'monthCalendar'),
+    'yearOverview': ('calendars', 'yearOverview'),
+    'cascadingYear': ('calendars', 'cascadingYear'),
+    }
+
+# values of the names used in generator defaults, so signatures can be
+# read without importing ReportLab
+
+_defaultNames = {
+    'inch': 72.0,
+    'cm': 72.0 / 2.54,
+    'mm': 72.0 / 25.4,
+    'letter': (612.0, 792.0),
+    }
+
+_codeVersion = list()
+_signatures = dict()
+
+
+def getGenerator(name):
+    """
+    Returns the generator function registered under the given name,
+    importing its module on first use.
+
+    Keyword arguments:
+    name -- name of the generator, a key of GENERATORS
+    """
+
+    if name not in GENERATORS:
+        raise ValueError("Unknown generator '" + str(name) + "'.")
+
+    (module, function) = GENERATORS[name]
+    return getattr(__import__(module), function)
+
+
+def warmUp():
+    """
+    Imports every generator and registers the fonts, so the renders of a
+    worker process or thread start as fast as any later one.
+    """
+
+    from support import registerFonts
+    from todo import FONTS
+
+    for name in GENERATORS:
+        getGenerator(name)
+    registerFonts(FONTS)
+
+
+def resolveParams(name, params):
+    """
+    Returns the keyword arguments of a generator call with a year or month
+    of None, which stand for the current ones, replaced by their values, so
+    the arguments name the document that is rendered today.
+
+    Keyword arguments:
+    name -- name of the generator, a key of GENERATORS
+    params -- dict of keyword arguments for the generator
+    """
+
+    import datetime
+
+    today = datetime.date.today()
+    resolved = dict(params)
+    for (arg, default, description) in readSignature(name):
+        if arg in ('year', 'month') and resolved.get(arg, default) is None:
+            resolved[arg] = getattr(today, arg)
+    return resolved
+
+
+def normalizeParams(name, params):
+    """
+    Returns the complete keyword arguments of a generator call in a
+    canonical form: defaults filled in, unknown and output arguments
+    dropped, flags as integers, floats rounded and sequences as tuples.
+
+    Keyword arguments:
+    name -- name of the generator, a key of GENERATORS
+    params -- dict of keyword arguments for the generator
+    """
+
+    import inspect
+
+    spec = inspect.getargspec(getGenerator(name))
+    defaults = dict(zip(spec.args[-len(spec.defaults):], spec.defaults))
+
+    normal = dict()
+    for arg in spec.args:
+        if arg == 'filename':
+            continue
+        if arg in params:
+            normal[arg] = _normalizeValue(params[arg])
+        elif arg in defaults:
+            normal[arg] = _normalizeValue(defaults[arg])
+        else:
+            raise ValueError("Missing argument '" + arg + "' for "
+                             + name + '.')
+
+    return normal
+
+
+def readSignature(name):
+    """
+    Returns the keyword arguments of a generator as a list of
+    (arg, default, description) tuples, read from the source without
+    importing the generator or ReportLab. The output argument is left out.
+    Results are memoised.
+
+    Keyword arguments:
+    name -- name of the generator, a key of GENERATORS
+    """
+
+    if name not in GENERATORS:
+        raise ValueError("Unknown generator '" + str(name) + "'.")
+
+    if name in _signatures:
+        return _signatures[name]
+
+    (module, function) = GENERATORS[name]
+    selfPath = path.dirname(path.abspath(__file__))
+    with open(path.join(selfPath, module + '.py')) as source:
+        tree = ast.parse(source.read())
+
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == function:
+            break
+
+    args = [getattr(arg, 'arg', getattr(arg, 'id', None)) for arg in
+            node.args.args]
+    defaults = [eval(compile(ast.Expression(default), module, 'eval'),
+                dict(_defaultNames)) for default in node.args.defaults]
+    defaults = [None] * (len(args) - len(defaults)) + defaults
+
+    # descriptions from the 'arg -- description' lines of the docstring
+
+    descriptions = dict()
+    arg = None
+    for line in (ast.get_docstring(node) or '').splitlines():
+        (head, sep, tail) = line.strip().partition(' -- ')
+        if sep and head in args:
+            arg = head
+            descriptions[arg] = tail
+        elif arg and line.startswith('    ') and line.strip():
+            descriptions[arg] += ' ' + line.strip()
+        else:
+            arg = None
+
+    _signatures[name] = [(arg, default, descriptions.get(arg, '')) for
+                         (arg, default) in zip(args, defaults) if arg
+                         != 'filename']
+    return _signatures[name]
+
+
+def _normalizeValue(value):
+    """
+    Returns a canonical form of a single argument value.
+    """
+
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, long)):
+        return int(value)
+    if isinstance(value, float):
+
+        # keep whole floats as floats, since the generators divide them
+
+        return round(value, 6)
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalizeValue(item) for item in value)
+    return value
+
+
+def codeVersion():
+    """
+    Returns a digest of the generator source code, which changes whenever
+    any module in this directory does.
+    """
+
+    if not _codeVersion:
+        digest = hashlib.sha1()
+        selfPath = path.dirname(path.abspath(__file__))
+        for fname in sorted(listdir(selfPath)):
+            if fname.endswith('.py'):
+                with open(path.join(selfPath, fname), 'rb') as source:
+                    digest.update(source.read())
+        _codeVersion.append(digest.hexdigest()[:12])
+
+    return _codeVersion[0]
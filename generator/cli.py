@@ -0,0 +1,201 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import sys
+
+from catalog import GENERATORS, getGenerator, readSignature
+
+# lengths in points per unit
+
+UNITS = {
+    'pt': 1.0,
+    'in': 72.0,
+    'cm': 72.0 / 2.54,
+    'mm': 72.0 / 25.4,
+    }
+
+# page sizes in points as (width, height)
+
+PAGESIZES = {
+    'letter': (612.0, 792.0),
+    'legal': (612.0, 1008.0),
+    'tabloid': (792.0, 1224.0),
+    'a4': (595.2756, 841.8898),
+    'a5': (419.5276, 595.2756),
+    }
+
+
+def parseLength(text):
+    """
+    Returns a length in points from a number with an optional unit, such as
+    '18', '0.25in' or '5mm'.
+
+    Keyword arguments:
+    text -- length as given on the command line
+    """
+
+    text = text.strip().lower()
+    for (unit, scale) in UNITS.items():
+        if text.endswith(unit):
+            return float(text[:-len(unit)]) * scale
+    value = float(text)
+    return (int(value) if value == int(value) and '.' not in text
+            else value)
+
+
+def parseSize(text):
+    """
+    Returns a (width, height) tuple from a page size name or two lengths
+    separated by 'x' or ',', such as 'a4', '8.5inx11in' or '2,3'.
+
+    Keyword arguments:
+    text -- size as given on the command line
+    """
+
+    if text.lower() in PAGESIZES:
+        return PAGESIZES[text.lower()]
+    parts = text.lower().replace('x', ',').split(',')
+    if len(parts) != 2:
+        raise ValueError('expected two values')
+    return tuple(parseLength(part) for part in parts)
+
+
+def parseList(text):
+    """
+    Returns a list of strings from a JSON list or comma-separated text.
+
+    Keyword arguments:
+    text -- list as given on the command line
+    """
+
+    if text.strip().startswith('['):
+        return json.loads(text)
+    return [item.strip() for item in text.split(',')]
+
+
+def _argumentType(arg, default):
+    """
+    Returns the function reading an argument from the command line, chosen
+    by the type of its default.
+    """
+
+    if arg == 'items':
+        parse = parseList
+    elif arg == 'seed':
+        parse = int
+    elif isinstance(default, tuple):
+        parse = parseSize
+    else:
+        parse = parseLength
+
+    def _parse(text):
+        try:
+            return parse(text)
+        except ValueError:
+            raise argparse.ArgumentTypeError("invalid value '" + text + "'")
+
+    return _parse
+
+
+def _generatorParser(name):
+    """
+    Returns the argument parser of a single generator, with one option per
+    keyword argument.
+    """
+
+    parser = argparse.ArgumentParser(
+        prog='give-a-sheet ' + name,
+        description='Generates a PDF document with ' + name + '().')
+    parser.add_argument('-o', '--output', default=name + '.pdf',
+                        help="output PDF document, '-' for stdout")
+    parser.add_argument('--check', action='store_true',
+                        help='only validate the options and that the layout fits')
+    parser.add_argument('--stream', action='store_true',
+                        help='write each page as it is finished, in '
+                        'constant memory')
+    parser.add_argument('--png', type=float, default=None, metavar='DPI',
+                        help='write a PNG image at DPI instead of a PDF '
+                        'document, drawn without ReportLab')
+
+    for (arg, default, description) in readSignature(name):
+        parser.add_argument('--' + arg, type=_argumentType(arg, default),
+                            default=None, metavar=arg.upper(),
+                            help='%s (default: %s)' % (description,
+                            default))
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Runs the command line, 'give-a-sheet <generator> [--option value]...'.
+    ReportLab is only imported once a document is rendered.
+
+    Keyword arguments:
+    argv -- list of arguments; sys.argv[1:] if None
+    """
+
+    argv = (sys.argv[1:] if argv is None else argv)
+
+    if not argv or argv[0] not in GENERATORS:
+        parser = argparse.ArgumentParser(
+            prog='give-a-sheet',
+            description='Generates PDF page templates.',
+            epilog="See 'give-a-sheet <generator> --help' for its options.")
+        parser.add_argument('generator', choices=sorted(GENERATORS))
+        parser.add_argument('option', nargs=argparse.REMAINDER)
+        parser.parse_args(argv)
+
+    name = argv[0]
+    args = vars(_generatorParser(name).parse_args(argv[1:]))
+    output = args.pop('output')
+    check = args.pop('check')
+    stream = args.pop('stream')
+    png = args.pop('png')
+    kwargs = dict((arg, value) for (arg, value) in args.items()
+                  if value is not None)
+
+    if check:
+        from layout import dryRun
+
+        try:
+            dryRun(name, kwargs)
+        except (ValueError, TypeError) as error:
+            sys.stderr.write('give-a-sheet ' + name + ': ' + str(error)
+                             + '\n')
+            return 1
+        return 0
+
+    if png:
+        from raster import renderPNG
+
+        if output == name + '.pdf':
+            output = name + '.png'
+        if output == '-':
+            output = getattr(sys.stdout, 'buffer', sys.stdout)
+        renderPNG(name, kwargs, output, dpi=png)
+        return 0
+
+    if stream:
+        from streaming import iterDocument, streamDocument
+
+    if output == '-' and stream:
+        stdout = getattr(sys.stdout, 'buffer', sys.stdout)
+        for chunk in iterDocument(name, kwargs):
+            stdout.write(chunk)
+            stdout.flush()
+    elif output == '-':
+        data = getGenerator(name)(None, **kwargs)
+        getattr(sys.stdout, 'buffer', sys.stdout).write(data)
+    elif stream:
+        streamDocument(name, kwargs, output)
+    else:
+        getGenerator(name)(output, **kwargs)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
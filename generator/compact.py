@@ -0,0 +1,238 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import re
+import zlib
+
+from profiling import stage
+
+# operands and operators of a content stream, strings kept whole
+
+_TOKEN = re.compile(r'\((?:\\.|[^\\)])*\)|<<|>>|<[0-9A-Fa-f\s]*>|[\[\]]'
+                    r'|/[^\s/\[\]()<>{}%]*|[^\s/\[\]()<>{}%]+', re.S)
+_NUMBER = re.compile(r'^[+-]?(?:\d+\.?\d*|\.\d+)$')
+_OPERAND = ('true', 'false', 'null')
+
+# graphics state set by each operator, and colors whose operands are kept
+# at full precision
+
+_STATE = {
+    'w': 'w',
+    'J': 'J',
+    'j': 'j',
+    'M': 'M',
+    'd': 'd',
+    'ri': 'ri',
+    'i': 'i',
+    'K': 'stroke',
+    'RG': 'stroke',
+    'G': 'stroke',
+    'k': 'fill',
+    'rg': 'fill',
+    'g': 'fill',
+    }
+_COLOR = ('K', 'RG', 'G', 'k', 'rg', 'g', 'SC', 'SCN', 'sc', 'scn')
+_UNKNOWN = {
+    'CS': ('stroke', ),
+    'SC': ('stroke', ),
+    'SCN': ('stroke', ),
+    'cs': ('fill', ),
+    'sc': ('fill', ),
+    'scn': ('fill', ),
+    'gs': tuple(set(_STATE.values())),
+    }
+
+# operators that start a path, and text objects that draw nothing
+
+_PATH = ('m', 're')
+_BLANKTEXT = ('Tm', 'Td', 'T*')
+_BLANKTEXTS = re.compile(r'\bBT(?:\s+(?:[-+\d.]+\s+)*(?:Tm|Td|T\*))*\s+ET\b')
+_PAINT = ('S', 's', 'f', 'F', 'f*', 'B', 'B*', 'b', 'b*', 'n')
+
+
+def _number(text, precision):
+    """
+    Returns the shortest form of a number rounded to precision decimals.
+    """
+
+    text = '%.*f' % (precision, float(text))
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    if text.startswith('0.'):
+        text = text[1:]
+    elif text.startswith('-0.'):
+        text = '-' + text[2:]
+    return ('0' if text in ('-0', '') else text)
+
+
+def compactCode(code, precision=2):
+    """
+    Returns a content stream in its compact form: coordinates rounded to
+    a number of decimals, graphics state settings that repeat the current
+    state dropped, text objects that draw nothing dropped, consecutive
+    strokes joined into one path and identity transformations dropped.
+    Colors and the scale and rotation of transformations are kept exact.
+
+    Keyword arguments:
+    code -- PDF operators as text or bytes
+    precision -- decimals of coordinates, such as 2 for 1/100 of a point
+    """
+
+    encoded = isinstance(code, bytes) and not isinstance(code, str)
+    if encoded:
+        code = code.decode('latin-1')
+
+    code = _BLANKTEXTS.sub('', code)  # most of a Table, found quicker
+
+    out = list()
+    operands = list()
+    numbers = dict()
+    states = [dict()]
+    text = None  # operators of the open text object, if any
+    stroke = None  # index of a stroke that may join the next path
+    joining = None  # index of that stroke, once the next path has begun
+    path = False  # a path is under construction
+
+    for token in _TOKEN.findall(code):
+        if token[0] in '(/<[]' or token in _OPERAND or _NUMBER.match(token):
+            operands.append(token)
+            continue
+
+        op = token
+        if op in _COLOR:
+            pass
+        else:
+            for i in range((4 if op in ('cm', 'Tm') else 0),
+                           len(operands)):
+                value = operands[i]
+                if value not in numbers:
+                    numbers[value] = (_number(value, precision) if
+                                      _NUMBER.match(value) else value)
+                operands[i] = numbers[value]
+            if op == 'cm' and operands == ['1', '0', '0', '1', '0', '0']:
+                operands = list()
+                continue
+        line = ' '.join(operands + [op])
+        operands = list()
+
+        # text objects that only position themselves are dropped
+
+        if op == 'BT':
+            text = [line]
+            continue
+        if text is not None:
+            text.append(line)
+            if op in _STATE:
+                states[-1].pop(_STATE[op], None)
+            for key in _UNKNOWN.get(op, ()):
+                states[-1].pop(key, None)
+            if op == 'ET':
+                if any(item.split()[-1] not in _BLANKTEXT for item in
+                       text[1:-1]):
+                    out.extend(text)
+                text = None
+            continue
+
+        # repeated state
+
+        state = states[-1]
+        if op in _STATE:
+            if state.get(_STATE[op]) == line:
+                continue
+            state[_STATE[op]] = line
+        elif op in _UNKNOWN:
+            for key in _UNKNOWN[op]:
+                state.pop(key, None)
+        elif op == 'q':
+            states.append(dict(state))
+        elif op == 'Q' and len(states) > 1:
+            states.pop()
+
+        if op == 'n' and not path:
+            continue
+
+        # a stroke directly followed by a new path joins it, if that path
+        # is stroked as well
+
+        if op in _PATH and not path and stroke is not None and stroke \
+                == len(out) - 1:
+            joining = stroke
+        stroke = None
+
+        if op in _PAINT:
+            if op == 'S' and joining is not None:
+                del out[joining]
+            joining = None
+            path = False
+            if op == 'S':
+                stroke = len(out)
+        elif op in _PATH or op in ('l', 'c', 'v', 'y', 'h'):
+            path = True
+        else:
+            joining = None  # such as a clip
+
+        out.append(line)
+
+    out.extend(text or [])
+    code = '\n'.join(out) + '\n'
+    return (code.encode('latin-1') if encoded else code)
+
+
+class _FlateFilter(object):
+    """
+    Flate stream filter with a chosen compression level.
+    """
+
+    pdfname = 'FlateDecode'
+
+    def __init__(self, level):
+        self.level = level
+
+    def encode(self, text):
+        if not isinstance(text, bytes):
+            text = text.encode('utf8')
+        return zlib.compress(text, self.level)
+
+
+def compactStreams(page, precision=None, compression=None):
+    """
+    Writes the content streams of every page and form of a Canvas added
+    from now on in compact form, if precision is given, and with the given
+    Flate compression level. Streams are stored in binary, without the
+    ASCII85 encoding ReportLab adds by default.
+
+    Keyword arguments:
+    page -- a Canvas instance
+    precision -- decimals of coordinates, None to keep them in full
+    compression -- zlib level of 0 (fastest) to 9 (smallest), None for the
+        default of 6
+    """
+
+    if precision is None and compression is None:
+        return
+
+    from reportlab.pdfbase.pdfdoc import PDFStream
+
+    doc = page._doc
+    filters = [_FlateFilter(6 if compression is None else compression)]
+
+    def _stream(code):
+        if precision is not None:
+            with stage('compact'):
+                code = compactCode(code, precision)
+        return PDFStream(content=code, filters=filters)
+
+    addPage = doc.addPage
+    addForm = doc.addForm
+
+    def _addPage(page):
+        page.Contents = _stream(page.stream)
+        addPage(page)
+
+    def _addForm(name, form):
+        form.Contents = _stream(form.stream)
+        form.compression = 0  # keep the filters above
+        addForm(name, form)
+
+    doc.addPage = _addPage
+    doc.addForm = _addForm
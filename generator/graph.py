@@ -2,18 +2,23 @@
 # -*- coding: utf-8 -*-
 
 import math
-from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch, mm
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
-from reportlab.platypus import Table, TableStyle, Frame
+from reportlab.pdfgen.pathobject import PDFPathObject
+from reportlab.lib.rl_accel import fp_str
 
 from logo import placeLogo
-from coloring import grey, rainbowGrid
+from coloring import grey, rainbowBuckets
+from tiling import colorCode, tilingPattern, fillPattern
+from support import beginRepeat, endRepeat, repeatSection, \
+    openOutput, newCanvas, saveOutput
+from profiling import stage, count
+from layout import pageLayout, gridCells, borderlessSection
 
 
 def cartesian(
-    filename,
+    filename=None,
     pagesize=letter,
     margins=0.5 * inch,
     spacer=0.25 * inch,
@@ -31,13 +36,20 @@ def cartesian(
     guideline=1,
     guidespace=1.25 * inch,
     guidewidth=1,
+    direct=0,
+    tiled=0,
+    seed=None,
+    pages=1,
+    precision=None,
+    compression=None,
     **excessParams
     ):
     """
     Generates a page of Cartesian graph paper.
 
     Keyword arguments:
-    filename -- output PDF document name
+    filename -- output PDF document name or writable binary stream; the PDF
+        bytes are returned if None
     pagesize -- size of page as (width, height) tuple
     margins -- size of margins around page
     spacer -- size of spacing between graphs
@@ -55,25 +67,41 @@ def cartesian(
     guideline -- flag for including the left margin line on borderless page
     guidespace -- space of left margin line from page edge
     guidewidth -- width of left margin line
+    direct -- draw grid lines straight onto the canvas instead of via a Table
+    tiled -- fill each graph with a PDF tiling pattern of a single cell
+    seed -- seed for the rainbow coloring, None for a new pattern each time
+    pages -- number of identical pages, all sharing one drawing of the page
+    precision -- decimals of coordinates in compact content streams, None
+        to write them in full
+    compression -- zlib level of content streams, 0 (fastest) to 9
+        (smallest), None for the default
     """
 
-    page = canvas.Canvas(filename, pagesize=pagesize)
+    output = openOutput(filename)
+    page = newCanvas(output, pagesize, precision, compression)
+    beginRepeat(page, pages)
 
     if borderless:
+        (loc, size) = borderlessSection('cartesian', pagesize)
         squareSection(
             page=page,
-            location=(0, 0),
-            size=pagesize,
+            location=loc,
+            size=size,
             gridspace=gridspace,
             linefreq=0,
             checkered=checkered,
             rainbow=rainbow,
             gridline=gridline,
+            linewidth=gridline,
             boxline=0,
             checkeredcolor=checkeredcolor,
             gridcolor=gridcolor,
+            linecolor=gridcolor,
             boxcolor=boxcolor,
             bgndcolor=bgndcolor,
+            direct=direct,
+            tiled=tiled,
+            seed=seed,
             )
         if guideline:
             page.setStrokeColor(grey(boxcolor))
@@ -83,27 +111,13 @@ def cartesian(
 
         # dimensions and layout
 
-        (up_w, up_h) = (layout if layout > (0, 0) else (1, 1))
-        (page_w, page_h) = pagesize
-        area_w = (page_w - 2 * margins - (up_w - 1) * spacer) / up_w
-        area_h = (page_h - 2 * margins - (up_h - 1) * spacer) / up_h
-
-        if area_w < 0 or area_h < 0:
-            raise ValueError('Specified dimensions do not fit on page.')
-
-        frame_locs = list()
-
-        x = margins  # begin after left margin
-        for frame_x in xrange(up_w):
-            y = margins  # begin above lower margin
-            for frame_y in xrange(up_h):
-                frame_locs.append((x, y))
-                y += area_h + spacer
-            x += area_w + spacer
+        with stage('layout'):
+            ((area_w, area_h), frame_locs) = pageLayout(pagesize, margins,
+                                                        spacer, layout)
 
-        # draw result
+        # draw result, each distinct section only once
 
-        for loc in frame_locs:
+        def _drawSection(loc, n):
             squareSection(
                 page=page,
                 location=loc,
@@ -113,14 +127,26 @@ def cartesian(
                 checkered=checkered,
                 rainbow=rainbow,
                 gridline=gridline,
+                linewidth=gridline,
                 boxline=boxline,
                 checkeredcolor=checkeredcolor,
                 gridcolor=gridcolor,
+                linecolor=gridcolor,
                 boxcolor=boxcolor,
                 bgndcolor=bgndcolor,
+                direct=direct,
+                tiled=tiled,
+                seed=(None if seed is None else seed + n),
                 )
 
-    placeLogo(margins, pagesize, canvas, quadrant=4)
+        # some viewers anchor tiling patterns to the page instead of the
+        # form, so tiled sections are drawn in place
+
+        repeatSection(page, (area_w, area_h), frame_locs, _drawSection,
+                      identical=not (rainbow or tiled))
+
+    placeLogo(margins, pagesize, page, quadrant=4)
+    endRepeat(page, pages)
 
     page.setTitle('Cartesian Graph Paper by Give Sheet')
     page.setAuthor('Andre Aboulian via Give Sheet')
@@ -134,7 +160,7 @@ def cartesian(
         'template',
         'paper',
         ])
-    page.save()
+    return saveOutput(page, filename, output)
 
 
 def squareSection(
@@ -153,6 +179,9 @@ def squareSection(
     linecolor,
     boxcolor,
     bgndcolor,
+    direct=0,
+    tiled=0,
+    seed=None,
     **excessParams
     ):
     """
@@ -174,6 +203,9 @@ def squareSection(
     linecolor -- color of each line
     boxcolor -- color of box surrounding graph(s)
     bgndcolor -- color of background of each cell
+    direct -- draw grid lines straight onto the canvas instead of via a Table
+    tiled -- fill the graph with a PDF tiling pattern of a single cell
+    seed -- seed for the rainbow coloring, None for a random pattern
     """
 
     # dimensions and spacing
@@ -181,7 +213,7 @@ def squareSection(
     (area_w, area_h) = size
     (loc_x, loc_y) = location
 
-    (cells_x, cells_y) = (int(area_w / gridspace), int(area_h / gridspace))
+    (cells_x, cells_y) = gridCells(size, gridspace)
 
     grid_w = cells_x * gridspace + boxline
     grid_h = cells_y * gridspace + boxline
@@ -189,70 +221,319 @@ def squareSection(
     xMargins = (area_w - grid_w) / 2
     yMargins = (area_h - grid_h) / 2
 
-    if cells_x < 1 or cells_y < 1:
-        raise ValueError('Specified dimensions do not fit on page.')
+    if checkered and rainbow:
+        raise ValueError('Grid pattern cannot be both rainbow and checekred.')
 
-    # create plain table
+    count('cells', cells_x * cells_y)
 
-    data = [['' for col in xrange(cells_x)] for row in xrange(cells_y)]
-    table = Table(data, colWidths=gridspace, rowHeights=gridspace)
+    # same placement as a Table centered at the top of its Frame
 
-    # checkered grid or shaded background
+    origin = (loc_x + xMargins + 0.5 * boxline, loc_y + yMargins + boxline)
 
-    pattern = list()
+    if direct or tiled:
+        _directSection(
+            page=page,
+            origin=origin,
+            cells=(cells_x, cells_y),
+            gridspace=gridspace,
+            linefreq=linefreq,
+            checkered=checkered,
+            rainbow=rainbow,
+            gridline=gridline,
+            linewidth=linewidth,
+            boxline=boxline,
+            checkeredcolor=checkeredcolor,
+            gridcolor=gridcolor,
+            linecolor=linecolor,
+            boxcolor=boxcolor,
+            bgndcolor=bgndcolor,
+            tiled=tiled,
+            seed=seed,
+            )
+        return
 
-    if checkered and rainbow:
-        raise ValueError('Grid pattern cannot be both rainbow and checekred.')
+    # create plain table; platypus is slow to import, so only on use
+
+    from reportlab.platypus import Table, TableStyle, Frame
+
+    with stage('tablestyle'):
+        data = [['' for col in xrange(cells_x)] for row in xrange(cells_y)]
+        table = Table(data, colWidths=gridspace, rowHeights=gridspace)
+
+        # checkered grid or shaded background
+
+        pattern = list()
+
+        if checkered:
+            for y in xrange(cells_y):
+                for x in xrange(y % 2, cells_x, 2):
+                    c = (x, y)
+                    pattern.append(('BACKGROUND', c, c, grey(checkeredcolor)))
+        elif rainbow:
+            _rainbowCells(page, origin, (cells_x, cells_y), gridspace, seed)
+        elif bgndcolor != 0:
+            pattern.append(('BACKGROUND', (0, 0), (-1, -1), grey(bgndcolor)))
+
+        # apply table style
+
+        style = TableStyle(pattern)
+        style.add('INNERGRID', (0, 0), (-1, -1), gridline, grey(gridcolor))
+        if boxline != 0:
+            style.add('BOX', (0, 0), (-1, -1), boxline, grey(boxcolor))
+        table.setStyle(style)
+
+        # writing lines
+
+        if linefreq != 0:
+            style = TableStyle()
+            for line in xrange(int(cells_y / linefreq) + 1):
+                rowline = line * linefreq
+                style.add('LINEABOVE', (0, rowline), (-1, rowline), linewidth,
+                          grey(linecolor))
+            table.setStyle(style)
+
+    # draw graphs
+
+    with stage('frame'):
+        frame = Frame(
+            loc_x + xMargins,
+            loc_y + yMargins,
+            grid_w,
+            grid_h,
+            leftPadding=0,
+            bottomPadding=0,
+            rightPadding=0,
+            topPadding=0,
+            )
+        frame.addFromList([table], page)
+
+
+def _directSection(
+    page,
+    origin,
+    cells,
+    gridspace,
+    linefreq,
+    checkered,
+    rainbow,
+    gridline,
+    linewidth,
+    boxline,
+    checkeredcolor,
+    gridcolor,
+    linecolor,
+    boxcolor,
+    bgndcolor,
+    tiled=0,
+    seed=None,
+    ):
+    """
+    Draws the cells and rules of a Cartesian graph as canvas paths.
+
+    Produces the same marks as the Table built by squareSection, but with
+    one path per stroke style, so the cost grows with the number of lines
+    rather than the number of cells.
+
+    Keyword arguments:
+    page -- a Canvas instance on which to draw
+    origin -- lower left corner of the cells as an (x, y) tuple
+    cells -- number of cells as an (x, y) tuple
+    tiled -- fill the cells with a tiling pattern instead of drawing them
+    (remaining arguments as in squareSection)
+    """
+
+    (x0, y0) = origin
+    (cells_x, cells_y) = cells
+    (grid_w, grid_h) = (cells_x * gridspace, cells_y * gridspace)
+    (x1, y1) = (x0 + grid_w, y0 + grid_h)
+
+    page.saveState()
+
+    # cell backgrounds (rows are counted from the top, as in a Table)
 
     if checkered:
-        for y in xrange(cells_y):
-            for x in xrange(y % 2, cells_x, 2):
-                c = (x, y)
-                pattern.append(('BACKGROUND', c, c, grey(checkeredcolor)))
-    elif rainbow:
-        rainbow_pattern = rainbowGrid((cells_x, cells_y), darkness=5)
-        for x in xrange(cells_x):
+        if not tiled:
+            path = page.beginPath()
             for y in xrange(cells_y):
-                c = (x, y)
-                pattern.append(('BACKGROUND', c, c, rainbow_pattern[x][y]))
+                for x in xrange(y % 2, cells_x, 2):
+                    path.rect(x0 + x * gridspace, y1 - (y + 1) * gridspace,
+                              gridspace, gridspace)
+            page.setFillColor(grey(checkeredcolor))
+            page.drawPath(path, stroke=0, fill=1)
+    elif rainbow:
+        _rainbowCells(page, origin, cells, gridspace, seed)
     elif bgndcolor != 0:
-        pattern.append(('BACKGROUND', (0, 0), (-1, -1), grey(bgndcolor)))
+        page.setFillColor(grey(bgndcolor))
+        page.rect(x0, y0, grid_w, grid_h, stroke=0, fill=1)
 
-    # apply table style
+    # rules, one path for each stroke style
+
+    page.setLineCap(1)
+    page.setLineJoin(1)
+
+    if tiled:
+        _tiledCells(
+            page=page,
+            origin=origin,
+            cells=cells,
+            gridspace=gridspace,
+            linefreq=linefreq,
+            checkered=checkered,
+            gridline=gridline,
+            linewidth=linewidth,
+            checkeredcolor=checkeredcolor,
+            gridcolor=gridcolor,
+            linecolor=linecolor,
+            )
+    else:
+        path = page.beginPath()
+        for x in xrange(1, cells_x):
+            path.moveTo(x0 + x * gridspace, y0)
+            path.lineTo(x0 + x * gridspace, y1)
+        for y in xrange(1, cells_y):
+            path.moveTo(x0, y1 - y * gridspace)
+            path.lineTo(x1, y1 - y * gridspace)
+        page.setStrokeColor(grey(gridcolor))
+        page.setLineWidth(gridline)
+        page.drawPath(path, stroke=1, fill=0)
 
-    style = TableStyle(pattern)
-    style.add('INNERGRID', (0, 0), (-1, -1), gridline, grey(gridcolor))
     if boxline != 0:
-        style.add('BOX', (0, 0), (-1, -1), boxline, grey(boxcolor))
-    table.setStyle(style)
+        page.setStrokeColor(grey(boxcolor))
+        page.setLineWidth(boxline)
+        page.rect(x0, y0, grid_w, grid_h, stroke=1, fill=0)
+
+    if linefreq != 0:
+
+        # above each line's row, as LINEABOVE, so none beneath the last row
+
+        rows = [line * linefreq for line in xrange(int(cells_y / linefreq)
+                + 1) if line * linefreq < cells_y]
+        if tiled:  # inner lines are part of the pattern
+            rows = [row for row in rows if row == 0]
+        path = page.beginPath()
+        for row in rows:
+            path.moveTo(x0, y1 - row * gridspace)
+            path.lineTo(x1, y1 - row * gridspace)
+        page.setStrokeColor(grey(linecolor))
+        page.setLineWidth(linewidth)
+        page.drawPath(path, stroke=1, fill=0)
+
+    page.restoreState()
+
+
+def _rainbowCells(page, origin, cells, gridspace, seed=None):
+    """
+    Fills the cells of a Cartesian graph with a rainbow pattern, using one
+    path and one fill for each color.
+
+    Keyword arguments:
+    page -- a Canvas instance on which to draw
+    origin -- lower left corner of the cells as an (x, y) tuple
+    cells -- number of cells as an (x, y) tuple
+    gridspace -- size of individual grid cells
+    seed -- seed for the rainbow coloring, None for a random pattern
+    """
+
+    (x0, y0) = origin
+    (cells_x, cells_y) = cells
+    y1 = y0 + cells_y * gridspace
+
+    with stage('rainbow'):
+        page.saveState()
+        for (color, members) in rainbowBuckets((cells_x, cells_y), darkness=5,
+                seed=seed):
+            path = page.beginPath()
+            for (x, y) in members:  # rows are counted from the top
+                path.rect(x0 + x * gridspace, y1 - (y + 1) * gridspace,
+                          gridspace, gridspace)
+            page.setFillColor(color)
+            page.drawPath(path, stroke=0, fill=1)
+        page.restoreState()
+
+
+def _tiledCells(
+    page,
+    origin,
+    cells,
+    gridspace,
+    linefreq,
+    checkered,
+    gridline,
+    linewidth,
+    checkeredcolor,
+    gridcolor,
+    linecolor,
+    ):
+    """
+    Fills the cells of a Cartesian graph with a single tiling pattern.
 
-    # writing lines
+    The pattern holds the checkered squares, the inner grid and the writing
+    lines of the smallest repeating block of cells. Lines on the outer edge
+    of the graph are left to the caller, as the pattern stops a grid line
+    width short of the edges.
 
+    Keyword arguments:
+    page -- a Canvas instance on which to draw
+    origin -- lower left corner of the cells as an (x, y) tuple
+    cells -- number of cells as an (x, y) tuple
+    (remaining arguments as in squareSection)
+    """
+
+    (x0, y0) = origin
+    (cells_x, cells_y) = cells
+    (grid_w, grid_h) = (cells_x * gridspace, cells_y * gridspace)
+
+    # smallest repeating block, rows counted from its top
+
+    tile_x = tile_y = (2 if checkered else 1)
     if linefreq != 0:
-        style = TableStyle()
-        for line in xrange(int(cells_y / linefreq) + 1):
-            rowline = line * linefreq
-            style.add('LINEABOVE', (0, rowline), (-1, rowline), linewidth,
-                      grey(linecolor))
-        table.setStyle(style)
+        linefreq = int(linefreq)
+        tile_y = (linefreq if linefreq % tile_y == 0 else tile_y
+                  * linefreq)
+    (step_x, step_y) = (tile_x * gridspace, tile_y * gridspace)
 
-    # draw graphs
+    code = ['1 J 1 j']
 
-    frame = Frame(
-        loc_x + xMargins,
-        loc_y + yMargins,
-        grid_w,
-        grid_h,
-        leftPadding=0,
-        bottomPadding=0,
-        rightPadding=0,
-        topPadding=0,
-        )
-    frame.addFromList([table], page)
+    if checkered:
+        path = PDFPathObject()
+        for y in xrange(tile_y):
+            for x in xrange(y % 2, tile_x, 2):
+                path.rect(x * gridspace, step_y - (y + 1) * gridspace,
+                          gridspace, gridspace)
+        code.append(colorCode(grey(checkeredcolor)))
+        code.append(path.getCode() + ' f')
+
+    path = PDFPathObject()
+    for x in xrange(tile_x + 1):
+        path.moveTo(x * gridspace, 0)
+        path.lineTo(x * gridspace, step_y)
+    for y in xrange(tile_y + 1):
+        path.moveTo(0, y * gridspace)
+        path.lineTo(step_x, y * gridspace)
+    code.append(colorCode(grey(gridcolor), stroke=1))
+    code.append(fp_str(gridline) + ' w')
+    code.append(path.getCode() + ' S')
+
+    if linefreq != 0:
+        path = PDFPathObject()
+        for y in xrange(0, tile_y + 1, linefreq):
+            path.moveTo(0, step_y - y * gridspace)
+            path.lineTo(step_x, step_y - y * gridspace)
+        code.append(colorCode(grey(linecolor), stroke=1))
+        code.append(fp_str(linewidth) + ' w')
+        code.append(path.getCode() + ' S')
+
+    # anchor the block at the top left corner, as the Table does
+
+    name = tilingPattern(page, (step_x, step_y), '\n'.join(code),
+                         origin=(x0, y0 + grid_h - step_y))
+    inset = gridline
+    fillPattern(page, name, x0 + inset, y0 + inset, grid_w - 2 * inset,
+                grid_h - 2 * inset)
 
 
 def dual(
-    filename,
+    filename=None,
     pagesize=letter,
     margins=0.5 * inch,
     spacer=0.25 * inch,
@@ -273,13 +554,20 @@ def dual(
     guideline=1,
     guidespace=1.25 * inch,
     guidewidth=1,
+    direct=0,
+    tiled=0,
+    seed=None,
+    pages=1,
+    precision=None,
+    compression=None,
     **excessParams
     ):
     """
     Generates a page that is squared between lines.
 
     Keyword arguments:
-    filename -- output PDF document name
+    filename -- output PDF document name or writable binary stream; the PDF
+        bytes are returned if None
     pagesize -- size of page as (width, height) tuple
     margins -- size of margins around page
     spacer -- size of spacing between graphs
@@ -300,17 +588,22 @@ def dual(
     guideline -- flag for including the left margin line on borderless page
     guidespace -- space of left margin line from page edge
     guidewidth -- width of left margin line
+    direct -- draw grid lines straight onto the canvas instead of via a Table
+    tiled -- fill each graph with a PDF tiling pattern of a single cell
+    seed -- seed for the rainbow coloring, None for a new pattern each time
+    pages -- number of identical pages, all sharing one drawing of the page
+    precision -- decimals of coordinates in compact content streams, None
+        to write them in full
+    compression -- zlib level of content streams, 0 (fastest) to 9
+        (smallest), None for the default
     """
 
-    page = canvas.Canvas(filename, pagesize=pagesize)
+    output = openOutput(filename)
+    page = newCanvas(output, pagesize, precision, compression)
+    beginRepeat(page, pages)
 
     if borderless:
-        above = 1 * inch
-        below = 0.3 * inch
-        cells_y = (pagesize[1] - above - below) / gridspace
-        grid_h = cells_y * gridspace
-        loc = (0, pagesize[1] - above - grid_h)
-        size = (pagesize[1], grid_h)
+        (loc, size) = borderlessSection('dual', pagesize)
         squareSection(
             page=page,
             location=loc,
@@ -327,6 +620,9 @@ def dual(
             linecolor=linecolor,
             boxcolor=boxcolor,
             bgndcolor=bgndcolor,
+            direct=direct,
+            tiled=tiled,
+            seed=seed,
             )
         if guideline:
             page.setStrokeColor(grey(boxcolor))
@@ -336,27 +632,13 @@ def dual(
 
         # dimensions and layout
 
-        (up_w, up_h) = (layout if layout > (0, 0) else (1, 1))
-        (page_w, page_h) = pagesize
-        area_w = (page_w - 2 * margins - (up_w - 1) * spacer) / up_w
-        area_h = (page_h - 2 * margins - (up_h - 1) * spacer) / up_h
-
-        if area_w < 0 or area_h < 0:
-            raise ValueError('Specified dimensions do not fit on page.')
-
-        frame_locs = list()
-
-        x = margins  # begin after left margin
-        for frame_x in xrange(up_w):
-            y = margins  # begin above lower margin
-            for frame_y in xrange(up_h):
-                frame_locs.append((x, y))
-                y += area_h + spacer
-            x += area_w + spacer
+        with stage('layout'):
+            ((area_w, area_h), frame_locs) = pageLayout(pagesize, margins,
+                                                        spacer, layout)
 
-        # draw result
+        # draw result, each distinct section only once
 
-        for loc in frame_locs:
+        def _drawSection(loc, n):
             squareSection(
                 page=page,
                 location=loc,
@@ -373,9 +655,19 @@ def dual(
                 linecolor=linecolor,
                 boxcolor=boxcolor,
                 bgndcolor=bgndcolor,
+                direct=direct,
+                tiled=tiled,
+                seed=(None if seed is None else seed + n),
                 )
 
-    placeLogo(margins, pagesize, canvas, quadrant=4)
+        # some viewers anchor tiling patterns to the page instead of the
+        # form, so tiled sections are drawn in place
+
+        repeatSection(page, (area_w, area_h), frame_locs, _drawSection,
+                      identical=not (rainbow or tiled))
+
+    placeLogo(margins, pagesize, page, quadrant=4)
+    endRepeat(page, pages)
 
     page.setTitle('Cartesian Graph Paper by Give Sheet')
     page.setAuthor('Andre Aboulian via Give Sheet')
@@ -389,11 +681,11 @@ def dual(
         'template',
         'paper',
         ])
-    page.save()
+    return saveOutput(page, filename, output)
 
 
 def dotted(
-    filename,
+    filename=None,
     pagesize=letter,
     margins=0.5 * inch,
     spacer=0.25 * inch,
@@ -409,13 +701,20 @@ def dotted(
     guideline=1,
     guidespace=1.25 * inch,
     guidewidth=1,
+    tiled=0,
+    fastdots=0,
+    seed=None,
+    pages=1,
+    precision=None,
+    compression=None,
     **excessParams
     ):
     """
    Generates a page of vertex-dotted grid paper.
 
     Keyword arguments:
-    filename -- output PDF document name
+    filename -- output PDF document name or writable binary stream; the PDF
+        bytes are returned if None
     pagesize -- size of page as (width, height) tuple
     margins -- size of margins around page
     spacer -- size of spacing between grids (if multiple)
@@ -431,15 +730,26 @@ def dotted(
     guideline -- flag for including the left margin line on borderless page
     guidespace -- space of left margin line from page edge
     guidewidth -- width of left margin line
+    tiled -- fill each grid with a PDF tiling pattern of a single dot
+    fastdots -- draw all dots of a grid as one path of round-capped strokes
+    seed -- seed for the rainbow coloring, None for a new pattern each time
+    pages -- number of identical pages, all sharing one drawing of the page
+    precision -- decimals of coordinates in compact content streams, None
+        to write them in full
+    compression -- zlib level of content streams, 0 (fastest) to 9
+        (smallest), None for the default
     """
 
-    page = canvas.Canvas(filename, pagesize=pagesize)
+    output = openOutput(filename)
+    page = newCanvas(output, pagesize, precision, compression)
+    beginRepeat(page, pages)
 
     if borderless:
+        (loc, size) = borderlessSection('dotted', pagesize)
         dotSection(
             page=page,
-            location=(0, 0),
-            size=pagesize,
+            location=loc,
+            size=size,
             gridspace=gridspace,
             dotsize=dotsize,
             boxline=0,
@@ -447,6 +757,9 @@ def dotted(
             dotcolor=dotcolor,
             boxcolor=boxcolor,
             bgndcolor=bgndcolor,
+            tiled=tiled,
+            fastdots=fastdots,
+            seed=seed,
             )
         if guideline:
             page.setStrokeColor(grey(boxcolor))
@@ -456,28 +769,13 @@ def dotted(
 
         # dimensions and layout
 
-        (up_w, up_h) = (layout if layout > (0, 0) else (1, 1))
-        (page_w, page_h) = pagesize
-        (area_w, area_h) = ((page_w - 2 * margins - (up_w - 1) * spacer)
-                            / up_w, (page_h - 2 * margins - (up_h - 1)
-                            * spacer) / up_h)
-
-        if area_w < 0 or area_h < 0:
-            raise ValueError('Specified dimensions do not fit on page.')
+        with stage('layout'):
+            ((area_w, area_h), frame_locs) = pageLayout(pagesize, margins,
+                                                        spacer, layout)
 
-        frame_locs = list()
+        # draw result, each distinct section only once
 
-        x = margins  # begin after left margin
-        for frame_x in xrange(up_w):
-            y = margins  # begin above lower margin
-            for frame_y in xrange(up_h):
-                frame_locs.append((x, y))
-                y += area_h + spacer
-            x += area_w + spacer
-
-        # draw result
-
-        for loc in frame_locs:
+        def _drawSection(loc, n):
             dotSection(
                 page=page,
                 location=loc,
@@ -489,9 +787,19 @@ def dotted(
                 dotcolor=dotcolor,
                 boxcolor=boxcolor,
                 bgndcolor=bgndcolor,
+                tiled=tiled,
+                fastdots=fastdots,
+                seed=(None if seed is None else seed + n),
                 )
 
-    placeLogo(margins, pagesize, canvas, quadrant=4)
+        # some viewers anchor tiling patterns to the page instead of the
+        # form, so tiled sections are drawn in place
+
+        repeatSection(page, (area_w, area_h), frame_locs, _drawSection,
+                      identical=not (rainbow or tiled))
+
+    placeLogo(margins, pagesize, page, quadrant=4)
+    endRepeat(page, pages)
 
     page.setTitle('Dotted Graph Paper by Give Sheet')
     page.setAuthor('Andre Aboulian via Give Sheet')
@@ -506,7 +814,7 @@ def dotted(
         'template',
         'paper',
         ])
-    page.save()
+    return saveOutput(page, filename, output)
 
 
 def dotSection(
@@ -520,6 +828,9 @@ def dotSection(
     dotcolor,
     boxcolor,
     bgndcolor,
+    tiled=0,
+    fastdots=0,
+    seed=None,
     **excessParams
     ):
     """
@@ -536,6 +847,9 @@ def dotSection(
     dotcolor -- color of dot at each cell vertex
     boxcolor -- color of box surrounding graph(s)
     bgndcolor -- color of grid background
+    tiled -- fill the grid with a PDF tiling pattern of a single dot
+    fastdots -- draw all dots as one path of round-capped strokes
+    seed -- seed for the rainbow coloring, None for a random pattern
     """
 
     # dimensions and spacing
@@ -543,9 +857,7 @@ def dotSection(
     (area_w, area_h) = size
     (loc_x, loc_y) = location
 
-    (cells_x, cells_y) = (int(area_w / gridspace), int(area_h / gridspace))
-    if cells_x < 1 or cells_y < 1:
-        raise ValueError('Specified dimensions do not fit on page.')
+    (cells_x, cells_y) = gridCells(size, gridspace)
 
     grid_w = cells_x * gridspace
     grid_h = cells_y * gridspace
@@ -572,32 +884,64 @@ def dotSection(
 
     # starting position and number of dots
 
-    x = loc_x + xMargins
+    (x, y_start) = (loc_x + xMargins, loc_y + yMargins)
     if not outerDots:
-        x += gridspace
+        (x, y_start) = (x + gridspace, y_start + gridspace)
         (dots_x, dots_y) = (cells_x - 1, cells_y - 1)
     else:
         (dots_x, dots_y) = (cells_x + 1, cells_y + 1)
 
+    count('dots', dots_x * dots_y)
+
     # draw dots
 
-    rainbow_pattern = rainbowGrid((dots_x, dots_y), darkness=50)
-    for vert_x in xrange(dots_x):
-        y = loc_y + yMargins
-        if not outerDots:
-            y += gridspace
-        for vert_y in xrange(dots_y):
-            if rainbow:
-                page.setFillColor(rainbow_pattern[vert_x][vert_y])
-                page.setLineWidth(dotsize / 10)
-                page.setStrokeColor(grey(30))
-                page.circle(x_cen=x, y_cen=y, r=dotsize / 2, stroke=0, fill=1)
-            else:
-                page.setFillColor(grey(dotcolor))
-                page.circle(x_cen=x, y_cen=y, r=dotsize / 2, stroke=0, fill=1)
+    if tiled and not rainbow:
+
+        # one dot centered in each cell of the pattern
+
+        (x, y) = (x - 0.5 * gridspace, y_start - 0.5 * gridspace)
 
-            y += gridspace
-        x += gridspace
+        path = PDFPathObject()
+        path.circle(0.5 * gridspace, 0.5 * gridspace, dotsize / 2)
+        code = colorCode(grey(dotcolor)) + '\n' + path.getCode() + ' f'
+        name = tilingPattern(page, (gridspace, gridspace), code, origin=(x,
+                             y))
+        fillPattern(page, name, x, y, dots_x * gridspace, dots_y
+                    * gridspace)
+        return
+
+    # one path and one fill for each dot color
+
+    if rainbow:
+        with stage('rainbow'):
+            buckets = rainbowBuckets((dots_x, dots_y), darkness=50, seed=seed)
+    else:
+        buckets = [(grey(dotcolor), [(vert_x, vert_y) for vert_x in
+                   xrange(dots_x) for vert_y in xrange(dots_y)])]
+
+    page.saveState()
+    page.setLineCap(1)
+    page.setLineWidth(dotsize)
+    for (color, members) in buckets:
+        path = page.beginPath()
+        for (vert_x, vert_y) in members:
+            (dot_x, dot_y) = (x + vert_x * gridspace, y_start + vert_y
+                              * gridspace)
+            if fastdots:
+
+                # zero-length strokes with round caps are drawn as dots
+
+                path.moveTo(dot_x, dot_y)
+                path.lineTo(dot_x, dot_y)
+            else:
+                path.circle(dot_x, dot_y, dotsize / 2)
+        if fastdots:
+            page.setStrokeColor(color)
+            page.drawPath(path, stroke=1, fill=0)
+        else:
+            page.setFillColor(color)
+            page.drawPath(path, stroke=0, fill=1)
+    page.restoreState()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,373 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from catalog import readSignature
+
+# memoised page layouts as (pagesize, margins, spacer, layout): layout
+
+_layouts = dict()
+_MAX_LAYOUTS = 4096
+
+# spacing of the todo lists, shared with todo.itemizedTodo
+
+KEY_H = 24  # height of the 'Week' box
+KEY_W = 150  # width of the 'Week' box
+KEY_SPACER_ABOVE = 0  # space between 'Week' and top margin
+KEY_SPACER_BELOW = 4  # space between 'Week' and grid beneath
+DAYS_LABEL_SIZE = 12  # height of the row of day labels
+MAX_TOPIC_LEN = 40  # characters in a topic
+HOUR_LABEL_W = 36  # width of the column of hours in a time schedule
+
+# spacing of the calendars, shared with calendars
+
+TITLE_H = 36  # height of the month or year title
+WEEKS = 6  # rows of a month, enough for any month
+MONTH_LABEL_SIZE = 16  # height of the name of a month in a year overview
+DAY_LABEL_W = 18  # width of the column of dates in a cascading year
+
+MM = 72.0 / 25.4
+INCH = 72.0
+
+# margins of borderless pages, shared with graph.dual and lined
+
+DUAL_ABOVE = 1 * INCH  # space above the grid of a dual page
+DUAL_BELOW = 0.3 * INCH  # space below the grid of a dual page
+RULE_ABOVE = 1 * INCH  # space above the first line of a lined page
+RULE_BELOW = 0.25 * INCH  # minimum space below the last line of a lined page
+
+
+def pageLayout(pagesize, margins, spacer, layout):
+    """
+    Returns the sections of a page as ((width, height), locations), where
+    locations is a tuple of (x, y) tuples for the lower left of each
+    section, column by column from the lower left. Results are memoised.
+
+    Keyword arguments:
+    pagesize -- size of page as (width, height) tuple
+    margins -- size of margins around page
+    spacer -- size of spacing between sections
+    layout -- number of sections per page in (x, y) tuple
+    """
+
+    key = (tuple(pagesize), margins, spacer, tuple(layout))
+    result = _layouts.get(key)
+    if result is not None:
+        return result
+
+    (up_w, up_h) = (tuple(layout) if tuple(layout) > (0, 0) else (1, 1))
+    (page_w, page_h) = pagesize
+    area_w = (page_w - 2 * margins - (up_w - 1) * spacer) / up_w
+    area_h = (page_h - 2 * margins - (up_h - 1) * spacer) / up_h
+
+    if area_w < 0 or area_h < 0:
+        raise ValueError('Specified dimensions do not fit on page.')
+
+    locations = list()
+
+    x = margins  # begin after left margin
+    for frame_x in xrange(up_w):
+        y = margins  # begin above lower margin
+        for frame_y in xrange(up_h):
+            locations.append((x, y))
+            y += area_h + spacer
+        x += area_w + spacer
+
+    if len(_layouts) >= _MAX_LAYOUTS:
+        _layouts.clear()
+    result = _layouts[key] = ((area_w, area_h), tuple(locations))
+    return result
+
+
+def borderlessSection(name, pagesize):
+    """
+    Returns the single section of a borderless page as ((x, y), (width,
+    height)). Most generators fill the page; a dual grid leaves space above
+    and below it, and is as wide as the page is tall, running off the right
+    edge of a portrait page.
+
+    Keyword arguments:
+    name -- name of the generator, a key of catalog.GENERATORS
+    pagesize -- size of page as (width, height) tuple
+    """
+
+    (page_w, page_h) = pagesize
+    if name == 'dual':
+        grid_h = page_h - DUAL_ABOVE - DUAL_BELOW
+        return ((0, page_h - DUAL_ABOVE - grid_h), (page_h, grid_h))
+    return ((0, 0), (page_w, page_h))
+
+
+def gridCells(size, gridspace):
+    """
+    Returns the number of whole grid cells in a section as (x, y) tuple.
+
+    Keyword arguments:
+    size -- size of the section as (width, height) tuple
+    gridspace -- size of individual grid cells
+    """
+
+    (area_w, area_h) = size
+    (cells_x, cells_y) = (int(area_w / gridspace), int(area_h / gridspace))
+
+    if cells_x < 1 or cells_y < 1:
+        raise ValueError('Specified dimensions do not fit on page.')
+
+    return (cells_x, cells_y)
+
+
+def ruleLines(height, padding, spacing, above, below):
+    """
+    Returns the number of ruled lines that fit in a section.
+
+    Keyword arguments:
+    height -- height of the section
+    padding -- separation from boundaries of section on each side
+    spacing -- spacing between the lines
+    above -- space above the first line
+    below -- minimum space below the last line
+    """
+
+    lines = int((height - 2 * padding - above - below) / spacing) + 1
+    if lines < 2:
+        raise ValueError('The specified area does not fit any lines.')
+
+    return lines
+
+
+def calendarCells(size, columns, rows, above):
+    """
+    Returns the size of the cells of a calendar grid as (width, height)
+    tuple.
+
+    Keyword arguments:
+    size -- size of the section holding the grid as (width, height) tuple
+    columns -- number of columns of the grid
+    rows -- number of rows of the grid
+    above -- space of titles and labels above the grid
+    """
+
+    (area_w, area_h) = size
+    (cell_w, cell_h) = (area_w / columns, (area_h - above) / rows)
+
+    if cell_w <= 0 or cell_h <= 0:
+        raise ValueError('Specified dimensions do not fit on page.')
+
+    return (cell_w, cell_h)
+
+
+def scheduleHours(timerange):
+    """
+    Returns the hours of a time schedule, one per row, from the start to
+    the stop of its time range.
+
+    Keyword arguments:
+    timerange -- (start, stop) tuple of hours in range [0,23]
+    """
+
+    (start, stop) = timerange
+    if not 0 <= start <= stop <= 23:
+        raise ValueError('Time range should be a (start, stop) tuple of '
+                         'hours in range [0,23].')
+
+    return range(start, stop + 1)
+
+
+def todoLayout(pagesize, margins, halfpage, booklet, binding):
+    """
+    Returns the grids of a todo list as a list of (origin, size, side)
+    tuples, where side is 'left' or 'right' for the halves of a booklet
+    and 'both' otherwise.
+
+    Keyword arguments:
+    pagesize -- size of page as drawn, landscape unless halfpage
+    margins -- size of margins around page
+    halfpage -- two half-page duplicates, else one full-page spread
+    booklet -- flag to split columns evenly among two pages
+    binding -- size of spacing between designated pages
+    """
+
+    (page_w, page_h) = pagesize
+
+    grids = list()
+
+    if halfpage:
+
+        # orgin -- lower left corner
+        # area -- space occupied by week layout
+        # grid -- space occupied by individual grids
+
+        (area_w, area_h) = (page_w - 2 * margins, (page_h - 4 * margins) / 2)
+        grid_h = area_h - KEY_H - KEY_SPACER_ABOVE - KEY_SPACER_BELOW
+
+        if booklet:
+
+            # half page booklet
+
+            grid_size = ((area_w - 2 * binding) / 2, grid_h)
+            grids.append(((margins, margins), grid_size, 'left'))
+            grids.append(((page_w / 2 + binding, margins), grid_size,
+                         'right'))
+            grids.append(((margins, page_h / 2 + margins), grid_size,
+                         'left'))
+            grids.append(((page_w / 2 + binding, page_h / 2 + margins),
+                         grid_size, 'right'))
+        else:
+
+            # half page spread
+
+            grids.append(((margins, page_h / 2 + margins), (area_w, grid_h),
+                         'both'))
+            grids.append(((margins, margins), (area_w, grid_h), 'both'))
+    else:
+
+        (area_w, area_h) = (page_w - 2 * margins, page_h - 2 * margins)
+        grid_h = area_h - KEY_H - KEY_SPACER_ABOVE - KEY_SPACER_BELOW
+
+        if booklet:
+
+            # full page booklet
+
+            grid_size = ((area_w - 2 * binding) / 2, grid_h)
+            grids.append(((margins, margins), grid_size, 'left'))
+            grids.append(((page_w / 2 + binding, margins), grid_size,
+                         'right'))
+        else:
+
+            # full page spread
+
+            grids.append(((margins, margins), (area_w, grid_h), 'both'))
+
+    return grids
+
+
+def dryRun(name, params):
+    """
+    Validates a generator call without rendering it or importing ReportLab,
+    and returns its geometry as a dict with keys 'pagesize' and 'sections',
+    a list of ((x, y), (width, height)) tuples, and 'cells', 'lines',
+    'items' or 'hours' as drawn in each section. Raises ValueError for a
+    call that would fail to fit, like the generator itself.
+
+    Topic widths of todo lists depend on font metrics, so only their
+    heights and lengths are checked.
+
+    Keyword arguments:
+    name -- name of the generator, a key of catalog.GENERATORS
+    params -- dict of keyword arguments for the generator
+    """
+
+    args = dict((arg, default) for (arg, default, description) in
+                readSignature(name))
+    args.update((arg, value) for (arg, value) in params.items() if arg
+                in args)
+
+    pagesize = tuple(args['pagesize'])
+    geometry = {'pagesize': pagesize}
+
+    if name == 'itemizedTodo':
+        items = args['items'] or ['']
+        for item in items:
+            if len(item) > MAX_TOPIC_LEN:
+                raise ValueError("The topic '" + item + "' is "
+                                 + str(len(item))
+                                 + ' characters but should be under '
+                                 + str(MAX_TOPIC_LEN) + ' characters.')
+        if not args['halfpage']:
+            pagesize = geometry['pagesize'] = pagesize[::-1]
+        grids = todoLayout(pagesize, args['margins'], args['halfpage'],
+                           args['booklet'], args['binding'])
+        for (origin, (grid_w, grid_h), side) in grids:
+            if grid_w < 0 or grid_h - DAYS_LABEL_SIZE < 0:
+                raise ValueError('Specified dimensions do not fit on page.')
+        geometry['sections'] = [(origin, size) for (origin, size, side) in
+                                grids]
+        geometry['items'] = len(items)
+        return geometry
+
+    if name == 'timeSchedule':
+        hours = scheduleHours(args['timerange'])
+        if args['weeks'] < 1:
+            raise ValueError('A schedule has at least one week.')
+        if not args['halfpage']:
+            pagesize = geometry['pagesize'] = pagesize[::-1]
+        grids = todoLayout(pagesize, args['margins'], args['halfpage'],
+                           args['booklet'], args['binding'])
+        for (origin, (grid_w, grid_h), side) in grids:
+            if grid_w - HOUR_LABEL_W < 0 or grid_h - DAYS_LABEL_SIZE < 0:
+                raise ValueError('Specified dimensions do not fit on page.')
+        geometry['sections'] = [(origin, size) for (origin, size, side) in
+                                grids]
+        geometry['hours'] = len(hours)
+        geometry['pages'] = args['weeks']
+        return geometry
+
+    if name in ('monthCalendar', 'yearOverview', 'cascadingYear'):
+        return _calendarGeometry(name, args, geometry)
+
+    if args['borderless']:
+        sections = [borderlessSection(name, pagesize)]
+    else:
+        (size, locations) = pageLayout(pagesize, args['margins'],
+                                       args['spacer'], args['layout'])
+        sections = [(loc, size) for loc in locations]
+    geometry['sections'] = sections
+    size = sections[0][1]
+
+    if name == 'lined':
+        if args['borderless']:
+            geometry['lines'] = ruleLines(size[1], 0, args['linespace'],
+                                          RULE_ABOVE, RULE_BELOW)
+        else:
+            geometry['lines'] = ruleLines(size[1], 2 * MM,
+                                          args['linespace'],
+                                          args['linespace'],
+                                          args['linespace'] / 4)
+    else:
+        geometry['cells'] = gridCells(size, args['gridspace'])
+        if args.get('checkered') and args['rainbow']:
+            raise ValueError('Grid pattern cannot be both rainbow and '
+                             'checekred.')
+
+    return geometry
+
+
+def _calendarGeometry(name, args, geometry):
+    """
+    Completes the dry run geometry of a calendar, whose 'cells' are the
+    (columns, rows) of its grids and 'pages' the number of pages.
+    """
+
+    (page_w, page_h) = geometry['pagesize']
+    margins = args['margins']
+
+    month = args.get('month')
+    if month is not None and not 1 <= month <= 12:
+        raise ValueError('Month should be in range [1,12].')
+
+    if name == 'monthCalendar':
+        (page_w, page_h) = geometry['pagesize'] = (page_h, page_w)
+        size = (page_w - 2 * margins, page_h - 2 * margins)
+        calendarCells(size, 7, WEEKS, TITLE_H + DAYS_LABEL_SIZE)
+        geometry['sections'] = [((margins, margins), size)]
+        geometry['cells'] = (7, WEEKS)
+        geometry['pages'] = args['months']
+    elif name == 'yearOverview':
+        (size, locations) = pageLayout((page_w, page_h - TITLE_H), margins,
+                                       args['spacer'], args['layout'])
+        if len(locations) < 12:
+            raise ValueError('The layout has fewer than 12 sections.')
+        calendarCells(size, 7, WEEKS, MONTH_LABEL_SIZE + DAYS_LABEL_SIZE)
+        geometry['sections'] = [(loc, size) for loc in locations[:12]]
+        geometry['cells'] = (7, WEEKS)
+        geometry['pages'] = args['years']
+    else:
+        size = (page_w - 2 * margins - DAY_LABEL_W, page_h - 2 * margins)
+        calendarCells(size, 12, 31, TITLE_H + DAYS_LABEL_SIZE)
+        geometry['sections'] = [((margins + DAY_LABEL_W, margins), size)]
+        geometry['cells'] = (12, 31)
+        geometry['pages'] = args['years']
+
+    if geometry['pages'] < 1:
+        raise ValueError('A calendar has at least one page.')
+
+    return geometry
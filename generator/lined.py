@@ -1,18 +1,21 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch, mm
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
-from reportlab.platypus import Table, TableStyle, Frame
 
 from logo import placeLogo
-from coloring import grey, rainbowRow
+from support import beginRepeat, endRepeat, repeatSection, \
+    openOutput, newCanvas, saveOutput
+from coloring import grey, rainbowRowBuckets
+from profiling import stage, count
+from layout import pageLayout, ruleLines, borderlessSection, \
+    RULE_ABOVE, RULE_BELOW
 
 
 def lined(
-    filename,
+    filename=None,
     pagesize=letter,
     margins=0.5 * inch,
     spacer=0.25 * inch,
@@ -28,12 +31,17 @@ def lined(
     guideline=1,
     guidespace=1.25 * inch,
     guidewidth=1,
+    seed=None,
+    pages=1,
+    precision=None,
+    compression=None,
     **excessParams
     ):
     """
     Generates a page of lined paper.
 
-    filename -- output PDF document name
+    filename -- output PDF document name or writable binary stream; the PDF
+        bytes are returned if None
     pagesize -- size of page as (width, height) tuple
     margins -- size of margins around page
     spacer -- size of spacing between graphs
@@ -49,22 +57,32 @@ def lined(
     guideline -- flag for including the left margin line on borderless page
     guidespace -- space of left margin line from page edge
     guidewidth -- width of left margin line
+    seed -- seed for the rainbow coloring, None for a new pattern each time
+    pages -- number of identical pages, all sharing one drawing of the page
+    precision -- decimals of coordinates in compact content streams, None
+        to write them in full
+    compression -- zlib level of content streams, 0 (fastest) to 9
+        (smallest), None for the default
     """
 
-    page = canvas.Canvas(filename, pagesize=pagesize)
+    output = openOutput(filename)
+    page = newCanvas(output, pagesize, precision, compression)
+    beginRepeat(page, pages)
 
     if borderless:
+        (loc, size) = borderlessSection('lined', pagesize)
         ruleSection(
             page,
-            (0, 0),
-            pagesize,
+            loc,
+            size,
             padding=0,
             spacing=linespace,
-            above=1 * inch,
-            below=0.25 * inch,
+            above=RULE_ABOVE,
+            below=RULE_BELOW,
             rainbow=rainbow,
             linecolor=linecolor,
             linewidth=linewidth,
+            seed=seed,
             )
         if guideline:
             page.setStrokeColor(grey(linecolor))
@@ -74,28 +92,13 @@ def lined(
 
         # dimensions and layout
 
-        (up_w, up_h) = (layout if layout > (0, 0) else (1, 1))
-        (page_w, page_h) = pagesize
-        (area_w, area_h) = ((page_w - 2 * margins - (up_w - 1) * spacer)
-                            / up_w, (page_h - 2 * margins - (up_h - 1)
-                            * spacer) / up_h)
+        with stage('layout'):
+            ((area_w, area_h), frame_locs) = pageLayout(pagesize, margins,
+                                                        spacer, layout)
 
-        if area_w < 0 or area_h < 0:
-            raise ValueError('Specified dimensions do not fit on page.')
+        # draw result, each distinct section only once
 
-        frame_locs = list()
-
-        x = margins  # begin after left margin
-        for frame_x in xrange(up_w):
-            y = margins  # begin above lower margin
-            for frame_y in xrange(up_h):
-                frame_locs.append((x, y))
-                y += area_h + spacer
-            x += area_w + spacer
-
-        # draw result
-
-        for loc in frame_locs:
+        def _drawSection(loc, n):
 
             # draw surrounding box
 
@@ -126,9 +129,14 @@ def lined(
                 rainbow=rainbow,
                 linecolor=linecolor,
                 linewidth=linewidth,
+                seed=(None if seed is None else seed + n),
                 )
 
-    placeLogo(margins, pagesize, canvas, quadrant=4)
+        repeatSection(page, (area_w, area_h), frame_locs, _drawSection,
+                      identical=not rainbow)
+
+    placeLogo(margins, pagesize, page, quadrant=4)
+    endRepeat(page, pages)
 
     page.setTitle('Lined Paper by Give Sheet')
     page.setAuthor('Andre Aboulian via Give Sheet')
@@ -143,7 +151,7 @@ def lined(
         'paper',
         'page',
         ])
-    page.save()
+    return saveOutput(page, filename, output)
 
 
 def ruleSection(
@@ -158,6 +166,7 @@ def ruleSection(
     linecolor=50,
     linewidth=0.5,
     boundingbox=0,
+    seed=None,
     ):
     """
     Places a quantity of ruled lines in the specified section.
@@ -174,6 +183,7 @@ def ruleSection(
     linecolor -- color of each line
     linewidth -- width of each line
     boundingbox -- draws a box around the section for debugging
+    seed -- seed for the rainbow coloring, None for a random pattern
     """
 
     page.saveState()
@@ -190,12 +200,9 @@ def ruleSection(
     (loc_x, loc_y) = loc
     (width, height) = size
 
-    area_w = width - 2 * padding
-    area_h = height - 2 * padding
+    lines = ruleLines(height, padding, spacing, above, below)
 
-    lines = int((area_h - above - below) / spacing) + 1
-    if lines < 2:
-        raise ValueError('The specified area does not fit any lines.')
+    count('lines', lines)
 
     # draw bounding box
 
@@ -211,15 +218,22 @@ def ruleSection(
     page.setStrokeColor(grey(linecolor))
 
     if rainbow:
-        pattern = rainbowRow(lines, darkness=40)
+        with stage('rainbow'):
+            buckets = rainbowRowBuckets(lines, darkness=40, seed=seed)
+    else:
+        buckets = [(grey(linecolor), xrange(lines))]
+
+    # one path and one stroke for each line color
 
     y = loc_y + height - padding - above
     (x_left, x_right) = (loc_x + padding, loc_x + width - padding)
-    for i in xrange(lines):
-        if rainbow:
-            page.setStrokeColor(pattern[i])
-        page.line(x_left, y, x_right, y)
-        y -= spacing
+    for (color, members) in buckets:
+        path = page.beginPath()
+        for i in members:
+            path.moveTo(x_left, y - i * spacing)
+            path.lineTo(x_right, y - i * spacing)
+        page.setStrokeColor(color)
+        page.drawPath(path, stroke=1, fill=0)
 
     page.restoreState()
 
@@ -1,10 +1,2 @@
-import math
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch, cm, mm
-from reportlab.platypus import Frame
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib import colors
-from reportlab.platypus import BaseDocTemplate, SimpleDocTemplate, Table, TableStyle, Frame
-
 def placeLogo(margins,canvas,pagesize,quadrant=4):
     pass
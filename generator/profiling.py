@@ -0,0 +1,156 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import threading
+import time
+
+clock = getattr(time, 'perf_counter', time.time)
+
+# the profile recording on each thread, if any
+
+_local = threading.local()
+
+
+class _NoStage(object):
+    """
+    Stage used while nothing is recorded; entering and leaving it is free.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOSTAGE = _NoStage()
+
+
+def stage(name):
+    """
+    Returns a context manager timing the enclosed code as a named stage of
+    the profile recording on this thread, if any.
+
+    Keyword arguments:
+    name -- name of the stage, such as 'layout' or 'save'
+    """
+
+    profile = getattr(_local, 'profile', None)
+    if profile is None:
+        return _NOSTAGE
+    return _Stage(profile, name)
+
+
+def count(kind, n=1):
+    """
+    Counts drawn primitives in the innermost stage of the profile recording
+    on this thread, if any.
+
+    Keyword arguments:
+    kind -- kind of primitive, such as 'cells', 'lines' or 'dots'
+    n -- number of primitives
+    """
+
+    profile = getattr(_local, 'profile', None)
+    if profile is not None:
+        profile._count(kind, n)
+
+
+class Profile(object):
+    """
+    Records the stages and primitive counts of the renders on this thread
+    while in a 'with' block.
+
+        with Profile(callback=report, trace='render.json') as profile:
+            cartesian('grid.pdf', gridspace=5)
+
+    Afterwards, 'stages' holds the total seconds and 'counts' the total
+    primitives by name, and 'events' lists every stage as a tuple of
+    (name, start, seconds, counts).
+
+    Keyword arguments:
+    callback -- function of (name, seconds, counts) called as each stage
+        finishes, where counts holds the primitives counted in the stage
+    trace -- file name of a Chrome trace-event JSON file written on exit
+    """
+
+    def __init__(self, callback=None, trace=None):
+        self.callback = callback
+        self.trace = trace
+        self.stages = dict()
+        self.counts = dict()
+        self.events = list()
+        self._open = list()
+
+    def __enter__(self):
+        self._outer = getattr(_local, 'profile', None)
+        _local.profile = self
+        self._start = clock()
+        return self
+
+    def __exit__(self, *exc):
+        _local.profile = self._outer
+        if self.trace is not None:
+            self.writeTrace(self.trace)
+        return False
+
+    def writeTrace(self, filename):
+        """
+        Writes the recorded stages as a Chrome trace-event JSON file, to be
+        opened in chrome://tracing or Perfetto.
+
+        Keyword arguments:
+        filename -- output file name
+        """
+
+        (pid, tid) = (os.getpid(), threading.current_thread().ident)
+        events = [{
+            'name': name,
+            'cat': 'givesheet',
+            'ph': 'X',
+            'ts': round((start - self._start) * 1e6, 1),
+            'dur': round(seconds * 1e6, 1),
+            'pid': pid,
+            'tid': tid,
+            'args': counts,
+            } for (name, start, seconds, counts) in self.events]
+
+        with open(filename, 'w') as trace:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'},
+                      trace)
+
+    def _count(self, kind, n):
+        self.counts[kind] = self.counts.get(kind, 0) + n
+        if self._open:
+            counts = self._open[-1]
+            counts[kind] = counts.get(kind, 0) + n
+
+    def _finish(self, name, start, counts):
+        seconds = clock() - start
+        self.stages[name] = self.stages.get(name, 0) + seconds
+        self.events.append((name, start, seconds, counts))
+        if self.callback is not None:
+            self.callback(name, seconds, counts)
+
+
+class _Stage(object):
+    """
+    A single timed stage of a Profile.
+    """
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.counts = dict()
+        self.profile._open.append(self.counts)
+        self.start = clock()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile._open.pop()
+        self.profile._finish(self.name, self.start, self.counts)
+        return False
@@ -0,0 +1,288 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import copy
+import hashlib
+import json
+import re
+from os import path
+
+import support
+from catalog import getGenerator, normalizeParams
+from profiling import stage
+
+PROGRAM_VERSION = 1
+
+# resource names in recorded code that are renamed for the replaying document
+
+_RESOURCE = re.compile(r'/(?:F\d+|Ptn\d+|FormXob\.\w+)')
+
+
+def _recordingCanvas(recorded):
+    """
+    Returns a Canvas subclass that keeps the operators of every page and
+    form instead of writing a document, appending each instance to the
+    recorded list.
+    """
+
+    from reportlab.pdfgen.canvas import Canvas
+
+    class RecordingCanvas(Canvas):
+
+        def __init__(self, *args, **kwargs):
+            Canvas.__init__(self, *args, **kwargs)
+            self.program = {
+                'version': PROGRAM_VERSION,
+                'fonts': [],
+                'patterns': [],
+                'forms': [],
+                'pages': [],
+                'info': {},
+                }
+            recorded.append(self)
+
+        def showPage(self):
+            self.program['pages'].append([list(self._pagesize),
+                                         '\n'.join(self._code),
+                                         list(self._formsinuse)])
+            Canvas.showPage(self)
+
+        def endForm(self, **extra):
+            (name, lx, ly, ux, uy) = self._formData
+            self.program['forms'].append([name, [lx, ly, ux, uy],
+                                         '\n'.join(self._code),
+                                         list(self._formsinuse)])
+            Canvas.endForm(self, **extra)
+
+        def save(self):
+            if len(self._code):
+                self.showPage()
+            _recordResources(self._doc, self.program)
+
+    return RecordingCanvas
+
+
+def _recordResources(doc, program):
+    """
+    Adds the fonts, tiling patterns and document info used in a recorded
+    document to its program.
+    """
+
+    from reportlab.pdfbase import pdfmetrics
+
+    selfPath = path.dirname(path.abspath(__file__))
+    fonts = sorted(doc.fontMapping.items(), key=lambda item:
+                   int(item[1][2:]))
+    for (fontname, internal) in fonts:
+        font = pdfmetrics.getFont(fontname)
+        if not font._dynamicFont:
+            program['fonts'].append([fontname, internal, None])
+            continue
+        state = font.state[doc]
+        program['fonts'].append([fontname, internal, {
+            'file': path.relpath(font.face.filename, selfPath),
+            'subsets': state.subsets,
+            'assignments': sorted(state.assignments.items()),
+            'nextCode': state.nextCode,
+            }])
+
+    patterns = getattr(doc, '_tilingPatterns', {})
+    for ((step, origin, code), name) in sorted(patterns.items(),
+            key=lambda item: int(item[1][3:])):
+        program['patterns'].append([name, list(step), list(origin), code])
+
+    for key in ('title', 'author', 'subject', 'keywords'):
+        program['info'][key] = getattr(doc.info, key)
+
+    # features such as color alpha raise the PDF version of the header
+
+    program['pdfVersion'] = list(doc._pdfVersion)
+
+    # forms are renamed by content, so programs never clash in a document
+
+    key = hashlib.sha1(json.dumps([program['forms'], program['pages'
+                       ]]).encode('utf-8')).hexdigest()[:12]
+    names = dict(('/FormXob.' + form[0], '/FormXob.' + form[0] + '_'
+                 + key) for form in program['forms'])
+    for form in program['forms']:
+        form[0] = form[0] + '_' + key
+    for chunk in program['forms'] + program['pages']:
+        chunk[-2] = _rename(chunk[-2], names)
+        chunk[-1] = [name + '_' + key for name in chunk[-1]]
+
+
+def compileProgram(name, params):
+    """
+    Returns the page program of a generator call: a JSON-serialisable dict
+    of the PDF operators of its pages and forms, with the fonts and tiling
+    patterns they use. Replaying a program skips all layout, Table and
+    Paragraph work of the generator. Rainbow colorings are fixed when the
+    program is compiled, whatever the seed.
+
+    Keyword arguments:
+    name -- name of the generator, a key of catalog.GENERATORS
+    params -- dict of keyword arguments for the generator
+    """
+
+    recorded = list()
+    with support.useCanvas(_recordingCanvas(recorded)):
+        getGenerator(name)(None, **normalizeParams(name, params))
+
+    return recorded[-1].program
+
+
+def _adoptState(font, doc, recorded):
+    """
+    Gives a dynamic font the character assignments of a recorded program in
+    a document, unless the document already assigned them differently.
+    """
+
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    assignments = dict((char, code) for (char, code) in
+                       recorded['assignments'])
+    state = font.state.get(doc)
+    if state is None:
+        state = font.state[doc] = TTFont.State(font._asciiReadable)
+
+    current = state.assignments
+    if all(current.get(char) == code for (char, code) in
+           assignments.items()):
+        return
+    if state.frozen or any(assignments.get(char) != code for (char,
+                           code) in current.items()):
+        raise ValueError("Font '" + font.fontName + "' is already used "
+                         'differently in this document; replay onto a new '
+                         'canvas.')
+
+    state.subsets = copy.deepcopy(recorded['subsets'])
+    state.assignments = assignments
+    state.nextCode = recorded['nextCode']
+
+
+def _resourceNames(program, page):
+    """
+    Registers the fonts and patterns of a program in the document of
+    a Canvas, and returns the renaming of its recorded resource names.
+    """
+
+    from reportlab.pdfbase import pdfmetrics
+    from tiling import tilingPattern
+
+    doc = page._doc
+    names = dict()
+
+    for (fontname, internal, state) in program['fonts']:
+        if state is None:
+            names[internal] = doc.getInternalFontName(fontname)
+            continue
+        support.registerFonts([(fontname, state['file'])])
+        font = pdfmetrics.getFont(fontname)
+        _adoptState(font, doc, state)
+        names[internal] = font.getSubsetInternalName(0, doc).split('+')[0]
+
+    for (name, step, origin, code) in program['patterns']:
+        names['/' + name] = '/' + tilingPattern(page, step, code, origin)
+
+    return names
+
+
+def _rename(code, names):
+    return _RESOURCE.sub(lambda match: names.get(match.group(0),
+                         match.group(0)), code)
+
+
+def replayProgram(program, page):
+    """
+    Draws the pages of a program onto a Canvas, each followed by showPage.
+    The Canvas may be any ReportLab Canvas, including one that already has
+    pages of its own; the forms of a program are only stored once however
+    often it is replayed into the same document.
+
+    Keyword arguments:
+    program -- dict returned by compileProgram, or loaded from its JSON
+    page -- a Canvas instance on which to draw
+    """
+
+    for n in iterReplay(program, page):
+        pass
+
+
+def iterReplay(program, page, pages=None):
+    """
+    Draws the pages of a program onto a Canvas like replayProgram, but as a
+    generator yielding the number of each page once it is shown.
+
+    Keyword arguments:
+    program -- dict returned by compileProgram, or loaded from its JSON
+    page -- a Canvas instance on which to draw
+    pages -- iterable of entries of program['pages'] to draw in turn, such
+        as one repeated; all pages of the program if None
+    """
+
+    if program.get('version') != PROGRAM_VERSION:
+        raise ValueError('Unsupported page program version.')
+
+    with stage('replay'):
+        doc = page._doc
+        doc._pdfVersion = max(doc._pdfVersion, tuple(program.get(
+                              'pdfVersion', doc._pdfVersion)))
+        names = _resourceNames(program, page)
+        identity = all(old == new for (old, new) in names.items())
+
+        def _code(code):
+            return (code if identity else _rename(code, names))
+
+        for (name, (lx, ly, ux, uy), code, forms) in program['forms']:
+            if page.hasForm(name):
+                continue
+            page.beginForm(name, lx, ly, ux, uy)
+            page._code.append(_code(code))
+            page._formsinuse.extend(forms)
+            page.endForm()
+
+    size = page._pagesize
+    for (n, (pagesize, code, forms)) in enumerate(program['pages']
+            if pages is None else pages):
+        with stage('replay'):
+            page.setPageSize(tuple(pagesize))
+            page._code.append(_code(code))
+            page._formsinuse.extend(forms)
+            page.showPage()
+        yield n
+    page.setPageSize(size)
+
+
+def renderProgram(program, filename=None):
+    """
+    Renders a program as a document of its own, like the generator call it
+    was compiled from.
+
+    Keyword arguments:
+    program -- dict returned by compileProgram, or loaded from its JSON
+    filename -- output PDF document name or writable binary stream; the
+        PDF bytes are returned if None
+    """
+
+    output = support.openOutput(filename)
+    page = support.newCanvas(output, tuple(program['pages'][0][0]))
+    setInfo(program, page)
+    replayProgram(program, page)
+    return support.saveOutput(page, filename, output)
+
+
+def setInfo(program, page):
+    """
+    Sets the title, author, subject and keywords of the document of a
+    Canvas to those recorded in a program.
+
+    Keyword arguments:
+    program -- dict returned by compileProgram, or loaded from its JSON
+    page -- a Canvas instance
+    """
+
+    info = program['info']
+    page.setTitle(info['title'])
+    page.setAuthor(info['author'])
+    page.setSubject(info['subject'])
+    page.setKeywords(info['keywords'])
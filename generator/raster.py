@@ -0,0 +1,556 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import struct
+import zlib
+
+import numpy
+
+from catalog import readSignature
+from layout import pageLayout, gridCells, ruleLines, borderlessSection, \
+    RULE_ABOVE, RULE_BELOW, MM
+from profiling import stage, count
+
+DEFAULT_DPI = 150
+
+# generators drawn by the raster backend; todo lists hold text, which only
+# the PDF renders
+
+RASTER_GENERATORS = ('cartesian', 'dual', 'dotted', 'lined')
+
+
+class _Raster(object):
+    """
+    Pixel buffer of a page, drawn in points from the lower left as on a
+    Canvas. Every mark is a coverage mask blended over the buffer, so edges
+    are antialiased, and regular lines and dots are stamped all at once
+    from their distance to the nearest of them.
+    """
+
+    def __init__(self, pagesize, dpi, channels):
+        self.scale = dpi / 72.0
+        self.height = pagesize[1]
+        (w, h) = (int(round(pagesize[0] * self.scale)),
+                  int(round(pagesize[1] * self.scale)))
+        self.pixels = numpy.ones((h, w, channels), dtype=numpy.float32)
+        self.columns = numpy.arange(w, dtype=numpy.float32)
+        self.rows = numpy.arange(h, dtype=numpy.float32)
+
+    def _x(self, x):
+        return x * self.scale
+
+    def _y(self, y):
+        return (self.height - y) * self.scale
+
+    def _span(self, axis, lo, hi):
+        """
+        Returns the coverage of each pixel of an axis by the interval
+        [lo, hi] in pixels.
+        """
+
+        return numpy.clip(numpy.minimum(axis + 1, hi)
+                          - numpy.maximum(axis, lo), 0, 1)
+
+    def _lattice(self, axis, start, step, number, width):
+        """
+        Returns the coverage of each pixel of an axis by the nearest of a
+        number of evenly spaced marks of a width, all in pixels, and the
+        index of that mark.
+        """
+
+        index = numpy.clip(numpy.rint((axis + 0.5 - start) / step), 0,
+                           number - 1).astype(numpy.intp)
+        center = start + index * step
+        return (self._span(axis, center - width / 2.0, center + width
+                / 2.0), index)
+
+    def blend(self, alpha, color, rows, columns):
+        """
+        Paints a color through a coverage mask onto a part of the buffer.
+
+        Keyword arguments:
+        alpha -- coverage of each pixel of the part, in range [0,1]
+        color -- a color value, or an array of one for each pixel
+        rows, columns -- slices of the part of the buffer
+        """
+
+        part = self.pixels[rows, columns]
+        alpha = alpha[..., numpy.newaxis]
+        part += (numpy.asarray(color, dtype=numpy.float32) - part) * alpha
+
+    def _extent(self, coverage):
+        """
+        Returns the slice of an axis that a coverage vector touches.
+        """
+
+        touched = numpy.flatnonzero(coverage)
+        if not len(touched):
+            return slice(0, 0)
+        return slice(touched[0], touched[-1] + 1)
+
+    def _paint(self, ys, xs, color):
+        (rows, columns) = (self._extent(ys), self._extent(xs))
+        self.blend(numpy.outer(ys[rows], xs[columns]), color, rows, columns)
+
+    def rect(self, x, y, width, height, color):
+        self._paint(self._span(self.rows, self._y(y + height), self._y(y)),
+                    self._span(self.columns, self._x(x), self._x(x + width)),
+                    color)
+
+    def hlines(self, x0, x1, ys, width, color):
+        """
+        Strokes horizontal lines at evenly spaced heights ys, given as
+        (first, step, number) with step negative to go down the page.
+        """
+
+        (first, step, number) = ys
+        w = width * self.scale
+        (cover, index) = self._lattice(self.rows, self._y(first), -step
+                                       * self.scale, number, w)
+        self._paint(cover, self._span(self.columns, self._x(x0), self._x(x1)),
+                    color)
+
+    def vlines(self, xs, y0, y1, width, color):
+        """
+        Strokes vertical lines at evenly spaced positions xs, given as
+        (first, step, number).
+        """
+
+        (first, step, number) = xs
+        w = width * self.scale
+        (cover, index) = self._lattice(self.columns, self._x(first), step
+                                       * self.scale, number, w)
+        self._paint(self._span(self.rows, self._y(y1), self._y(y0)), cover,
+                    color)
+
+    def roundRect(self, x, y, width, height, radius, linewidth, stroke,
+                  fill):
+        """
+        Draws a rectangle with rounded corners, filled and then stroked with
+        the colors given, either of which may be None.
+        """
+
+        s = self.scale
+        (x0, x1, y0, y1) = (self._x(x), self._x(x + width), self._y(y
+                            + height), self._y(y))
+        (r, hw) = (radius * s, (linewidth * s / 2.0 if stroke is not None
+                   else 0))
+        rows = self._extent(self._span(self.rows, y0 - hw, y1 + hw))
+        columns = self._extent(self._span(self.columns, x0 - hw, x1 + hw))
+        (ys, xs) = (self.rows[rows], self.columns[columns])
+
+        # straight parts as separable boxes, corners from their circles
+
+        def _box(grow):
+            return numpy.outer(self._span(ys, y0 - grow, y1 + grow),
+                               self._span(xs, x0 - grow, x1 + grow))
+
+        def _corners(alpha, coverage):
+            for (inY, cy) in ((ys + 1 > y0 - hw) & (ys < y0 + r), y0 + r), \
+                    ((ys >= y1 - r) & (ys < y1 + hw), y1 - r):
+                for (inX, cx) in ((xs + 1 > x0 - hw) & (xs < x0 + r), x0
+                                  + r), ((xs >= x1 - r) & (xs < x1 + hw),
+                                  x1 - r):
+                    (i, j) = (self._extent(inY), self._extent(inX))
+                    d = numpy.hypot(ys[i, numpy.newaxis] + 0.5 - cy,
+                                    xs[numpy.newaxis, j] + 0.5 - cx)
+                    alpha[i, j] = coverage(d)
+
+        if fill is not None:
+            alpha = _box(0)
+            _corners(alpha, lambda d: numpy.clip(r - d + 0.5, 0, 1))
+            self.blend(alpha, fill, rows, columns)
+        if stroke is not None and linewidth > 0:
+            alpha = _box(hw) - _box(-hw)
+            _corners(alpha, lambda d: numpy.clip(hw - abs(d - r) + 0.5, 0,
+                     1))
+            self.blend(alpha, stroke, rows, columns)
+
+    def dots(self, xs, ys, size, color, colors=None):
+        """
+        Stamps round dots at every point of a lattice, with xs and ys given
+        as (first, step, number) going right and up the page. Each dot has
+        the color of colors[x, y] if colors is given.
+        """
+
+        s = self.scale
+        ((fx, sx, nx), (fy, sy, ny)) = (xs, ys)
+        r = size * s / 2.0
+
+        def _nearest(axis, start, step, number):
+            index = numpy.clip(numpy.rint((axis + 0.5 - start) / step), 0,
+                               number - 1).astype(numpy.intp)
+            return (axis + 0.5 - start - index * step, index)
+
+        (ddx, ix) = _nearest(self.columns, self._x(fx), sx * s, nx)
+        (ddy, iy) = _nearest(self.rows, self._y(fy), -sy * s, ny)
+        columns = self._extent(abs(ddx) < r + 1)
+        rows = self._extent(abs(ddy) < r + 1)
+
+        d = numpy.hypot(ddy[rows, numpy.newaxis], ddx[numpy.newaxis,
+                        columns])
+        alpha = numpy.clip(r - d + 0.5, 0, 1)
+        if colors is not None:
+            color = colors[numpy.ix_(ix[columns], iy[rows])].transpose(1, 0,
+                    2)
+        self.blend(alpha, color, rows, columns)
+
+    def cells(self, origin, size, cells, gridspace, mask, color):
+        """
+        Fills the cells of a grid for which mask[x, y] is true, or with the
+        color of each cell from a color array, with rows counted from the
+        top as in a Table.
+        """
+
+        s = self.scale
+        (x0, y0) = origin
+        (w, h) = size
+        (cells_x, cells_y) = cells
+        ys = self._span(self.rows, self._y(y0 + h), self._y(y0))
+        xs = self._span(self.columns, self._x(x0), self._x(x0 + w))
+        (rows, columns) = (self._extent(ys), self._extent(xs))
+        ix = numpy.clip(((self.columns[columns] + 0.5 - self._x(x0))
+                        // (gridspace * s)).astype(numpy.intp), 0, cells_x
+                        - 1)
+        iy = numpy.clip(((self.rows[rows] + 0.5 - self._y(y0 + h))
+                        // (gridspace * s)).astype(numpy.intp), 0, cells_y
+                        - 1)
+        alpha = numpy.outer(ys[rows], xs[columns])
+        if mask is not None:
+            alpha *= mask[numpy.ix_(ix, iy)].T
+        else:
+            color = color[numpy.ix_(ix, iy)].transpose(1, 0, 2)
+        self.blend(alpha, color, rows, columns)
+
+
+def _grey(raster, percentblack):
+    value = 1 - 0.01 * percentblack
+    return (value, ) * raster.pixels.shape[2]
+
+
+def _palette(raster, darkness):
+    from coloring import rainbowPalette
+
+    return numpy.array([color.rgb() for color in rainbowPalette(darkness,
+                       minimum=5)], dtype=numpy.float32)
+
+
+def _rainbowColors(raster, dimensions, darkness, seed):
+    """
+    Returns the colors of a rainbow grid as an array indexed [x, y], the
+    same coloring as coloring.rainbowBuckets for the seed.
+    """
+
+    from coloring import rainbowIndices
+
+    palette = _palette(raster, darkness)
+    indices = numpy.frombuffer(rainbowIndices(dimensions, len(palette),
+                               seed), dtype=numpy.uint8)
+    return palette[indices.reshape(dimensions)]
+
+
+def _squareSection(
+    raster,
+    location,
+    size,
+    gridspace,
+    linefreq,
+    checkered,
+    rainbow,
+    gridline,
+    linewidth,
+    boxline,
+    checkeredcolor,
+    gridcolor,
+    linecolor,
+    boxcolor,
+    bgndcolor,
+    seed=None,
+    **excessParams
+    ):
+    """
+    Draws the marks of graph.squareSection.
+    """
+
+    (area_w, area_h) = size
+    (loc_x, loc_y) = location
+    (cells_x, cells_y) = gridCells(size, gridspace)
+
+    grid_w = cells_x * gridspace + boxline
+    grid_h = cells_y * gridspace + boxline
+    (x0, y0) = (loc_x + (area_w - grid_w) / 2 + 0.5 * boxline, loc_y
+                + (area_h - grid_h) / 2 + boxline)
+    (w, h) = (cells_x * gridspace, cells_y * gridspace)
+    (x1, y1) = (x0 + w, y0 + h)
+
+    if checkered and rainbow:
+        raise ValueError('Grid pattern cannot be both rainbow and checekred.')
+
+    count('cells', cells_x * cells_y)
+
+    if checkered:
+        mask = numpy.add.outer(numpy.arange(cells_x), numpy.arange(cells_y)) \
+            % 2 == 0
+        raster.cells((x0, y0), (w, h), (cells_x, cells_y), gridspace, mask,
+                     _grey(raster, checkeredcolor))
+    elif rainbow:
+        with stage('rainbow'):
+            colors = _rainbowColors(raster, (cells_x, cells_y), 5, seed)
+        raster.cells((x0, y0), (w, h), (cells_x, cells_y), gridspace, None,
+                     colors)
+    elif bgndcolor != 0:
+        raster.rect(x0, y0, w, h, _grey(raster, bgndcolor))
+
+    if cells_x > 1:
+        raster.vlines((x0 + gridspace, gridspace, cells_x - 1), y0, y1,
+                      gridline, _grey(raster, gridcolor))
+    if cells_y > 1:
+        raster.hlines(x0, x1, (y1 - gridspace, -gridspace, cells_y - 1),
+                      gridline, _grey(raster, gridcolor))
+
+    if boxline != 0:
+        raster.roundRect(x0, y0, w, h, 0, boxline, _grey(raster, boxcolor),
+                         None)
+
+    # above each line's row, so none beneath the last row
+
+    if linefreq != 0:
+        lines = len([line for line in xrange(int(cells_y / linefreq) + 1)
+                    if line * linefreq < cells_y])
+        raster.hlines(x0 - linewidth / 2.0, x1 + linewidth / 2.0, (y1,
+                      -linefreq * gridspace, lines), linewidth,
+                      _grey(raster, linecolor))
+
+
+def _dotSection(
+    raster,
+    location,
+    size,
+    gridspace,
+    dotsize,
+    boxline,
+    rainbow,
+    dotcolor,
+    boxcolor,
+    bgndcolor,
+    seed=None,
+    **excessParams
+    ):
+    """
+    Draws the marks of graph.dotSection.
+    """
+
+    (area_w, area_h) = size
+    (loc_x, loc_y) = location
+    (cells_x, cells_y) = gridCells(size, gridspace)
+
+    grid_w = cells_x * gridspace
+    grid_h = cells_y * gridspace
+    (x, y) = (loc_x + (area_w - grid_w) / 2, loc_y + (area_h - grid_h) / 2)
+
+    raster.roundRect(x, y, grid_w, grid_h, gridspace / 3, boxline,
+                     (_grey(raster, boxcolor) if boxline > 0 else None),
+                     (_grey(raster, bgndcolor) if bgndcolor != 0 else None))
+
+    if bgndcolor == 0 and boxline == 0:
+        (dots_x, dots_y) = (cells_x + 1, cells_y + 1)
+    else:
+        (x, y) = (x + gridspace, y + gridspace)
+        (dots_x, dots_y) = (cells_x - 1, cells_y - 1)
+
+    count('dots', dots_x * dots_y)
+
+    if dots_x < 1 or dots_y < 1:
+        return
+    colors = None
+    if rainbow:
+        with stage('rainbow'):
+            colors = _rainbowColors(raster, (dots_x, dots_y), 50, seed)
+    raster.dots((x, gridspace, dots_x), (y, gridspace, dots_y), dotsize,
+                _grey(raster, dotcolor), colors)
+
+
+def _ruleSection(
+    raster,
+    loc,
+    size,
+    padding,
+    spacing,
+    above,
+    below,
+    rainbow,
+    linecolor,
+    linewidth,
+    seed=None,
+    ):
+    """
+    Draws the marks of lined.ruleSection.
+    """
+
+    if above == None:
+        above = spacing
+    if below == None:
+        below = spacing / 4
+
+    (loc_x, loc_y) = loc
+    (width, height) = size
+    lines = ruleLines(height, padding, spacing, above, below)
+
+    count('lines', lines)
+
+    # round caps reach half the width past each end
+
+    y = loc_y + height - padding - above
+    (x0, x1) = (loc_x + padding - linewidth / 2.0, loc_x + width - padding
+                + linewidth / 2.0)
+    if not rainbow:
+        raster.hlines(x0, x1, (y, -spacing, lines), linewidth,
+                      _grey(raster, linecolor))
+        return
+
+    from coloring import rainbowRow
+
+    with stage('rainbow'):
+        pattern = rainbowRow(lines, darkness=40, seed=seed)
+    for (i, color) in enumerate(pattern):
+        raster.hlines(x0, x1, (y - i * spacing, -spacing, 1), linewidth,
+                      color.rgb())
+
+
+def _arguments(name, params):
+    """
+    Returns the keyword arguments of a generator call with its defaults
+    filled in, read from its signature as layout.dryRun does.
+    """
+
+    if name not in RASTER_GENERATORS:
+        raise ValueError("Generator '" + str(name) + "' has no raster "
+                         'backend.')
+    args = dict((arg, default) for (arg, default, description) in
+                readSignature(name))
+    args.update((arg, value) for (arg, value) in params.items() if arg
+                in args)
+    return args
+
+
+def rasterPage(name, params, dpi=DEFAULT_DPI):
+    """
+    Draws the page of a generator call into a pixel buffer, without ReportLab
+    or a PDF rasteriser, and returns it as an array of floats in range [0,1]
+    of shape (height, width, channels): one channel for grey pages and three
+    for rainbow colorings. Only cartesian, dual, dotted and lined pages have
+    a raster backend.
+
+    Keyword arguments:
+    name -- name of the generator, one of RASTER_GENERATORS
+    params -- dict of keyword arguments for the generator
+    dpi -- resolution in pixels per inch
+    """
+
+    args = _arguments(name, params)
+    pagesize = tuple(args['pagesize'])
+    raster = _Raster(pagesize, dpi, (3 if args['rainbow'] else 1))
+    seed = args['seed']
+
+    guidecolor = args[('linecolor' if name == 'lined' else 'boxcolor')]
+
+    (draw, section) = ((_dotSection if name == 'dotted' else
+                       _squareSection), dict(args))
+    if name == 'cartesian':
+        section.update(linefreq=0, linewidth=args['gridline'],
+                       linecolor=args['gridcolor'])
+
+    with stage('raster'):
+        if args['borderless']:
+            (loc, size) = borderlessSection(name, pagesize)
+            if name == 'lined':
+                _ruleSection(raster, loc, size, 0, args['linespace'],
+                             RULE_ABOVE, RULE_BELOW, args['rainbow'],
+                             args['linecolor'], args['linewidth'], seed)
+            else:
+                draw(raster, loc, size, **dict(section, boxline=0))
+            if args['guideline']:
+                raster.vlines((args['guidespace'], 1, 1), 0, pagesize[1],
+                              args['guidewidth'], _grey(raster, guidecolor))
+        else:
+            ((area_w, area_h), locations) = pageLayout(pagesize,
+                    args['margins'], args['spacer'], args['layout'])
+            for (n, loc) in enumerate(locations):
+                sectionSeed = (None if seed is None else seed + n)
+                if name == 'lined':
+                    raster.roundRect(loc[0], loc[1], area_w, area_h,
+                                     args['linespace'] / 3, args['boxline'],
+                                     (_grey(raster, args['boxcolor']) if
+                                     args['boxline'] > 0 else None),
+                                     (_grey(raster, args['bgndcolor']) if
+                                     args['bgndcolor'] != 0 else None))
+                    _ruleSection(raster, loc, (area_w, area_h), 2 * MM,
+                                 args['linespace'], None, None,
+                                 args['rainbow'], args['linecolor'],
+                                 args['linewidth'], sectionSeed)
+                else:
+                    draw(raster, loc, (area_w, area_h), **dict(section,
+                         seed=sectionSeed))
+
+    return raster.pixels
+
+
+def writePNG(pixels, filename=None, dpi=None):
+    """
+    Writes a pixel buffer as an 8-bit grey or RGB PNG image. Returns the PNG
+    bytes if filename is None.
+
+    Keyword arguments:
+    pixels -- array of shape (height, width, channels) in range [0,1], such
+        as returned by rasterPage
+    filename -- output PNG image name or writable binary stream
+    dpi -- resolution stored in the image, None to leave it out
+    """
+
+    (h, w, channels) = pixels.shape
+    with stage('png'):
+        data = numpy.empty((h, w * channels + 1), dtype=numpy.uint8)
+        data[:, 0] = 0  # no filter on each row
+        data[:, 1:] = numpy.rint(numpy.clip(pixels, 0, 1) * 255).reshape(h,
+                w * channels)
+
+        def _chunk(kind, body):
+            return (struct.pack('>I', len(body)) + kind + body
+                    + struct.pack('>I', zlib.crc32(kind + body) & 0xffffffff))
+
+        png = [b'\x89PNG\r\n\x1a\n', _chunk(b'IHDR', struct.pack('>IIBBBBB',
+               w, h, 8, (0 if channels == 1 else 2), 0, 0, 0))]
+        if dpi:
+            ppm = int(round(dpi / 0.0254))
+            png.append(_chunk(b'pHYs', struct.pack('>IIB', ppm, ppm, 1)))
+        png.append(_chunk(b'IDAT', zlib.compress(data.tobytes(), 6)))
+        png.append(_chunk(b'IEND', b''))
+        png = b''.join(png)
+
+    if filename is None:
+        return png
+    if hasattr(filename, 'write'):
+        filename.write(png)
+    else:
+        with open(filename, 'wb') as output:
+            output.write(png)
+
+
+def renderPNG(name, params, filename=None, dpi=DEFAULT_DPI, width=None):
+    """
+    Renders the page of a generator call as a PNG image, such as a preview
+    or an e-ink template. Returns the PNG bytes if filename is None.
+
+    Keyword arguments:
+    name -- name of the generator, one of RASTER_GENERATORS
+    params -- dict of keyword arguments for the generator
+    filename -- output PNG image name or writable binary stream
+    dpi -- resolution in pixels per inch
+    width -- width of the image in pixels, such as for a thumbnail;
+        overrides dpi
+    """
+
+    if width is not None:
+        pagesize = _arguments(name, params)['pagesize']
+        dpi = width * 72.0 / pagesize[0]
+    return writePNG(rasterPage(name, params, dpi), filename, dpi)
@@ -0,0 +1,202 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import threading
+from multiprocessing import Pool, TimeoutError, cpu_count
+from multiprocessing.pool import ThreadPool
+
+try:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlparse, parse_qsl
+except ImportError:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlparse, parse_qsl
+
+from catalog import GENERATORS, resolveParams, warmUp
+from cache import cacheKey
+from layout import dryRun
+from threads import renderCall
+
+RENDER_TIMEOUT = 60  # seconds
+
+
+def parseQuery(query):
+    """
+    Returns the keyword arguments of a URL query string. Values are read
+    as JSON where possible, such that 'gridspace=18&layout=[2,2]' gives
+    numbers and lists, and as plain strings otherwise.
+
+    Keyword arguments:
+    query -- query part of a URL
+    """
+
+    params = dict()
+    for (key, value) in parse_qsl(query):
+        try:
+            params[key] = json.loads(value)
+        except ValueError:
+            params[key] = value
+    return params
+
+
+def guardedRender(name, params, directory=None):
+    """
+    Returns the outcome of a generator call as (data, None), or as
+    (None, error) with the error as text if it fails, such that a pool
+    callback sees every render end.
+
+    Keyword arguments:
+    name -- name of the generator, a key of catalog.GENERATORS
+    params -- dict of keyword arguments for the generator
+    directory -- location of the PDF cache, no cache if None
+    """
+
+    try:
+        return (renderCall(name, params, directory), None)
+    except Exception as error:
+        return (None, '%s: %s' % (type(error).__name__, error))
+
+
+class RenderServer(ThreadingMixIn, HTTPServer):
+    """
+    HTTP server rendering PDF documents on a pool of warm worker processes,
+    or of worker threads sharing this process if threads is true.
+
+    Requests beyond the workers plus maxqueue waiting are refused with 503
+    rather than queued without bound.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, processes=None, maxqueue=64,
+                 directory=None, threads=0):
+        HTTPServer.__init__(self, address, RenderHandler)
+        processes = processes or cpu_count()
+        if threads:
+            warmUp()
+            self.pool = ThreadPool(processes)
+        else:
+            self.pool = Pool(processes, initializer=warmUp)
+        self.slots = threading.BoundedSemaphore(processes + maxqueue)
+        self.directory = directory
+
+    def server_close(self):
+        HTTPServer.server_close(self)
+        self.pool.terminate()
+        self.pool.join()
+
+
+class RenderHandler(BaseHTTPRequestHandler):
+    """
+    Maps GET /<generator>?<kwargs> and POST /<generator> with a JSON object
+    of kwargs to a generator call, and responds with the PDF document.
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self._respond(url.path, parseQuery(url.query))
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            params = json.loads(self.rfile.read(length).decode('utf-8')
+                                or '{}')
+        except ValueError:
+            return self._error(400, 'Body is not valid JSON.')
+        if not isinstance(params, dict):
+            return self._error(400, 'Body is not a JSON object.')
+        params.update(parseQuery(url.query))
+        self._respond(url.path, params)
+
+    def _respond(self, route, params):
+        name = route.strip('/')
+        if name not in GENERATORS:
+            return self._error(404, "Unknown generator '" + name + "'.")
+
+        # reject requests that cannot render before they take a worker
+
+        try:
+            params = resolveParams(name, params)
+            dryRun(name, params)
+            key = cacheKey(name, params)
+        except (ValueError, TypeError) as error:
+            return self._error(400, str(error))
+
+        etag = (None if key is None else '"' + key + '"')
+        if etag is not None and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        # a slot is held until its render ends, even past the timeout of
+        # the request, so renders left running still count against it
+
+        slots = self.server.slots
+        if not slots.acquire(False):
+            return self._error(503, 'Render queue is full.')
+        try:
+            result = self.server.pool.apply_async(
+                guardedRender, (name, params, self.server.directory),
+                callback=lambda outcome: slots.release())
+        except:
+            slots.release()
+            raise
+        try:
+            (data, error) = result.get(RENDER_TIMEOUT)
+        except TimeoutError:
+            return self._error(500, 'Render did not finish in %d seconds.'
+                               % RENDER_TIMEOUT)
+        if error is not None:
+            return self._error(500, error)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/pdf')
+        self.send_header('Content-Length', str(len(data)))
+        if etag is not None:
+            self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, code, message):
+        body = (message + '\n').encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if code == 503:
+            self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(body)
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(
+        description='Serve PDF documents on localhost.')
+    parser.add_argument('-p', '--port', type=int, default=8080)
+    parser.add_argument('-b', '--bind', default='127.0.0.1')
+    parser.add_argument('-j', '--processes', type=int, default=None,
+                        help='number of worker processes or threads')
+    parser.add_argument('-q', '--maxqueue', type=int, default=64,
+                        help='number of requests waiting for a worker')
+    parser.add_argument('-t', '--threads', action='store_true',
+                        help='render on threads of this process instead of '
+                        'worker processes')
+    parser.add_argument('-c', '--cache', default=None,
+                        help='directory of the PDF cache, none if omitted')
+    args = parser.parse_args()
+
+    server = RenderServer((args.bind, args.port), args.processes,
+                          args.maxqueue, args.cache, args.threads)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
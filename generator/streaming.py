@@ -0,0 +1,197 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import itertools
+from array import array
+from io import BytesIO
+
+from catalog import getGenerator, normalizeParams
+from compact import compactStreams
+from program import compileProgram, iterReplay, setInfo
+from support import useCanvas
+
+
+def _streamingCanvas():
+    """
+    Returns a Canvas subclass that writes the objects of each page to its
+    output as soon as the page is shown, and the shared objects, cross
+    reference table and trailer on save. Each page is forgotten once
+    written, so memory stays flat however many pages are drawn, apart from
+    the file offsets of the cross reference table.
+    """
+
+    from reportlab.pdfbase.pdfdoc import BasicFonts, PDFFile, \
+        PDFIndirectObject, PDFPage, PDFTrailer
+    from reportlab.pdfgen.canvas import Canvas
+
+    class StreamingCanvas(Canvas):
+
+        def __init__(self, filename, *args, **kwargs):
+            Canvas.__init__(self, filename, *args, **kwargs)
+            if hasattr(filename, 'write'):
+                (self._file, self._close) = (filename, False)
+            else:
+                (self._file, self._close) = (open(filename, 'wb'), True)
+            self._offset = 0
+            self._offsets = array('l')  # by object number, from 1
+            self._written = 0  # highest object number considered
+            self._deferred = list()  # objects that change until save
+            self._pages = array('l')  # object numbers of the pages
+            self._doc.encrypt.prepare(self._doc)
+            self._write(PDFFile(self._doc._pdfVersion).format(self._doc))
+
+        def showPage(self):
+            Canvas.showPage(self)
+            self._flush()
+
+        def save(self):
+            if len(self._code):
+                self.showPage()
+
+            # as PDFDocument.GetPDFData, then write what is left
+
+            doc = self._doc
+            for font in doc.delayedFonts:
+                font.addObjects(doc)
+            doc.info.invariant = doc.invariant
+            doc.info.digest(doc.signature)
+            doc.Reference(doc.Catalog)
+            doc.Reference(doc.info)
+            doc.Outlines.prepare(doc, self)
+            if doc.Outlines.ready < 0:
+                doc.Catalog.Outlines = None
+            doc.Pages.pages = [('%d 0 R' % n).encode('ascii') for n in
+                               self._pages]
+            self._flush(final=True)
+
+            start = self._offset
+            self._write(('xref\n0 %d\n0000000000 65535 f \n'
+                        % (len(self._offsets) + 1)).encode('ascii'))
+            for i in range(0, len(self._offsets), 1024):
+                self._write(''.join('%010d 00000 n \n' % offset for offset
+                            in self._offsets[i:i + 1024]).encode('ascii'))
+            self._write(PDFTrailer(startxref=start,
+                        Size=len(self._offsets) + 1,
+                        Root=doc.Reference(doc.Catalog),
+                        Info=doc.Reference(doc.info),
+                        ID=doc.ID()).format(doc))
+            if self._close:
+                self._file.close()
+
+        def _write(self, data):
+            self._file.write(data)
+            self._offset += len(data)
+
+        def _flush(self, final=False):
+            doc = self._doc
+            shared = (doc.Catalog, doc.info, doc.Pages, doc.Outlines,
+                      doc.idToObject[BasicFonts])
+
+            if final:
+                for n in self._deferred:
+                    self._writeObject(n)
+                self._deferred = list()
+
+            # formatting an object may register more, so count as we go
+
+            pages = list()
+            n = self._written
+            while n < doc.objectcounter:
+                n += 1
+                obj = doc.idToObject[doc.numberToId[n]]
+                if not final and any(obj is other for other in shared):
+                    self._deferred.append(n)
+                    continue
+                self._writeObject(n)
+                if isinstance(obj, PDFPage):
+                    pages.append(obj)
+            self._written = n
+
+            # nothing refers to a page or its contents but the page tree,
+            # which only needs its object number
+
+            if final:
+                return
+            for page in pages:
+                self._pages.append(doc.idToObjectNumberAndVersion[
+                                   page.__InternalName__][0])
+                for name in (page.__InternalName__,
+                             page.Contents.__InternalName__):
+                    (number, version) = \
+                        doc.idToObjectNumberAndVersion.pop(name)
+                    del doc.numberToId[number]
+                    del doc.idToObject[name]
+            doc.Pages.pages = list()
+
+        def _writeObject(self, n):
+            doc = self._doc
+            name = doc.numberToId[n]
+            data = PDFIndirectObject(name, doc.idToObject[name]).format(doc)
+            if len(self._offsets) < n:
+                self._offsets.extend([0] * (n - len(self._offsets)))
+            self._offsets[n - 1] = self._offset
+            self._write(data)
+            doc.idToObject[name] = None  # registered, but let it go
+
+    return StreamingCanvas
+
+
+def streamDocument(name, params, filename=None):
+    """
+    Renders a generator call with each page written to the output as soon
+    as it is finished, so memory stays flat for documents of any length.
+    Returns the PDF bytes if filename is None, like the generators.
+
+    Keyword arguments:
+    name -- name of the generator, a key of catalog.GENERATORS
+    params -- dict of keyword arguments for the generator
+    filename -- output PDF document name or writable binary stream
+    """
+
+    with useCanvas(_streamingCanvas()):
+        return getGenerator(name)(filename, **normalizeParams(name,
+                                  params))
+
+
+def iterDocument(name, params):
+    """
+    Renders a generator call as a generator of PDF byte chunks: the header
+    and first page, every further page as it is finished, and the rest of
+    the document last, such as for a chunked HTTP response.
+
+    For generators with a 'pages' argument, the body of the page is
+    compiled once as a page program and replayed for every page, so memory
+    stays flat for any number of pages. Generators whose pages differ,
+    such as timeSchedule over weeks or monthCalendar over months, are
+    compiled whole first: the output is still written page by page, but
+    the operators of every page are held until the last is written.
+
+    Keyword arguments:
+    name -- name of the generator, a key of catalog.GENERATORS
+    params -- dict of keyword arguments for the generator
+    """
+
+    args = normalizeParams(name, params)
+    pages = args.get('pages', 1)
+    program = compileProgram(name, dict(params, pages=min(pages, 2)))
+    if pages > 2:
+        entries = itertools.repeat(program['pages'][-1], pages)
+    else:
+        entries = program['pages']
+
+    buffer = BytesIO()
+
+    def _drain():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    page = _streamingCanvas()(buffer, pagesize=tuple(program['pages'
+                              ][0][0]))
+    compactStreams(page, args.get('precision'), args.get('compression'))
+    setInfo(program, page)
+    for n in iterReplay(program, page, entries):
+        yield _drain()
+    page.save()
+    yield _drain()
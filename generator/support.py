@@ -1,30 +1,407 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+import tempfile
+import threading
+from contextlib import contextmanager
+from io import BytesIO
+from os import environ, path
 
-def registerFonts(fontlist):
+from compact import compactStreams
+from profiling import stage, count
+
+# parsed fonts, in a directory private to the user
+
+FONT_CACHE = path.join(environ.get('XDG_CACHE_HOME')
+                       or path.expanduser(path.join('~', '.cache')),
+                       'give-a-sheet', 'fonts')
+
+# attributes of a parsed font face stored as arrays, and the first bytes of
+# a cache entry
+
+_FACE_ARRAYS = ('charWidths', 'charToGlyph', 'glyphPos', 'hmetrics')
+_TABLES_MAGIC = b'GSFONT1\n'
+
+# the Canvas class used by the generators on each thread, if not the default
+
+_canvasClass = threading.local()
+
+# ReportLab's font registry is shared by every thread
+
+_fontLock = threading.Lock()
+
+
+def registerFonts(fontlist, cachedir=None):
     """
     Registeres specified fonts for use in PDF.
 
     fontlist -- list of (fontname, relpath) tuples
         fontname -- name for font registration
         relpath -- path to TTF font relative to this function
+    cachedir -- directory of the parsed font cache; FONT_CACHE if None
     """
-    from os import path, sep
-    from inspect import getfile, currentframe
+    from os import sep
     from reportlab.pdfbase import pdfmetrics
+
+    registered = pdfmetrics.getRegisteredFontNames()
+    selfPath = path.dirname(path.abspath(__file__))
+
+    if all(fontname in registered for (fontname, relpath) in fontlist):
+        return
+
+    # register under a lock, or two threads may each register a font and
+    # draw with different instances of it
+
+    with _fontLock, stage('fonts'):
+        registered = pdfmetrics.getRegisteredFontNames()
+        for (fontname, relpath) in fontlist:
+
+            # check if already registered, without the search for AFM files
+            # that pdfmetrics.getFont does for unknown names
+
+            if fontname in registered:
+                continue
+
+            ttfFile = selfPath + sep + relpath
+            pdfmetrics.registerFont(_loadFont(fontname, ttfFile,
+                                    cachedir or FONT_CACHE))
+
+
+def _loadFont(fontname, ttfFile, cachedir):
+    """
+    Returns a TTFont for a font file. The parsed metrics, character map and
+    glyph offsets are written to the cache directory as plain data on first
+    use and read back from then on, and the font file itself is mapped into
+    memory, so processes share its pages.
+    """
+    import hashlib
+    import mmap
+    import os
+    from reportlab import Version
     from reportlab.pdfbase.ttfonts import TTFont
 
-    for (fontname, relpath) in fontlist:
+    stat = os.stat(ttfFile)
+    key = repr((fontname, path.abspath(ttfFile), stat.st_size,
+               stat.st_mtime, Version))
+    key = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    tables = path.join(cachedir, fontname + '-' + key + '.tables')
+
+    with open(ttfFile, 'rb') as ttf:
+        data = mmap.mmap(ttf.fileno(), 0, access=mmap.ACCESS_READ)
+
+    private = _privateDirectory(cachedir)
+    font = (_readTables(fontname, tables) if private else None)
+    if font is None:
+        font = TTFont(fontname, ttfFile)
+        if private:
+            try:
+                (handle, tmpname) = tempfile.mkstemp(dir=cachedir,
+                                                     suffix='.tmp')
+                with os.fdopen(handle, 'wb') as entry:
+                    entry.write(_writeTables(font))
+                os.rename(tmpname, tables)
+            except (IOError, OSError):
+                pass  # cache is not writable, parse again next time
+
+    font.face._ttf_data = data
+    return font
+
+
+def _privateDirectory(directory):
+    """
+    Returns whether a cache directory is private to this user, creating it
+    with mode 0700 if it does not exist. A directory that other users own
+    or may write to is never used.
+    """
+    import os
+    import stat
+
+    try:
+        if not path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        info = os.lstat(directory)
+    except (IOError, OSError):
+        return False
+
+    if not stat.S_ISDIR(info.st_mode):
+        return False
+    if hasattr(os, 'getuid') and (info.st_uid != os.getuid()
+                                  or info.st_mode & 0o022):
+        return False
+    return True
+
+
+def _writeTables(font):
+    """
+    Returns the tables of a parsed TTFont as a cache entry: a JSON header of
+    its scalar attributes followed by arrays of its character widths,
+    character map, glyph offsets and horizontal metrics. Nothing in an entry
+    is run when it is read.
+    """
+    import json
+    import struct
+    from array import array
+    from reportlab.pdfbase.ttfonts import TTFNameBytes
+
+    face = font.face
+    scalars = dict()
+    for (name, value) in face.__dict__.items():
+        if name in _FACE_ARRAYS or name in ('_ttf_data', 'table'):
+            continue
+        if isinstance(value, TTFNameBytes):
+            value = ['name', value.decode('utf-8')]
+        elif isinstance(value, bytes):
+            value = ['bytes', value.decode('latin-1')]
+        elif isinstance(value, tuple):
+            value = ['tuple', list(value)]
+        else:
+            value = ['value', value]
+        scalars[name] = value
+
+    codes = sorted(face.charWidths)
+    chars = sorted(face.charToGlyph)
+    arrays = [
+        ('widthCodes', array('l', codes)),
+        ('widths', array('d', [face.charWidths[c] for c in codes])),
+        ('charCodes', array('l', chars)),
+        ('glyphs', array('l', [face.charToGlyph[c] for c in chars])),
+        ('glyphPos', array('l', face.glyphPos)),
+        ('advances', array('l', [m[0] for m in face.hmetrics])),
+        ('bearings', array('l', [m[1] for m in face.hmetrics])),
+        ]
+
+    header = {'font': scalars, 'arrays': list()}
+    blobs = list()
+    offset = 0
+    for (name, values) in arrays:
+        blob = values.tostring() if bytes is str else values.tobytes()
+        header['arrays'].append([name, values.typecode, values.itemsize,
+                                offset, len(values)])
+        blobs.append(blob)
+        offset += len(blob)
+
+    text = json.dumps(header, sort_keys=True).encode('utf-8')
+    return _TABLES_MAGIC + struct.pack('<I', len(text)) + text \
+        + b''.join(blobs)
+
+
+def _readTables(fontname, filename):
+    """
+    Returns the TTFont of a cache entry written by _writeTables, without
+    its font data, or None if the entry is missing or unreadable.
+    """
+    import json
+    import mmap
+    import struct
+    from array import array
+    from weakref import WeakKeyDictionary
+    from reportlab import rl_config
+    from reportlab.pdfbase.ttfonts import TTFont, TTFontFace, \
+        TTEncoding, TTFNameBytes
+
+    try:
+        with open(filename, 'rb') as entry:
+            blob = mmap.mmap(entry.fileno(), 0, access=mmap.ACCESS_READ)
+    except (IOError, OSError, ValueError):
+        return None
+
+    try:
+        start = len(_TABLES_MAGIC)
+        if blob[:start] != _TABLES_MAGIC:
+            return None
+        (length, ) = struct.unpack('<I', blob[start:start + 4])
+        start += 4
+        header = json.loads(blob[start:start + length].decode('utf-8'))
+        start += length
+
+        arrays = dict()
+        for (name, typecode, itemsize, offset, number) in header['arrays']:
+            values = array(str(typecode))
+            if values.itemsize != itemsize:
+                return None
+            chunk = blob[start + offset:start + offset + itemsize * number]
+            if len(chunk) != itemsize * number:
+                return None
+            if bytes is str:
+                values.fromstring(chunk)
+            else:
+                values.frombytes(chunk)
+            arrays[name] = values
+
+        face = _blank(TTFontFace)
+        for (name, (kind, value)) in header['font'].items():
+            if kind == 'name':
+                value = TTFNameBytes(value.encode('utf-8'))
+            elif kind == 'bytes':
+                value = value.encode('latin-1')
+            elif kind == 'tuple':
+                value = tuple(value)
+            elif isinstance(value, type(u'')) and bytes is str:
+                value = value.encode('utf-8')  # str attributes of Python 2
+            setattr(face, str(name), value)
+        face.charWidths = dict(zip(arrays['widthCodes'], arrays['widths']))
+        face.charToGlyph = dict(zip(arrays['charCodes'], arrays['glyphs']))
+        face.glyphPos = list(arrays['glyphPos'])
+        face.hmetrics = list(zip(arrays['advances'], arrays['bearings']))
+        face.table = dict((table['tag'], table) for table in face.tables)
+    except (KeyError, TypeError, ValueError, struct.error):
+        return None
+    finally:
+        blob.close()
+
+    font = _blank(TTFont)
+    font.fontName = fontname
+    font.face = face
+    font.encoding = TTEncoding()
+    font.state = WeakKeyDictionary()
+    font._asciiReadable = rl_config.ttfAsciiReadable
+    return font
+
+
+def _blank(cls):
+    """
+    Returns an instance of a class without running its __init__.
+    """
+
+    try:
+        return object.__new__(cls)
+    except TypeError:  # classic class of Python 2
+        import new
+
+        return new.instance(cls)
+
+
+def openOutput(filename):
+    """
+    Returns the output for a Canvas: the given document name or writable
+    binary stream, or a new in-memory stream if filename is None.
+
+    Keyword arguments:
+    filename -- output PDF document name, writable binary stream or None
+    """
+
+    if filename is None:
+        return BytesIO()
+    return filename
+
+
+def newCanvas(output, pagesize, precision=None, compression=None):
+    """
+    Returns the Canvas a generator draws on, a ReportLab Canvas unless
+    another class is installed on this thread with useCanvas.
+
+    Keyword arguments:
+    output -- value returned by openOutput
+    pagesize -- size of page as (width, height) tuple
+    precision -- decimals of coordinates in compact content streams, None
+        to write them in full
+    compression -- zlib level of content streams, None for the default
+    """
+
+    cls = getattr(_canvasClass, 'cls', None)
+    if cls is None:
+        from reportlab.pdfgen.canvas import Canvas as cls
+    page = cls(output, pagesize=pagesize)
+    compactStreams(page, precision, compression)
+    return page
+
+
+@contextmanager
+def useCanvas(cls):
+    """
+    Has the generators on this thread draw on another Canvas class while in
+    a 'with' block, such as the recording Canvas of program.compileProgram.
+
+    Keyword arguments:
+    cls -- a ReportLab Canvas subclass, or any callable of (output,
+        pagesize=pagesize) returning one
+    """
+
+    outer = getattr(_canvasClass, 'cls', None)
+    _canvasClass.cls = cls
+    try:
+        yield
+    finally:
+        _canvasClass.cls = outer
+
+
+def saveOutput(page, filename, output):
+    """
+    Saves the document and returns its bytes if it was rendered in memory.
+
+    Keyword arguments:
+    page -- a Canvas instance writing to output
+    filename -- filename as passed to openOutput
+    output -- value returned by openOutput
+    """
+
+    with stage('save'):
+        page.save()
+    if filename is None:
+        return output.getvalue()
+
+
+def beginRepeat(page, pages):
+    """
+    Starts recording the page body as a form if it is to be repeated.
+
+    Keyword arguments:
+    page -- a Canvas instance on which to draw
+    pages -- number of identical pages in the document
+    """
+
+    if pages > 1:
+        page.beginForm('GiveSheetBody')
+
+
+def endRepeat(page, pages):
+    """
+    Finishes the page body started by beginRepeat and places it on each of
+    the requested pages, so the body is only drawn and stored once.
+
+    Keyword arguments:
+    page -- a Canvas instance on which to draw
+    pages -- number of identical pages in the document
+    """
+
+    if pages > 1:
+        page.endForm()
+        for i in xrange(pages):
+            page.doForm('GiveSheetBody')
+            page.showPage()
+
+
+def repeatSection(page, size, locations, drawSection, identical=1):
+    """
+    Draws a section at each of the given locations. Identical sections are
+    drawn once as a form and placed at every location.
+
+    Keyword arguments:
+    page -- a Canvas instance on which to draw
+    size -- size of a section as (width, height) tuple
+    locations -- list of (x, y) tuples for the lower left of each section
+    drawSection -- function of (location, index) that draws one section
+    identical -- flag that all sections look the same, else each is drawn
+    """
+
+    count('sections', len(locations))
+
+    if not identical or len(locations) < 2:
+        for (n, loc) in enumerate(locations):
+            with stage('section'):
+                drawSection(loc, n)
+        return
 
-        # check if already registered
+    # leave room for strokes that overhang the section
 
-        try:
-            pdfmetrics.getFont(fontname)
-            continue  # font already registered
-        except KeyError:
-            pass  # font not registered
+    (w, h) = size
+    page.beginForm('GiveSheetSection', -w, -h, 2 * w, 2 * h)
+    with stage('section'):
+        drawSection((0, 0), 0)
+    page.endForm()
 
-        selfPath = path.dirname(path.abspath(getfile(currentframe())))
-        ttfFile = selfPath + sep + relpath
-        pdfmetrics.registerFont(TTFont(fontname, ttfFile))
+    for (x, y) in locations:
+        page.saveState()
+        page.translate(x, y)
+        page.doForm('GiveSheetSection')
+        page.restoreState()
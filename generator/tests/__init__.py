@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+
+# the generators import each other as top-level modules
+
+import sys
+from os import path
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
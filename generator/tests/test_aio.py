@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+import aio
+
+
+class AsyncRendererTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = aio.asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def _render(self, executor):
+        renderer = aio.AsyncRenderer(executor, workers=1, loop=self.loop)
+        try:
+            graph = renderer.render('cartesian', {'gridspace': 18})
+            todo = renderer.generator('itemizedTodo')(items=['Reading'])
+            return self.loop.run_until_complete(aio.asyncio.gather(graph,
+                                                todo))
+        finally:
+            renderer.close()
+
+    def test_process_executor_renders(self):
+        for data in self._render('process'):
+            self.assertTrue(data.startswith(b'%PDF'))
+
+    def test_thread_executor_renders(self):
+        for data in self._render('thread'):
+            self.assertTrue(data.startswith(b'%PDF'))
+
+    def test_full_queue_is_refused(self):
+        renderer = aio.AsyncRenderer('thread', workers=1, maxqueue=0,
+                                     loop=self.loop)
+        try:
+            first = renderer.render('cartesian', {})
+            self.assertRaises(aio.asyncio.QueueFull, renderer.render,
+                              'cartesian', {})
+            self.loop.run_until_complete(first)
+        finally:
+            renderer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
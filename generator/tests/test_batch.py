@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+import io
+import json
+import shutil
+import tempfile
+import unittest
+
+from batch import readManifest, runBatch
+
+MANIFEST = u'''# a bad line is reported, not fatal
+{"generator": "cartesian", "output": "grid.pdf", "kwargs": {"gridspace": 36}}
+{"generator": "cartesian",
+{"output": "nameless.pdf"}
+["cartesian"]
+{"generator": "lined", "kwargs": [18]}
+{"generator": "lined", "output": "lined.pdf"}
+'''
+
+
+class ManifestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.outdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.outdir)
+
+    def test_bad_lines_are_reported_per_job(self):
+        jobs = readManifest(io.StringIO(MANIFEST), self.outdir)
+        self.assertEqual([job['line'] for job in jobs], [2, 3, 4, 5, 6, 7])
+        self.assertEqual([job['error'] is None for job in jobs],
+                         [True, False, False, False, False, True])
+
+        report = (io.BytesIO() if bytes is str else io.StringIO())
+        self.assertEqual(runBatch(jobs, report, processes=1), 4)
+        results = sorted((json.loads(line) for line in
+                          report.getvalue().splitlines()),
+                         key=lambda result: result['line'])
+        self.assertEqual([result['line'] for result in results],
+                         [2, 3, 4, 5, 6, 7])
+        self.assertGreater(results[0]['bytes'], 0)
+        self.assertGreater(results[-1]['bytes'], 0)
+        self.assertTrue(results[2]['error'].startswith('KeyError'))
+        self.assertTrue(results[4]['error'].startswith('TypeError'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+from os import path
+
+import cache
+
+
+class CacheKeyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _entries(self):
+        return [name for (folder, dirs, files) in os.walk(self.directory)
+                for name in files if name.endswith('.pdf')]
+
+    def test_equal_calls_share_a_key(self):
+        self.assertEqual(cache.cacheKey('cartesian', {'gridspace': 18}),
+                         cache.cacheKey('cartesian', {'gridspace': 18,
+                         'margins': 36.0, 'unknown': 1}))
+        self.assertNotEqual(cache.cacheKey('cartesian', {'gridspace': 18}),
+                            cache.cacheKey('cartesian', {'gridspace': 19}))
+
+    def test_rainbow_without_seed_is_not_cached(self):
+        params = {'rainbow': 1, 'gridspace': 36}
+        self.assertIsNone(cache.cacheKey('cartesian', params))
+        cache.cachedPDF('cartesian', params, self.directory)
+        self.assertEqual(self._entries(), [])
+
+        params['seed'] = 1
+        self.assertIsNotNone(cache.cacheKey('cartesian', params))
+        cache.cachedPDF('cartesian', params, self.directory)
+        self.assertEqual(len(self._entries()), 1)
+
+    def test_shared_directory_is_not_used(self):
+        os.chmod(self.directory, 0o777)
+        key = cache.cacheKey('cartesian', {'gridspace': 36})
+        planted = path.join(self.directory, key[:2], key + '.pdf')
+        os.makedirs(path.dirname(planted))
+        with open(planted, 'wb') as entry:
+            entry.write(b'planted')
+
+        data = cache.cachedPDF('cartesian', {'gridspace': 36},
+                               self.directory)
+        self.assertTrue(data.startswith(b'%PDF'))
+        self.assertEqual(self._entries(), [key + '.pdf'])
+
+    def test_current_month_is_part_of_the_key(self):
+        today = datetime.date.today()
+        self.assertEqual(cache.cacheKey('monthCalendar', {}),
+                         cache.cacheKey('monthCalendar', {'year': today.year,
+                         'month': today.month}))
+        self.assertEqual(cache.cacheKey('cascadingYear', {}),
+                         cache.cacheKey('cascadingYear', {'year':
+                         today.year}))
+        self.assertNotEqual(cache.cacheKey('yearOverview', {}),
+                            cache.cacheKey('yearOverview', {'year':
+                            today.year - 1}))
+
+
+class EvictionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        cache._sizes.pop(self.directory, None)
+
+    def test_directory_is_walked_only_to_evict(self):
+        walks = list()
+        walk = os.walk
+
+        def countingWalk(top, *args):
+            if top == self.directory:  # not the recursion into folders
+                walks.append(top)
+            return walk(top, *args)
+
+        os.walk = countingWalk
+        try:
+            for gridspace in (18, 19, 20):
+                cache.cachedPDF('cartesian', {'gridspace': gridspace},
+                                self.directory)
+            self.assertEqual(len(walks), 1)
+
+            size = cache._sizes[self.directory]
+            cache.cachedPDF('cartesian', {'gridspace': 21}, self.directory,
+                            maxbytes=size)
+            self.assertEqual(len(walks), 2)
+        finally:
+            os.walk = walk
+        self.assertLessEqual(cache._sizes[self.directory], size * 0.9)
+
+    @unittest.skipIf(cache.fcntl is None, 'no flock on this platform')
+    def test_held_lock_files_are_kept(self):
+        for name in ('held.pdf', 'free.pdf'):
+            for suffix in ('', '.lock'):
+                with open(path.join(self.directory, name + suffix),
+                          'w') as entry:
+                    entry.write('%PDF')
+
+        with open(path.join(self.directory, 'held.pdf.lock'), 'a') as lock:
+            cache.fcntl.flock(lock, cache.fcntl.LOCK_EX)
+            cache._evict(self.directory, 0)
+        self.assertEqual(os.listdir(self.directory), ['held.pdf.lock'])
+
+
+if __name__ == '__main__':
+    unittest.main()
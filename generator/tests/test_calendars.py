@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+import re
+import unittest
+
+import calendars
+from tests.test_todo import _pages
+
+_TEXT = re.compile(r'1 0 0 1 (\S+) (\S+) Tm (?:/\S+ \S+ Tf \S+ TL )?'
+                   r'\((.*?)\) Tj')
+
+
+def _texts(code):
+    """
+    Returns the strings shown on a page as a list of (x, y, text) tuples.
+    """
+
+    return [(float(x), float(y), text) for (x, y, text) in
+            _TEXT.findall(code)]
+
+
+class MonthCalendarTest(unittest.TestCase):
+
+    def test_months_run_across_the_new_year(self):
+        self.assertEqual(calendars._months(2020, 11, 4), [(2020, 11),
+                         (2020, 12), (2021, 1), (2021, 2)])
+        pages = _pages(calendars.monthCalendar, {'year': 2020, 'month': 12,
+                       'months': 2})
+        titles = [_texts(code)[0][2] for (code, doc) in pages]
+        self.assertEqual(titles, ['December 2020', 'January 2021'])
+
+    def test_first_column_follows_sundayfirst(self):
+
+        # September 2024 starts on a Sunday
+
+        for (sundayfirst, column) in ((1, 0), (0, 6)):
+            (code, doc) = _pages(calendars.monthCalendar, {'year': 2024,
+                                 'month': 9, 'sundayfirst': sundayfirst})[0]
+            x = [x for (x, y, text) in _texts(code) if text == '1'][0]
+            cell_w = (792 - 2 * 36) / 7.0
+            self.assertAlmostEqual(x, 36 + column * cell_w + 4, 3)
+
+    def test_weekend_columns(self):
+        (days, weekend) = calendars._weekdays(1)
+        self.assertEqual(days[0], 'Sunday')
+        self.assertEqual(weekend, [6, 0])
+        (days, weekend) = calendars._weekdays(0)
+        self.assertEqual(days[0], 'Monday')
+        self.assertEqual(weekend, [5, 6])
+
+    def test_no_months(self):
+        self.assertRaises(ValueError, calendars.monthCalendar, None,
+                          months=0)
+        self.assertRaises(ValueError, calendars.monthCalendar, None,
+                          month=13)
+
+
+class YearOverviewTest(unittest.TestCase):
+
+    def _monthLabels(self, params):
+        (code, doc) = _pages(calendars.yearOverview, params)[0]
+        return dict((text, (x, y)) for (x, y, text) in _texts(code) if
+                    text in calendars.MONTHS)
+
+    def test_months_run_row_by_row_from_the_top_left(self):
+        for (layout, pagesize) in (((3, 4), (612, 792)), ((4, 3), (792,
+                                   612)), ((2, 6), (612, 792))):
+            labels = self._monthLabels({'year': 2021, 'layout': layout,
+                                        'pagesize': pagesize})
+            order = sorted(labels, key=lambda month: (-labels[month][1],
+                           labels[month][0]))
+            self.assertEqual(order, calendars.MONTHS, layout)
+            rows = set(round(y, 3) for (x, y) in labels.values())
+            self.assertEqual(len(rows), layout[1])
+
+    def test_pages_per_year(self):
+        pages = _pages(calendars.yearOverview, {'year': 2021, 'years': 3})
+        self.assertEqual([_texts(code)[0][2] for (code, doc) in pages],
+                         ['2021', '2022', '2023'])
+
+    def test_layout_under_twelve(self):
+        self.assertRaises(ValueError, calendars.yearOverview, None,
+                          layout=(2, 5))
+        self.assertRaises(ValueError, calendars.yearOverview, None,
+                          years=0)
+
+
+class CascadingYearTest(unittest.TestCase):
+
+    def test_weekdays_of_each_date(self):
+        (code, doc) = _pages(calendars.cascadingYear, {'year': 2021})[0]
+        texts = _texts(code)
+
+        # 1 January 2021 was a Friday, and the year has 365 dates
+
+        self.assertEqual(texts[0][2], 'Fr')
+        self.assertEqual(len([text for (x, y, text) in texts if len(text)
+                         == 2]), 365)
+        self.assertEqual(texts[-1][2], '2021')
+
+    def test_no_years(self):
+        self.assertRaises(ValueError, calendars.cascadingYear, None,
+                          years=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import unittest
+from io import BytesIO, StringIO
+
+import cli
+
+
+class CheckTest(unittest.TestCase):
+
+    def setUp(self):
+        self.stderr = sys.stderr
+        sys.stderr = (BytesIO() if bytes is str else StringIO())
+
+    def tearDown(self):
+        sys.stderr = self.stderr
+
+    def test_fitting_call_passes(self):
+        self.assertEqual(cli.main(['cartesian', '--check']), 0)
+
+    def test_call_that_does_not_fit_fails(self):
+        self.assertEqual(cli.main(['cartesian', '--gridspace', '1000',
+                         '--check']), 1)
+        self.assertIn('do not fit', sys.stderr.getvalue())
+
+    def test_invalid_value_fails(self):
+        self.assertEqual(cli.main(['timeSchedule', '--timerange', '9,8',
+                         '--check']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
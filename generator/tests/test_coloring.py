@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+import coloring
+
+
+class RainbowIndicesTest(unittest.TestCase):
+
+    def _checkNeighbors(self, grid, dimensions):
+        (w, h) = dimensions
+        for x in range(w):
+            for y in range(h):
+                color = grid[x * h + y]
+                neighbors = [(x, y - 1), (x - 1, y - 1), (x - 1, y),
+                             (x - 1, y + 1)]
+                for (nx, ny) in neighbors:
+                    if 0 <= nx and 0 <= ny < h:
+                        self.assertNotEqual(color, grid[nx * h + ny],
+                                            (x, y, nx, ny))
+
+    def test_neighbors_differ(self):
+        for count in (5, 6, 24):
+            grid = coloring.rainbowIndices((30, 20), count, seed=count)
+            self._checkNeighbors(grid, (30, 20))
+            self.assertEqual(set(grid), set(range(count)))
+
+    def test_seed_repeats_the_grid(self):
+        self.assertEqual(coloring.rainbowIndices((40, 40), 6, seed=3),
+                         coloring.rainbowIndices((40, 40), 6, seed=3))
+        self.assertNotEqual(coloring.rainbowIndices((40, 40), 6, seed=3),
+                            coloring.rainbowIndices((40, 40), 6, seed=4))
+
+    def test_large_schemes_store_only_occurring_neighbors(self):
+        coloring.rainbowIndices((100, 100), 32, seed=1)
+        self.assertLess(len(coloring._constraints[32]), 40000)
+
+    def test_too_few_colors(self):
+        self.assertRaises(ValueError, coloring.rainbowIndices, (4, 4), 4)
+
+
+class RainbowRowTest(unittest.TestCase):
+
+    def test_buckets_group_the_row_by_palette_color(self):
+        for length in (1, 6, 40):
+            row = coloring.rainbowRow(length, darkness=40, seed=length)
+            buckets = coloring.rainbowRowBuckets(length, darkness=40,
+                                                 seed=length)
+            palette = coloring.rainbowPalette(40)
+            self.assertEqual([color for (color, indices) in buckets],
+                             [color for color in palette if color in row])
+            for (color, indices) in buckets:
+                self.assertEqual(indices, [i for (i, other) in
+                                 enumerate(row) if other is color])
+
+    def test_no_color_repeats_its_neighbor(self):
+        row = coloring.rainbowRow(100, seed=1)
+        for (before, after) in zip(row, row[1:]):
+            self.assertIsNot(before, after)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+import graph
+import lined
+from compact import compactCode
+from support import useCanvas
+from tests.test_grids import _recordingCanvas, _strokes
+
+
+def _pageCode(generator, params):
+    """
+    Returns the operators of the first page of a generator call.
+    """
+
+    pages = list()
+    with useCanvas(_recordingCanvas(pages)):
+        generator(None, **params)
+    return pages[0][0]
+
+
+class CompactCodeTest(unittest.TestCase):
+
+    CASES = [
+        (graph.cartesian, {'direct': 1}),
+        (graph.cartesian, {'checkered': 1}),
+        (graph.dual, {}),
+        (graph.dual, {'direct': 1, 'gridspace': 5, 'linefreq': 4}),
+        (graph.dotted, {}),
+        (lined.lined, {}),
+        ]
+
+    def test_stroke_then_fill_stays_apart(self):
+        code = compactCode('0 0 m 10 0 l S\n0 0 10 10 re f\n')
+        self.assertEqual(code, '0 0 m\n10 0 l\nS\n0 0 10 10 re\nf\n')
+
+    def test_stroke_then_clip_stays_apart(self):
+        code = compactCode('0 0 m 10 0 l S\n0 0 10 10 re W n\n')
+        self.assertEqual(code, '0 0 m\n10 0 l\nS\n0 0 10 10 re\nW\nn\n')
+
+    def test_consecutive_strokes_join(self):
+        code = compactCode('0 0 m 10 0 l S\n0 5 m 10 5 l S\n1 w\n'
+                           '0 9 m 10 9 l S\n')
+        self.assertEqual(code, '0 0 m\n10 0 l\n0 5 m\n10 5 l\nS\n1 w\n'
+                         '0 9 m\n10 9 l\nS\n')
+
+    def test_repeated_state_and_blank_text_are_dropped(self):
+        code = compactCode('q 1 w 1 w BT 1 0 0 1 5 5 Tm ET 1 0 0 1 0 0 cm '
+                           '0.123456 0 m 1 1 l S Q', 2)
+        self.assertEqual(code, 'q\n1 w\n.12 0 m\n1 1 l\nS\nQ\n')
+
+    def test_bytes_stay_bytes(self):
+        self.assertEqual(compactCode(b'0 0 m 1 1 l S'), b'0 0 m\n1 1 l\nS\n')
+
+    def test_compacting_twice_changes_nothing(self):
+        for (generator, params) in self.CASES:
+            once = compactCode(_pageCode(generator, params))
+            self.assertEqual(compactCode(once), once)
+
+    def test_pages_stroke_the_same_lines(self):
+        for (generator, params) in self.CASES:
+            code = _pageCode(generator, params)
+            self.assertEqual(_strokes(compactCode(code, 3)), _strokes(code),
+                             '%s(%r)' % (generator.__name__, params))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import support
+from todo import FONTS
+
+
+class FontCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _load(self, cachedir):
+        (fontname, relpath) = FONTS[1]
+        ttfFile = os.path.join(os.path.dirname(support.__file__), relpath)
+        return support._loadFont(fontname, ttfFile, cachedir)
+
+    def test_cached_font_matches_parsed_font(self):
+        cachedir = os.path.join(self.directory, 'fonts')
+        parsed = self._load(cachedir)
+        self.assertEqual(len(os.listdir(cachedir)), 1)
+        cached = self._load(cachedir)
+
+        for name in ('charWidths', 'charToGlyph', 'glyphPos', 'hmetrics',
+                     'table', 'ascent', 'descent', 'bbox', 'name',
+                     'unitsPerEm'):
+            self.assertEqual(getattr(cached.face, name),
+                             getattr(parsed.face, name))
+        self.assertEqual(cached.stringWidth(u'Give Sheet', 10),
+                         parsed.stringWidth(u'Give Sheet', 10))
+        self.assertEqual(cached.face.makeSubset(range(32, 127)),
+                         parsed.face.makeSubset(range(32, 127)))
+
+    def test_cache_directory_is_private(self):
+        cachedir = os.path.join(self.directory, 'fonts')
+        self._load(cachedir)
+        self.assertEqual(os.stat(cachedir).st_mode & 0o777, 0o700)
+
+    def test_shared_directory_is_not_used(self):
+        cachedir = os.path.join(self.directory, 'shared')
+        os.mkdir(cachedir)
+        os.chmod(cachedir, 0o777)
+        self._load(cachedir)
+        self.assertEqual(os.listdir(cachedir), [])
+
+    def test_unreadable_entry_is_parsed_again(self):
+        cachedir = os.path.join(self.directory, 'fonts')
+        parsed = self._load(cachedir)
+        for name in os.listdir(cachedir):
+            with open(os.path.join(cachedir, name), 'wb') as entry:
+                entry.write(b'GSFONT1\n\xff\xff')
+        font = self._load(cachedir)
+        self.assertEqual(font.face.charWidths, parsed.face.charWidths)
+
+
+if __name__ == '__main__':
+    unittest.main()
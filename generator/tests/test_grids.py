@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+import graph
+import tiling
+from support import useCanvas
+
+
+def _recordingCanvas(pages):
+    """
+    Returns a Canvas class that appends the operators and document of each
+    page to pages as it is shown.
+    """
+
+    from reportlab.pdfgen.canvas import Canvas
+
+    class RecordingCanvas(Canvas):
+
+        def showPage(self):
+            pages.append((' '.join(self._code), self._doc))
+            Canvas.showPage(self)
+
+    return RecordingCanvas
+
+
+def _strokes(code):
+    """
+    Returns the straight lines stroked by PDF operators as a set of
+    (orientation, position, color, width) tuples, and the rectangles filled
+    with each tiling pattern as a list of (name, (x, y, width, height)).
+    Only translations are expected in the transformation matrix.
+    """
+
+    lines = set()
+    fills = list()
+    state = {'offset': (0.0, 0.0), 'color': None, 'width': 1.0,
+             'pattern': None}
+    stack = list()
+    segments = list()
+    operands = list()
+    point = None
+    intext = False
+
+    for token in code.split():
+        if intext:
+            intext = token != 'ET'
+            continue
+        if token == 'BT':
+            intext = True
+            continue
+        try:
+            operands.append(float(token))
+            continue
+        except ValueError:
+            if token.startswith('/'):
+                operands.append(token)
+                continue
+
+        (dx, dy) = state['offset']
+        if token == 'q':
+            stack.append(dict(state))
+        elif token == 'Q':
+            state = stack.pop()
+        elif token == 'cm':
+            (a, b, c, d, e, f) = operands
+            assert (a, b, c, d) == (1, 0, 0, 1), 'only translations'
+            state['offset'] = (dx + e, dy + f)
+        elif token in ('K', 'G', 'RG'):
+            state['color'] = tuple(operands)
+        elif token == 'w':
+            state['width'] = operands[0]
+        elif token == 'scn':
+            state['pattern'] = operands[-1]
+        elif token == 'm':
+            point = (operands[0] + dx, operands[1] + dy)
+        elif token == 'l':
+            end = (operands[0] + dx, operands[1] + dy)
+            segments.append((point, end))
+            point = end
+        elif token == 're':
+            (x, y, w, h) = operands
+            (x, y) = (x + dx, y + dy)
+            if state['pattern'] is not None:
+                fills.append((state['pattern'], (x, y, w, h)))
+            corners = [(x, y), (x + w, y), (x + w, y + h), (x, y + h)]
+            segments.extend(zip(corners, corners[1:] + corners[:1]))
+        elif token in ('S', 's', 'B'):
+            for ((x1, y1), (x2, y2)) in segments:
+                if round(y1, 3) == round(y2, 3):
+                    lines.add(('-', round(y1, 3), state['color'],
+                              state['width']))
+                elif round(x1, 3) == round(x2, 3):
+                    lines.add(('|', round(x1, 3), state['color'],
+                              state['width']))
+            segments = list()
+        elif token in ('n', 'f', 'f*', 'W'):
+            segments = list()
+        operands = list()
+
+    return (lines, fills)
+
+
+def _pageLines(generator, params):
+    """
+    Returns the lines of the first page of a generator call, with those of
+    its tiling patterns repeated across the rectangles they fill.
+    """
+
+    pages = list()
+    with useCanvas(_recordingCanvas(pages)):
+        generator(None, **params)
+    (code, doc) = pages[0]
+    (lines, fills) = _strokes(code)
+
+    patterns = dict((name, key) for (key, name) in
+                    tiling._installPatterns(doc).items())
+    for (name, (x, y, w, h)) in fills:
+        ((step_x, step_y), (origin_x, origin_y), tile) = \
+            patterns[name.lstrip('/')]
+        for (kind, at, color, width) in _strokes(tile)[0]:
+            if kind == '-':
+                (start, step, low, high) = (origin_y + at, step_y, y, y + h)
+            else:
+                (start, step, low, high) = (origin_x + at, step_x, x, x + w)
+            n = int((low - start) // step)
+            while start + n * step < high:
+                position = round(start + n * step, 3)
+                if low < position < high:
+                    lines.add((kind, position, color, width))
+                n += 1
+
+    return lines
+
+
+class GridModeTest(unittest.TestCase):
+    """
+    Table, direct and tiled graphs stroke the same lines.
+    """
+
+    CASES = [
+        (graph.cartesian, {}),
+        (graph.cartesian, {'gridspace': 5}),
+        (graph.cartesian, {'checkered': 1, 'gridspace': 13}),
+        (graph.dual, {}),
+        (graph.dual, {'boxline': 0, 'gridspace': 72}),
+        (graph.dual, {'gridspace': 5, 'linefreq': 4}),
+        (graph.dual, {'gridspace': 10, 'linefreq': 3, 'checkered': 1}),
+        (graph.dual, {'borderless': 1}),
+        ]
+
+    def test_modes_draw_the_same_lines(self):
+        for (generator, params) in self.CASES:
+            table = _pageLines(generator, dict(params, direct=0))
+            for mode in ('direct', 'tiled'):
+                lines = _pageLines(generator, dict(params, **{mode: 1}))
+                self.assertEqual(lines, table, '%s(%r) with %s: %r' % (
+                    generator.__name__, params, mode,
+                    sorted(lines ^ table)[:6]))
+
+    def test_no_writing_line_beneath_the_last_row(self):
+        for mode in ('direct', 'tiled'):
+            lines = _pageLines(graph.dual, {'boxline': 0, 'gridspace': 72,
+                               mode: 1})
+            self.assertNotIn(36.0, [at for (kind, at, color, width) in
+                             lines if kind == '-'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+import graph
+import lined
+from layout import dryRun, RULE_ABOVE
+from tests.test_grids import _pageLines
+
+
+class BorderlessTest(unittest.TestCase):
+    """
+    The dry run of a borderless page gives the geometry it is drawn with.
+    """
+
+    def _checkGrid(self, name, params):
+        generator = getattr(graph, name)
+        params = dict(params, borderless=1, guideline=0)
+        geometry = dryRun(name, params)
+        (((x, y), (w, h)),) = geometry['sections']
+        (cells_x, cells_y) = geometry['cells']
+        gridspace = params.get('gridspace', 18.0)
+
+        origin = {'|': x + (w - cells_x * gridspace) / 2,
+                  '-': y + (h - cells_y * gridspace) / 2}
+        steps = {'|': set(), '-': set()}
+        for (kind, at, color, width) in _pageLines(generator, params):
+            step = (at - origin[kind]) / gridspace
+            self.assertAlmostEqual(step, round(step), 6, '%s(%r): %s %r'
+                                   % (name, params, kind, at))
+            steps[kind].add(int(round(step)))
+
+        # dual pages have a writing line along the top of the grid
+
+        self.assertEqual(min(steps['-']), 1)
+        self.assertEqual(max(steps['-']), cells_y - (name == 'cartesian'))
+        self.assertEqual(min(steps['|']), 1)
+        self.assertEqual(max(steps['|']), cells_x - 1)
+
+    def test_cartesian(self):
+        self._checkGrid('cartesian', {})
+        self._checkGrid('cartesian', {'gridspace': 13, 'direct': 1})
+
+    def test_dual(self):
+        self._checkGrid('dual', {})
+        self._checkGrid('dual', {'gridspace': 13, 'direct': 1})
+        self._checkGrid('dual', {'gridspace': 10, 'tiled': 1,
+                        'pagesize': (842, 595)})
+
+    def test_lined(self):
+        for params in ({}, {'linespace': 24}):
+            params = dict(params, borderless=1, guideline=0)
+            geometry = dryRun('lined', params)
+            (((x, y), (w, h)),) = geometry['sections']
+            rows = [at for (kind, at, color, width) in
+                    _pageLines(lined.lined, params) if kind == '-']
+            self.assertEqual(len(rows), geometry['lines'])
+            self.assertAlmostEqual(max(rows), y + h - RULE_ABOVE, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
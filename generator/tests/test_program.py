@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+import json
+import re
+import unittest
+from io import BytesIO
+
+from catalog import getGenerator
+from program import compileProgram, replayProgram, renderProgram
+from tests.test_grids import _recordingCanvas
+from tests.test_todo import _pages
+
+
+def _replayedPages(program):
+    """
+    Returns the (code, doc) of each page of a program replayed onto a new
+    document.
+    """
+
+    pages = list()
+    page = _recordingCanvas(pages)(BytesIO(), pagesize=tuple(program[
+                                   'pages'][0][0]))
+    replayProgram(program, page)
+    page.save()
+    return pages
+
+
+def _unsuffixed(code):
+    """
+    Returns PDF operators or bytes without the suffixes by which programs
+    rename their forms.
+    """
+
+    pattern = (r'(FormXob\.\w+?)_[0-9a-f]{12}\b' if isinstance(code, str)
+               else br'(FormXob\.\w+?)_[0-9a-f]{12}\b')
+    return re.sub(pattern, r'\1', code)
+
+
+def _forms(doc):
+    """
+    Returns the bounding box and operators of each form of a document by
+    name.
+    """
+
+    forms = dict()
+    for (name, form) in doc.idToObject.items():
+        if name.startswith('FormXob.'):
+            forms[_unsuffixed(name)] = ((form.lowerx, form.lowery,
+                                        form.upperx, form.uppery),
+                                        _unsuffixed(form.stream).split())
+    return forms
+
+
+class ReplayTest(unittest.TestCase):
+    """
+    Replaying a compiled program draws what the generator call draws.
+    """
+
+    CASES = [
+        ('cartesian', {'pages': 3}),
+        ('dual', {'rainbow': 1, 'seed': 2, 'gridspace': 36}),
+        ('dotted', {'tiled': 1}),
+        ('lined', {'layout': (1, 2)}),
+        ('itemizedTodo', {'items': ['Reading', 'Writing']}),
+        ('timeSchedule', {'weeks': 2}),
+        ('monthCalendar', {'year': 2021, 'month': 12, 'months': 2}),
+        ]
+
+    def test_pages_match_a_direct_render(self):
+        for (name, params) in self.CASES:
+            direct = _pages(getGenerator(name), params)
+            program = json.loads(json.dumps(compileProgram(name, params)))
+            replayed = _replayedPages(program)
+            self.assertEqual(len(replayed), len(direct), name)
+            for ((code, doc), (other, otherdoc)) in zip(direct, replayed):
+                self.assertEqual(code.split(), _unsuffixed(other).split(),
+                                 name)
+            self.assertEqual(_forms(direct[-1][1]), _forms(replayed[-1][1]),
+                             name)
+
+    def test_rendered_program_matches_the_generator(self):
+        for (name, params) in self.CASES:
+            data = renderProgram(compileProgram(name, params))
+            direct = getGenerator(name)(None, **params)
+            self.assertEqual(data.split(b'\n')[0], direct.split(b'\n')[0],
+                             name)
+            for kind in (br'/Type /Page\b', br'/Subtype /Form\b',
+                         br'/Subtype /TrueType\b', br'/PatternType\b'):
+                self.assertEqual(len(re.findall(kind, data)),
+                                 len(re.findall(kind, direct)), (name, kind))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import struct
+import unittest
+import zlib
+
+import numpy
+
+from raster import rasterPage, renderPNG
+
+# at 72 dpi a pixel is a point; a letter page with 0.5 in margins holds
+# 30 by 40 cells of 18 pt, from (36, 36.5) for a grid with a 1 pt box
+
+
+def _readPNG(data):
+    """
+    Returns the pixels of an 8-bit PNG image written by writePNG as an
+    array of shape (height, width, channels).
+    """
+
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+    (pos, idat) = (8, b'')
+    while pos < len(data):
+        (length, kind) = struct.unpack('>I4s', data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        if kind == b'IHDR':
+            (w, h, depth, colortype) = struct.unpack('>IIBB', body[:10])
+        elif kind == b'IDAT':
+            idat += body
+        pos += 12 + length
+
+    channels = {0: 1, 2: 3}[colortype]
+    rows = numpy.frombuffer(zlib.decompress(idat), dtype=numpy.uint8)
+    rows = rows.reshape(h, w * channels + 1)
+    return rows[:, 1:].reshape(h, w, channels)
+
+
+class RenderPNGTest(unittest.TestCase):
+
+    def _marked(self, pixels, row, col):
+        return (pixels[row - 1:row + 1, col - 1:col + 1] < 250).any()
+
+    def test_cartesian(self):
+        pixels = _readPNG(renderPNG('cartesian', {}, dpi=72))
+        self.assertEqual(pixels.shape, (792, 612, 1))
+        for k in range(31):
+            self.assertTrue(self._marked(pixels, 400, 36 + 18 * k), k)
+        for k in range(41):
+            self.assertTrue(self._marked(pixels, 792 - int(36.5 + 18 * k),
+                            45), k)
+        for k in range(30):
+            self.assertEqual(pixels[405, 45 + 18 * k, 0], 255)
+
+    def test_dotted_rainbow(self):
+        params = {'rainbow': 1, 'seed': 3}
+        data = renderPNG('dotted', params, dpi=72)
+        self.assertEqual(data, renderPNG('dotted', params, dpi=72))
+        pixels = _readPNG(data)
+        self.assertEqual(pixels.shape, (792, 612, 3))
+
+        colored = 0
+        for j in range(0, 41, 5):
+            for k in range(31):
+                (row, col) = (36 + 18 * j, 36 + 18 * k)
+                self.assertTrue(self._marked(pixels, row, col), (j, k))
+                self.assertTrue((pixels[row + 9, col + 9] == 255).all())
+                dot = pixels[row - 1:row + 1, col - 1:col + 1].reshape(-1, 3)
+                colored += (dot.max(axis=1) - dot.min(axis=1) > 20).any()
+        self.assertGreater(colored, 100)
+
+    def test_lined(self):
+        pixels = _readPNG(renderPNG('lined', {}, dpi=72))
+        self.assertEqual(pixels.shape, (792, 612, 1))
+
+        # the first line sits one spacing and 2 mm beneath the top
+
+        top = 756 - 72.0 / 25.4 * 2 - 20.25
+        for k in range(34):
+            row = 792 - int(top - 20.25 * k)
+            self.assertTrue(self._marked(pixels, row, 300), k)
+            self.assertEqual(pixels[row + 10, 300, 0], 255)
+
+    def test_png_holds_the_raster(self):
+        pixels = rasterPage('lined', {'rainbow': 1, 'seed': 1}, 36)
+        expected = numpy.rint(numpy.clip(pixels, 0, 1) * 255)
+        decoded = _readPNG(renderPNG('lined', {'rainbow': 1, 'seed': 1},
+                           dpi=36))
+        self.assertTrue((decoded == expected).all())
+
+    def test_width_sets_the_resolution(self):
+        pixels = _readPNG(renderPNG('cartesian', {}, width=306))
+        self.assertEqual(pixels.shape, (396, 306, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import threading
+import time
+import unittest
+from io import BytesIO, StringIO
+
+try:
+    from urllib2 import urlopen, HTTPError
+except ImportError:
+    from urllib.request import urlopen
+    from urllib.error import HTTPError
+
+import server
+
+
+class SlotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.renderCall = server.renderCall
+        self.timeout = server.RENDER_TIMEOUT
+        server.RENDER_TIMEOUT = 0.5
+        self.stderr = sys.stderr
+        sys.stderr = (BytesIO() if bytes is str else StringIO())  # access log
+
+        def slowRender(name, params, directory=None):
+            time.sleep(params.pop('sleep', 0))
+            return self.renderCall(name, params, directory)
+
+        server.renderCall = slowRender
+        self.server = server.RenderServer(('127.0.0.1', 0), processes=1,
+                                          maxqueue=0, threads=1)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        server.renderCall = self.renderCall
+        server.RENDER_TIMEOUT = self.timeout
+        sys.stderr = self.stderr
+
+    def _status(self, query):
+        url = 'http://127.0.0.1:%d/cartesian?%s' % (
+            self.server.server_address[1], query)
+        try:
+            return urlopen(url).getcode()
+        except HTTPError as error:
+            return error.code
+
+    def test_slot_is_held_until_the_render_ends(self):
+        self.assertEqual(self._status('sleep=1.5'), 500)
+        self.assertEqual(self._status('gridspace=36'), 503)
+        time.sleep(1.5)
+        self.assertEqual(self._status('gridspace=36'), 200)
+
+    def test_failed_render_releases_its_slot(self):
+        self.assertEqual(self._status('rainbow=1&seed="a"&gridspace=36'),
+                         500)
+        self.assertEqual(self._status('gridspace=36'), 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+import re
+import unittest
+from io import BytesIO
+
+from streaming import iterDocument, streamDocument
+
+
+def _checkXref(test, data):
+    """
+    Asserts that the cross reference table of a PDF document gives the
+    offset of every object, and that startxref gives the offset of the
+    table.
+    """
+
+    start = int(re.search(br'startxref\s+(\d+)\s+%%EOF\s*$', data).group(1))
+    test.assertEqual(data[start:start + 5], b'xref\n')
+    (first, count) = map(int, data[start:].split(b'\n')[1].split())
+    test.assertEqual(first, 0)
+
+    table = data[start:].split(b'\n')[2:2 + count]
+    numbers = set()
+    for (n, entry) in enumerate(table[1:], 1):
+        (offset, generation, kind) = entry.split()
+        test.assertEqual(kind, b'n')
+        marker = ('%d 0 obj' % n).encode('ascii')
+        test.assertEqual(data[int(offset):int(offset) + len(marker)], marker)
+        numbers.add(n)
+
+    found = set(int(n) for n in re.findall(br'(?m)^(\d+) 0 obj', data))
+    test.assertEqual(found, numbers)
+    test.assertEqual(int(re.search(br'/Size (\d+)', data).group(1)), count)
+
+
+class XrefTest(unittest.TestCase):
+
+    CASES = [
+        ('cartesian', {'pages': 3}),
+        ('lined', {}),
+        ('monthCalendar', {'year': 2020, 'month': 11, 'months': 3}),
+        ('timeSchedule', {'weeks': 2}),
+        ]
+
+    def test_streamed_documents_have_valid_xref(self):
+        for (name, params) in self.CASES:
+            output = BytesIO()
+            streamDocument(name, params, output)
+            _checkXref(self, output.getvalue())
+            _checkXref(self, streamDocument(name, params))
+
+    def test_iterated_documents_have_valid_xref(self):
+        for (name, params) in self.CASES:
+            chunks = list(iterDocument(name, params))
+            self.assertGreater(len(chunks), 1)
+            _checkXref(self, b''.join(chunks))
+
+
+if __name__ == '__main__':
+    unittest.main()
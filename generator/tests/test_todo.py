@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+import re
+import unittest
+
+import todo
+from support import useCanvas
+from tests.test_grids import _recordingCanvas
+
+
+def _topicStyle():
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.styles import ParagraphStyle
+
+    style = ParagraphStyle('TopicStyle')
+    style.fontSize = 10
+    style.leading = 12
+    style.alignment = TA_CENTER
+    style.fontName = 'Helvetica'
+    return style
+
+
+def _pages(generator, params):
+    pages = list()
+    with useCanvas(_recordingCanvas(pages)):
+        generator(None, **params)
+    return pages
+
+
+class TopicTest(unittest.TestCase):
+
+    def test_plain_topics_are_drawn_as_lines(self):
+        (height, lines) = todo._topicLines('Reading', _topicStyle(), 100)
+        self.assertEqual([text for (x, y, text) in lines], ['Reading'])
+
+    def test_topics_with_their_own_font_need_a_paragraph(self):
+        for item in ('<font color=red>Red</font>',
+                     '<font size=14>Big</font>', '<b>Bold</b>'):
+            self.assertIsNone(todo._topicLines(item, _topicStyle(), 100)[1],
+                              item)
+
+    def test_colored_and_resized_topics_are_drawn_so(self):
+        items = ['<font color=red>Red</font>', '<font size=14>Big</font>']
+        (code, doc) = _pages(todo.itemizedTodo, {'items': items})[0]
+        self.assertIn('1 0 0 rg', code)
+        self.assertTrue(re.search(r'/F[\d+]+ 14 Tf', code))
+
+
+class TimeScheduleTest(unittest.TestCase):
+
+    def test_weeks_share_one_form(self):
+        data = todo.timeSchedule(None, weeks=3)
+        self.assertEqual(len(re.findall(br'/Type /Page\b', data)), 3)
+        self.assertEqual(data.count(b'/Subtype /Form'), 1)
+
+        for halfpage in (0, 1):
+            pages = _pages(todo.timeSchedule, {'weeks': 3, 'halfpage':
+                           halfpage})
+            self.assertEqual(len(pages), 3)
+            for (week, (code, doc)) in enumerate(pages, 1):
+                self.assertIn('/FormXob.GiveSheetSchedule Do', code)
+                numbers = re.findall(r'\((\d+)\) Tj', code)
+                self.assertEqual(numbers, [str(week)] * (1 + halfpage))
+
+    def test_single_week_has_no_form(self):
+        data = todo.timeSchedule(None)
+        self.assertEqual(len(re.findall(br'/Type /Page\b', data)), 1)
+        self.assertNotIn(b'/Subtype /Form', data)
+
+    def test_no_weeks(self):
+        self.assertRaises(ValueError, todo.timeSchedule, None, weeks=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
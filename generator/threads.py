@@ -0,0 +1,104 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+
+from catalog import getGenerator, normalizeParams, warmUp
+
+
+def renderCall(name, params, directory=None):
+    """
+    Returns the PDF bytes of a generator call, through the PDF cache if a
+    directory is given.
+
+    Keyword arguments:
+    name -- name of the generator, a key of catalog.GENERATORS
+    params -- dict of keyword arguments for the generator
+    directory -- location of the PDF cache, no cache if None
+    """
+
+    if directory:
+        from cache import cachedPDF
+
+        return cachedPDF(name, params, directory)
+    return getGenerator(name)(None, **normalizeParams(name, params))
+
+
+class RenderPool(object):
+    """
+    Renders generator calls on a pool of threads in this process. The
+    threads share the imported generators, registered fonts and memoised
+    layouts, so no render pays for them after the pool is created.
+
+        with RenderPool(4) as pool:
+            result = pool.submit('cartesian', {'gridspace': 18})
+            data = pool.render('itemizedTodo', {'items': ['Reading']})
+            pdf = result.get()
+
+    Renders hold the interpreter lock while drawing, so threads serve
+    concurrent requests from one warm process rather than adding CPUs;
+    batch.runBatch and server.RenderServer use processes for that.
+
+    Keyword arguments:
+    threads -- number of threads; the number of CPUs if None
+    directory -- location of the PDF cache, no cache if None
+    """
+
+    def __init__(self, threads=None, directory=None):
+        warmUp()
+        self.pool = ThreadPool(threads or cpu_count())
+        self.directory = directory
+
+    def submit(self, name, params, callback=None):
+        """
+        Starts a generator call and returns its AsyncResult, whose get()
+        returns the PDF bytes or raises the error of the render.
+
+        Keyword arguments:
+        name -- name of the generator, a key of catalog.GENERATORS
+        params -- dict of keyword arguments for the generator
+        callback -- function called with the PDF bytes once rendered
+        """
+
+        return self.pool.apply_async(renderCall, (name, params,
+                                     self.directory), callback=callback)
+
+    def render(self, name, params, timeout=None):
+        """
+        Returns the PDF bytes of a generator call, waiting at most timeout
+        seconds if given.
+
+        Keyword arguments:
+        name -- name of the generator, a key of catalog.GENERATORS
+        params -- dict of keyword arguments for the generator
+        timeout -- seconds to wait, None to wait as long as it takes
+        """
+
+        return self.submit(name, params).get(timeout)
+
+    def map(self, calls):
+        """
+        Returns the PDF bytes of a list of (name, params) calls, in order.
+
+        Keyword arguments:
+        calls -- list of (name, params) tuples
+        """
+
+        results = [self.submit(name, params) for (name, params) in calls]
+        return [result.get() for result in results]
+
+    def close(self):
+        """
+        Waits for the submitted calls to finish and stops the threads.
+        """
+
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
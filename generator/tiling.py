@@ -0,0 +1,124 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from reportlab.lib.rl_accel import fp_str
+from reportlab.pdfbase.pdfdoc import PDFStream, PDFDictionary, PDFName, \
+    PDFArray, PDFResourceDictionary, PDFObjectReference
+
+
+def colorCode(color, stroke=0):
+    """
+    Returns the PDF operator setting the fill or stroke to a CMYK color.
+
+    Keyword arguments:
+    color -- a CMYKColor instance, such as those returned by grey()
+    stroke -- true for the stroke color, else the fill color
+    """
+
+    values = fp_str(color.cyan, color.magenta, color.yellow, color.black)
+    return values + (' K' if stroke else ' k')
+
+
+def tilingPattern(page, step, code, origin=(0, 0)):
+    """
+    Registers a colored tiling pattern and returns its resource name.
+
+    The cell is clipped to (0, 0, step_x, step_y) and repeated across any
+    area filled with the pattern. Identical patterns are only stored once.
+
+    Keyword arguments:
+    page -- a Canvas instance in whose document the pattern is stored
+    step -- size of a single cell as (width, height) tuple
+    code -- PDF operators drawing a single cell, in cell coordinates
+    origin -- location of the lower left corner of one cell on the page
+    """
+
+    doc = page._doc
+    patterns = _installPatterns(doc)
+
+    key = (tuple(step), tuple(origin), code)
+    if key in patterns:
+        return patterns[key]
+    name = 'Ptn%d' % len(patterns)
+
+    (step_x, step_y) = step
+    (origin_x, origin_y) = origin
+
+    info = PDFDictionary()
+    info['Type'] = PDFName('Pattern')
+    info['PatternType'] = 1
+    info['PaintType'] = 1  # colored
+    info['TilingType'] = 1  # constant spacing
+    info['BBox'] = PDFArray([0, 0, step_x, step_y])
+    info['XStep'] = step_x
+    info['YStep'] = step_y
+    info['Matrix'] = PDFArray([1, 0, 0, 1, origin_x, origin_y])
+    resources = PDFResourceDictionary()
+    resources.basicProcs()
+    info['Resources'] = resources
+
+    doc.Reference(PDFStream(info, code), name)
+    patterns[key] = name
+    return name
+
+
+def fillPattern(page, name, x, y, width, height):
+    """
+    Fills a rectangle on the canvas with a registered tiling pattern.
+
+    Keyword arguments:
+    page -- a Canvas instance on which to draw
+    name -- resource name returned by tilingPattern()
+    x, y -- lower left corner of the rectangle
+    width, height -- size of the rectangle
+    """
+
+    page.saveState()
+    page._code.append('/Pattern cs /%s scn' % name)
+    page.rect(x, y, width, height, stroke=0, fill=1)
+    page.restoreState()
+
+
+def _installPatterns(doc):
+    """
+    Returns the pattern registry of a document, hooking the document so
+    every page and form added from now on lists the patterns it may use.
+    """
+
+    patterns = getattr(doc, '_tilingPatterns', None)
+    if patterns is not None:
+        return patterns
+    patterns = doc._tilingPatterns = dict()
+
+    def _patternDict():
+        return dict((name, PDFObjectReference(name)) for name in
+                    patterns.values())
+
+    addPage = doc.addPage
+    addForm = doc.addForm
+
+    def _addPage(page):
+        check_format = page.check_format
+
+        def _check_format(document):
+            check_format(document)
+            page.Resources.Pattern.update(_patternDict())
+
+        page.check_format = _check_format
+        addPage(page)
+
+    def _addForm(name, form):
+        if not form.Resources:
+            resources = PDFResourceDictionary()
+            resources.basicFonts()
+            resources.allProcs()
+            if form.XObjects:
+                resources.XObject = form.XObjects
+            resources.Pattern = _patternDict()
+            form.Resources = resources
+        addForm(name, form)
+
+    doc.addPage = _addPage
+    doc.addForm = _addForm
+
+    return patterns
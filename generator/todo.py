@@ -2,19 +2,35 @@
 # -*- coding: utf-8 -*-
 
 import math
-from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch, mm
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
-from reportlab.lib.styles import ParagraphStyle
-from reportlab.lib.enums import TA_CENTER
-from reportlab.platypus import Table, TableStyle, Frame, Paragraph
-from reportlab.pdfbase.pdfform import textFieldAbsolute
 
 from logo import placeLogo
 from coloring import grey
-from support import registerFonts
+from support import registerFonts, beginRepeat, endRepeat, \
+    openOutput, newCanvas, saveOutput
 from lined import ruleSection
+from profiling import stage, count
+from layout import todoLayout, scheduleHours, KEY_H, KEY_W, \
+    KEY_SPACER_ABOVE, DAYS_LABEL_SIZE, MAX_TOPIC_LEN, HOUR_LABEL_W
+
+# fonts used by the todo lists as (fontname, relpath)
+
+FONTS = [('LearningCurve',
+         'support/fonts/learning_curve/LearningCurve.ttf'),
+         ('FreeUniversal',
+         'support/fonts/free_universal/FreeUniversal-Regular.ttf'),
+         ('FreeUniversal-Bold',
+         'support/fonts/free_universal/FreeUniversal-Bold.ttf'),
+         ('FreeUniversal-Italic',
+         'support/fonts/free_universal/FreeUniversal-Italic.ttf')]
+
+
+# memoised topic layouts as (text, font, size, leading, width): layout
+
+_topics = dict()
+_MAX_TOPICS = 4096
 
 
 # ASCII Model
@@ -56,7 +72,7 @@ from lined import ruleSection
 #######################################|#####################################
 
 def itemizedTodo(
-    filename,
+    filename=None,
     items=None,
     pagesize=letter,
     margins=0.5 * inch,
@@ -67,13 +83,17 @@ def itemizedTodo(
     collapseweekend=0,
     gridline=1,
     gridcolor=20,
+    pages=1,
+    precision=None,
+    compression=None,
     **excessParams
     ):
     """
     Generates a weekly todo list. Each columns represents a day, and the rows are itemized by topics.
 
     Keyword arguments:
-    filename -- output PDF document name
+    filename -- output PDF document name or writable binary stream; the PDF
+        bytes are returned if None
     items -- list of topics for a given week
     pagesize -- size of page as (width, height) tuple
     margins -- size of margins around page
@@ -84,6 +104,11 @@ def itemizedTodo(
     collapseweekend -- Sat and Sun are collapsed into a single 'Weekend' column and notes column is omitted; ignored if 'includeweekend' is false
     gridline -- thickness of lines around cells
     gridcolor -- color of grid lines around cells
+    pages -- number of identical pages, all sharing one drawing of the page
+    precision -- decimals of coordinates in compact content streams, None
+        to write them in full
+    compression -- zlib level of content streams, 0 (fastest) to 9
+        (smallest), None for the default
     """
 
     # full spread: landscape orientation
@@ -100,21 +125,15 @@ def itemizedTodo(
 
     # delermine columns
 
-    weekday_labels = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-    if includeweekend:
-        if collapseweekend:
-            day_labels = weekday_labels + ['Weekend']
-        else:
-            day_labels = weekday_labels + ['Saturday', 'Sunday'] + ['Notes']
-    else:
-        day_labels = weekday_labels + ['Notes']
-
+    day_labels = _dayLabels(includeweekend, collapseweekend)
     day_labels_left = day_labels[:len(day_labels) / 2]
     day_labels_right = day_labels[len(day_labels) / 2:]
 
     # canvas attributes
 
-    page = canvas.Canvas(filename, pagesize=pagesize)
+    output = openOutput(filename)
+    page = newCanvas(output, pagesize, precision, compression)
+    beginRepeat(page, pages)
     page.setTitle('Weekly Todo List by Give Sheet')
     page.setAuthor('Andre Aboulian via Give Sheet')
     page.setSubject('Page Template')
@@ -133,92 +152,24 @@ def itemizedTodo(
 
     # register fonts
 
-    registerFonts([('LearningCurve',
-                  'support/fonts/learning_curve/LearningCurve.ttf'),
-                  ('FreeUniversal',
-                  'support/fonts/free_universal/FreeUniversal-Regular.ttf'),
-                  ('FreeUniversal-Bold',
-                  'support/fonts/free_universal/FreeUniversal-Bold.ttf'),
-                  ('FreeUniversal-Italic',
-                  'support/fonts/free_universal/FreeUniversal-Italic.ttf')])
-
-    # dimensions and layout
-
-    key_h = 24
-    key_w = 150
-    key_spacer_above = 0  # space between 'Week' and top margin
-    key_spacer_below = 4  # space between 'Week' and grid beneath
-    global key_spacer_indent  # space between 'Week' and topic column
-    key_spacer_indent = 0
-    global key_spacer_left  # space between 'Week' and left margin
+    registerFonts(FONTS)
 
     # grid placement
 
-    grids = list()
+    sides = {'left': day_labels_left, 'right': day_labels_right,
+             'both': day_labels}
+    grids = [(origin, size, sides[side]) for (origin, size, side) in
+             todoLayout(pagesize, margins, halfpage, booklet, binding)]
 
     if halfpage:
-
-        # orgin -- lower left corner
-        # area -- space occupied by week layout
-        # grid -- space occupied by individual grids
-
-        (area_w, area_h) = (page_w - 2 * margins, (page_h - 4 * margins) / 2)
-        grid_h = area_h - key_h - key_spacer_above - key_spacer_below
-
-        if booklet:
-
-            # half page booklet
-
-            grid_w = (area_w - 2 * binding) / 2
-            origin_bottom_left = (margins, margins)
-            origin_bottom_right = (page_w / 2 + binding, margins)
-            origin_top_left = (margins, page_h / 2 + margins)
-            origin_top_right = (page_w / 2 + binding, page_h / 2 + margins)
-            grid_size = (grid_w, grid_h)
-
-            grids.append((origin_bottom_left, grid_size, day_labels_left))
-            grids.append((origin_bottom_right, grid_size, day_labels_right))
-            grids.append((origin_top_left, grid_size, day_labels_left))
-            grids.append((origin_top_right, grid_size, day_labels_right))
-        else:
-
-        # half page spread
-
-            origin_bottom = (margins, margins)
-            origin_top = (margins, page_h / 2 + margins)
-
-            grids.append((origin_top, (area_w, grid_h), day_labels))
-            grids.append((origin_bottom, (area_w, grid_h), day_labels))
-
         placeLogo(margins, pagesize, page, quadrant=1)
-        placeLogo(margins, pagesize, page, quadrant=4)
-    else:
-
-        (area_w, area_h) = (page_w - 2 * margins, page_h - 2 * margins)
-        grid_h = area_h - key_h - key_spacer_above - key_spacer_below
-
-        if booklet:
-
-            # full page booklet
-
-            grid_w = (area_w - 2 * binding) / 2
-            origin_left = (margins, margins)
-            origin_right = (page_w / 2 + binding, margins)
-
-            grids.append((origin_left, (grid_w, grid_h), day_labels_left))
-            grids.append((origin_right, (grid_w, grid_h), day_labels_right))
-        else:
-
-        # full page spread
-
-            grids.append(((margins, margins), (area_w, grid_h), day_labels))
+    placeLogo(margins, pagesize, page, quadrant=4)
 
-        placeLogo(margins, pagesize, page, quadrant=4)
-
-    # draw grids
+    # draw grids, the 'Week' boxes line up with the topic column
 
+    key_spacer_indent = 0  # space between 'Week' and topic column
     for (origin, size, days) in grids:
-        _makeGrid(
+        key_spacer_left = key_spacer_indent + _makeGrid(
             page=page,
             items=items,
             days=days,
@@ -230,28 +181,13 @@ def itemizedTodo(
 
     # draw 'Week' boxes
 
-    def _makeWeekBox(origin):
-        (x_o, y_o) = origin
-
-        page.setStrokeColor(grey(gridcolor))
-        page.setLineWidth(gridline)
-        page.rect(x_o, y_o, key_w, key_h)
-
-        page.setFillColor(grey(100))
-        page.setFont('LearningCurve', 16)
-        week_padding = 0.5 * (key_h - 16)
-        page.drawString(x_o + week_padding, y_o + week_padding + 2, 'Week:')
-
-    key_offset = margins + key_spacer_above + key_h
-    if halfpage:
-        _makeWeekBox((margins + key_spacer_left, page_h - key_offset))  # top
-        _makeWeekBox((margins + key_spacer_left, page_h / 2 - key_offset))  # bottom
-    else:
-        _makeWeekBox((margins + key_spacer_left, page_h - key_offset))
+    for origin in _weekBoxes(page_h, margins, halfpage, key_spacer_left):
+        _makeWeekBox(page, origin, gridline, gridcolor)
 
     # finalize document
 
-    page.save()
+    endRepeat(page, pages)
+    return saveOutput(page, filename, output)
 
 
 def _makeGrid(
@@ -275,8 +211,16 @@ def _makeGrid(
     size -- size of grid as (width, height) tuple
     gridline -- thickness of lines around cells
     gridcolor -- color of grid lines around cells
+
+    Returns the width of the topic column.
     """
 
+    # platypus is slow to import, so only on use
+
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.platypus import Table, TableStyle, Frame, Paragraph
+
     page.saveState()
 
     # fonts
@@ -286,7 +230,7 @@ def _makeGrid(
 
     # dimensions and layout
 
-    days_label_size = 12
+    days_label_size = DAYS_LABEL_SIZE
     topic_padding = 2
 
     (area_w, area_h) = size
@@ -295,7 +239,7 @@ def _makeGrid(
 
         # check topic length
 
-    max_topic_len = 40
+    max_topic_len = MAX_TOPIC_LEN
     for item in items:
         if len(item) > max_topic_len:
             raise ValueError("The topic \'" + item + "\' is " + str(len(item))
@@ -311,24 +255,19 @@ def _makeGrid(
     topic_style.fontName = font_topics
     topic_style.splitLongWords = 1
 
-    topics = list()  # (topic, wrap_length)
-    for item in items:
-        p = Paragraph(item, topic_style)
-        l = p.wrap(cell_h - 2 * topic_padding, 0)[1]
-        topics.append((p, l))
+    with stage('paragraphs'):
+        topics = [_topicLines(item, topic_style, cell_h - 2 * topic_padding)
+                  for item in items]  # (wrap_length, lines)
 
         # max label size
 
     topic_label_size = topic_style.leading
-    for (topic, wrap_length) in topics:
+    for (wrap_length, lines) in topics:
         if wrap_length > topic_label_size:
             topic_label_size = wrap_length
 
     topic_label_size_padded = topic_label_size + 2 * topic_padding  # add padding
 
-    global key_spacer_left, key_spacer_indent
-    key_spacer_left = topic_label_size_padded + key_spacer_indent
-
     inner_w = area_w - topic_label_size_padded
     cell_w = inner_w / len(days)
 
@@ -337,32 +276,35 @@ def _makeGrid(
 
     # create plain table
 
-    days_row = [[''] + days]
-    tasks_rows = [[''] * (1 + len(days))] * len(items)
+    count('cells', len(items) * len(days))
 
-    data = days_row + tasks_rows
-    col_w = [topic_label_size_padded] + [cell_w] * len(days)
-    row_h = [days_label_size] + [cell_h] * len(items)
-    table = Table(data, colWidths=col_w, rowHeights=row_h)
+    with stage('tablestyle'):
+        days_row = [[''] + days]
+        tasks_rows = [[''] * (1 + len(days))] * len(items)
 
-    # apply table style
+        data = days_row + tasks_rows
+        col_w = [topic_label_size_padded] + [cell_w] * len(days)
+        row_h = [days_label_size] + [cell_h] * len(items)
+        table = Table(data, colWidths=col_w, rowHeights=row_h)
 
-    table_style = TableStyle()
+        # apply table style
 
-    table_style.add('VALIGN', (1, 0), (-1, 0), 'MIDDLE')
-    table_style.add('ALIGN', (1, 0), (-1, 0), 'CENTER')
+        table_style = TableStyle()
 
-    table_style.add('FONT', (1, 0), (-1, 0), font_days, 10)  # days
-    table_style.add('TEXTCOLOR', (1, 0), (-1, 0), grey(100))
+        table_style.add('VALIGN', (1, 0), (-1, 0), 'MIDDLE')
+        table_style.add('ALIGN', (1, 0), (-1, 0), 'CENTER')
 
-    table_style.add('GRID', (0, 1), (0, -1), gridline, grey(gridcolor))  # topics
-    table_style.add('GRID', (1, 0), (-1, 0), gridline, grey(gridcolor))  # days
-    table_style.add('LINEBELOW', (1, -1), (-1, -1), gridline, grey(gridcolor))  # bottom
-    table_style.add('LINEAFTER', (-1, 1), (-1, -1), gridline, grey(gridcolor))  # right
-    table_style.add('INNERGRID', (1, 1), (-1, -1), 0.5 * gridline,
-                    grey(gridcolor))
+        table_style.add('FONT', (1, 0), (-1, 0), font_days, 10)  # days
+        table_style.add('TEXTCOLOR', (1, 0), (-1, 0), grey(100))
 
-    table.setStyle(table_style)
+        table_style.add('GRID', (0, 1), (0, -1), gridline, grey(gridcolor))  # topics
+        table_style.add('GRID', (1, 0), (-1, 0), gridline, grey(gridcolor))  # days
+        table_style.add('LINEBELOW', (1, -1), (-1, -1), gridline, grey(gridcolor))  # bottom
+        table_style.add('LINEAFTER', (-1, 1), (-1, -1), gridline, grey(gridcolor))  # right
+        table_style.add('INNERGRID', (1, 1), (-1, -1), 0.5 * gridline,
+                        grey(gridcolor))
+
+        table.setStyle(table_style)
 
     # format notes column
 
@@ -388,44 +330,464 @@ def _makeGrid(
 
     # draw table
 
-    frame = Frame(
-        x_o,
-        y_o,
-        area_w,
-        area_h,
-        leftPadding=0,
-        bottomPadding=0,
-        rightPadding=0,
-        topPadding=0,
-        )
-    frame.addFromList([table], page)
+    with stage('frame'):
+        frame = Frame(
+            x_o,
+            y_o,
+            area_w,
+            area_h,
+            leftPadding=0,
+            bottomPadding=0,
+            rightPadding=0,
+            topPadding=0,
+            )
+        frame.addFromList([table], page)
+
+        # draw topics, all but those of mixed fonts as one text object
+
+        page.rotate(90)  # rotated (y, -x)
+        page.setFillColor(topic_style.textColor)
+        text = page.beginText()
+        text.setFont(font_topics, topic_style.fontSize, topic_style.leading)
+        mixed = list()
+        for (i, (wrap_length, lines)) in enumerate(topics):
+            middle_comp = 0.5 * (topic_label_size - wrap_length)
+            (loc_x, loc_y) = (y_o + i * cell_h + topic_padding,
+                              -(x_o + topic_label_size_padded - middle_comp)
+                              + topic_padding)
+            if lines is None:
+                mixed.append((items[i], loc_x, loc_y))
+                continue
+            for (x, y, line) in lines:
+                text.setTextOrigin(loc_x + x, loc_y + y)
+                text.textOut(line)
+        page.drawText(text)
+        for (item, loc_x, loc_y) in mixed:
+            topic = Paragraph(item, topic_style)
+            topic.wrap(cell_h - 2 * topic_padding, 0)
+            topic.drawOn(page, loc_x, loc_y)
+        page.rotate(-90)
 
-    # draw topics
+    # restore canvas state
 
-    page.rotate(90)  # rotated (y, -x)
-    for (i, (topic, wrap_length)) in enumerate(topics):
-        middle_comp = 0.5 * (topic_label_size - wrap_length)
-        (loc_x, loc_y) = (y_o + i * cell_h, -(x_o + topic_label_size_padded
-                          - middle_comp))
-        frame = Frame(
-            loc_x,
-            loc_y,
-            cell_h,
-            wrap_length + 2 * topic_padding,
-            showBoundary=0,
-            leftPadding=topic_padding,
-            rightPadding=topic_padding,
-            topPadding=topic_padding,
-            bottomPadding=topic_padding,
+    page.restoreState()
+
+    return topic_label_size_padded
+
+
+def _topicLines(item, style, width):
+    """
+    Returns the layout of a topic in a centered Paragraph of a style and
+    width as (height, lines), where lines is a tuple of (x, y, text) tuples
+    from the lower left of the Paragraph, or None if markup sets a font,
+    size or color other than the style's and only a Paragraph can draw it.
+    Results are memoised by font, size, color, width and text.
+
+    Keyword arguments:
+    item -- topic as Paragraph markup
+    style -- a centered ParagraphStyle
+    width -- width available to the topic
+    """
+
+    key = (item, style.fontName, style.fontSize, style.leading,
+           style.textColor, width)
+    result = _topics.get(key)
+    if result is not None:
+        return result
+
+    from reportlab import rl_config
+    from reportlab.platypus import Paragraph
+
+    topic = Paragraph(item, style)
+    height = topic.wrap(width, 0)[1]
+    para = topic.blPara
+
+    # lines as Paragraph.drawPara places them
+
+    # markup around the whole topic sets the font, size and color of the
+    # paragraph rather than of its lines
+
+    lines = list()
+    if para.kind == 0 and (para.fontName, para.fontSize, para.textColor) \
+            != (style.fontName, style.fontSize, style.textColor):
+        lines = None
+    for (n, line) in enumerate(para.lines if lines is not None else ()):
+        if para.kind == 0:
+            (extraspace, text) = (line[0], ' '.join(line[1]))
+        else:
+            frag = line.words[0]
+            if len(line.words) > 1 or (frag.fontName, frag.fontSize,
+                    frag.textColor) != (style.fontName, style.fontSize,
+                    style.textColor) or frag.rise or frag.link \
+                    or frag.us_lines:
+                lines = None
+                break
+            (extraspace, text) = (line.extraSpace, frag.text)
+        if extraspace < -1e-8 and ' ' in text:  # squeezed word spacing
+            lines = None
+            break
+        first = para if para.kind == 0 else para.lines[0]
+        top = (first.fontSize if rl_config.paraFontSizeHeightOffset else
+               getattr(first, 'ascent', first.fontSize))
+        lines.append((0.5 * extraspace, height - top - n * style.leading,
+                     text))
+
+    if len(_topics) >= _MAX_TOPICS:
+        _topics.clear()
+    result = _topics[key] = (height, (None if lines is None else
+                             tuple(lines)))
+    return result
+
+
+# ASCII Model of a time schedule
+
+# - : key and legend
+# @ : weekdays
+# ? : hours
+## : writable area
+
+#######################################|#####################################
+######------------#####################|######################-------------##
+######------------#####################|######################-------------##
+#######################################|#####################################
+###### @@@@@@@@@ @@@@@@@@@ @@@@@@@@@ ##|##### @@@@@@@@@ @@@@@@@@@ @@@@@@@@ ##
+###                                  ##|##                                 ##
+### ?? ######### ######### ######### ##|## ?? ######### ######### ######## ##
+###                                  ##|##                                 ##
+### ?? ######### ######### ######### ##|## ?? ######### ######### ######## ##
+###                                  ##|##                                 ##
+### ?? ######### ######### ######### ##|## ?? ######### ######### ######## ##
+###                                  ##|##                                 ##
+### ?? ######### ######### ######### ##|## ?? ######### ######### ######## ##
+###                                  ##|##                                 ##
+#######################################|#####################################
+
+def timeSchedule(
+    filename=None,
+    timerange=(8, 20),
+    twentyfour=0,
+    pagesize=letter,
+    margins=0.5 * inch,
+    halfpage=0,
+    booklet=0,
+    binding=0.25 * inch,
+    includeweekend=1,
+    collapseweekend=0,
+    gridline=1,
+    gridcolor=20,
+    weeks=1,
+    precision=None,
+    compression=None,
+    **excessParams
+    ):
+    """
+    Generates a time-based schedule planner. Each column represents a day, and the rows are the hours of the day.
+
+    Keyword arguments:
+    filename -- output PDF document name or writable binary stream; the PDF
+        bytes are returned if None
+    timerange -- range of times for a give day in a (start, stop) tuple of hours in range [0,23]
+    twentyfour -- time displayed as hour in range [0,23], else AM and PM used
+    pagesize -- size of page as (width, height) tuple
+    margins -- size of margins around page
+    halfpage -- two half-page duplicates (portrait), else one full-page spread (landscape)
+    booklet -- flag to split columns evenly among two pages, along with left labels
+    binding -- size of spacing between designated pages; ignored if 'booklet' is false
+    includeweekend -- includes column(s) for weekend, else includes weekdays only and a single notes column
+    collapseweekend -- Sat and Sun are collapsed into a single 'Weekend' column and notes column is omitted; ignored if 'includeweekend' is false
+    gridline -- thickness of lines around cells
+    gridcolor -- color of grid lines around cells
+    weeks -- number of weeks, such as 16 for a semester, a page each and
+        numbered if more than one; all share one drawing of the grid
+    precision -- decimals of coordinates in compact content streams, None
+        to write them in full
+    compression -- zlib level of content streams, 0 (fastest) to 9
+        (smallest), None for the default
+    """
+
+    hours = scheduleHours(timerange)
+    if weeks < 1:
+        raise ValueError('A schedule has at least one week.')
+
+    # full spread: landscape orientation
+
+    if not halfpage:
+        pagesize = pagesize[::-1]
+
+    (page_w, page_h) = pagesize
+
+    # delermine columns
+
+    day_labels = _dayLabels(includeweekend, collapseweekend)
+    day_labels_left = day_labels[:len(day_labels) / 2]
+    day_labels_right = day_labels[len(day_labels) / 2:]
+
+    # canvas attributes
+
+    output = openOutput(filename)
+    page = newCanvas(output, pagesize, precision, compression)
+    page.setTitle('Weekly Schedule by Give Sheet')
+    page.setAuthor('Andre Aboulian via Give Sheet')
+    page.setSubject('Page Template')
+    page.setKeywords([
+        'weekly',
+        'time',
+        'schedule',
+        'planner',
+        'semester',
+        'givesheet',
+        'pdf',
+        'grid',
+        'template',
+        'paper',
+        ])
+
+    # register fonts
+
+    registerFonts(FONTS)
+
+    # the grids and 'Week' boxes are the same every week
+
+    if weeks > 1:
+        page.beginForm('GiveSheetSchedule')
+
+    sides = {'left': day_labels_left, 'right': day_labels_right,
+             'both': day_labels}
+    for (origin, size, side) in todoLayout(pagesize, margins, halfpage,
+            booklet, binding):
+        _makeSchedule(
+            page=page,
+            hours=hours,
+            twentyfour=twentyfour,
+            days=sides[side],
+            origin=origin,
+            size=size,
+            gridline=gridline,
+            gridcolor=gridcolor,
             )
-        frame.addFromList([topic], page)
-    page.rotate(-90)
+
+    if halfpage:
+        placeLogo(margins, pagesize, page, quadrant=1)
+    placeLogo(margins, pagesize, page, quadrant=4)
+
+    boxes = _weekBoxes(page_h, margins, halfpage, HOUR_LABEL_W)
+    for origin in boxes:
+        _makeWeekBox(page, origin, gridline, gridcolor)
+
+    if weeks == 1:
+        return saveOutput(page, filename, output)
+
+    page.endForm()
+
+    # number the weeks, the only drawing of each page
+
+    week_x = 0.5 * (KEY_H - 16) + page.stringWidth('Week:', 'LearningCurve',
+            16) + 6
+    for week in xrange(1, weeks + 1):
+        page.doForm('GiveSheetSchedule')
+        text = page.beginText()
+        text.setFont('LearningCurve', 16)
+        for (x_o, y_o) in boxes:
+            text.setTextOrigin(x_o + week_x, y_o + 0.5 * (KEY_H - 16) + 2)
+            text.textOut(str(week))
+        page.setFillColor(grey(100))
+        page.drawText(text)
+        page.showPage()
+
+    return saveOutput(page, filename, output)
+
+
+def _makeSchedule(
+    page,
+    hours,
+    twentyfour,
+    days,
+    origin,
+    size,
+    gridline,
+    gridcolor,
+    **excessParams
+    ):
+    """
+    Creates a single week of a time schedule, laid out as the grid of an
+    itemized todo list with hours in place of topics. The lines are drawn
+    as two paths, and the labels as one text object.
+
+    Keyword arguments:
+    page -- a Canvas instance on which to draw
+    hours -- list of hours in range [0,23], one per row
+    twentyfour -- time displayed as hour in range [0,23], else AM and PM used
+    days -- list of day labels; 'Notes' creates a formatted note column
+    origin -- origin of drawing area as (x, y) tuple
+    size -- size of grid as (width, height) tuple
+    gridline -- thickness of lines around cells
+    gridcolor -- color of grid lines around cells
+    """
+
+    # fonts
+
+    font_hours = 'FreeUniversal'
+    font_days = 'FreeUniversal-Bold'
+
+    # dimensions and layout
+
+    (x_o, y_o) = origin
+    (area_w, area_h) = size
+    inner_w = area_w - HOUR_LABEL_W
+    inner_h = area_h - DAYS_LABEL_SIZE
+
+    if inner_w < 0 or inner_h < 0:
+        raise ValueError('Specified dimensions do not fit on page.')
+
+    cell_w = inner_w / len(days)
+    cell_h = inner_h / len(hours)
+
+    (x_l, x_r) = (x_o + HOUR_LABEL_W, x_o + area_w)  # sides of the cells
+    (y_b, y_t) = (y_o, y_o + inner_h)  # bottom and top of the cells
+    notes = days[-1] == 'Notes'
+    x_n = (x_r - cell_w if notes else x_r)  # end of the hour lines
+
+    count('cells', len(hours) * len(days))
+
+    page.saveState()
+    page.setStrokeColor(grey(gridcolor))
+
+    with stage('grid'):
+
+        # days, hours and outer edges of the cells
+
+        page.setLineWidth(gridline)
+        path = page.beginPath()
+        path.rect(x_l, y_t, inner_w, DAYS_LABEL_SIZE)
+        for i in xrange(1, len(days)):
+            path.moveTo(x_l + i * cell_w, y_t)
+            path.lineTo(x_l + i * cell_w, y_t + DAYS_LABEL_SIZE)
+        path.rect(x_o, y_b, HOUR_LABEL_W, inner_h)
+        for i in xrange(1, len(hours)):
+            path.moveTo(x_o, y_t - i * cell_h)
+            path.lineTo(x_l, y_t - i * cell_h)
+        path.moveTo(x_l, y_b)
+        path.lineTo(x_r, y_b)
+        path.lineTo(x_r, y_t)
+        if notes:
+            path.moveTo(x_n, y_b)
+            path.lineTo(x_n, y_t)
+        page.drawPath(path, stroke=1, fill=0)
+
+        # inner grid
+
+        page.setLineWidth(0.5 * gridline)
+        path = page.beginPath()
+        for i in xrange(1, len(days) - notes):
+            path.moveTo(x_l + i * cell_w, y_b)
+            path.lineTo(x_l + i * cell_w, y_t)
+        for i in xrange(1, len(hours)):
+            path.moveTo(x_l, y_t - i * cell_h)
+            path.lineTo(x_n, y_t - i * cell_h)
+        page.drawPath(path, stroke=1, fill=0)
+
+    # format notes column
+
+    if notes:
+        ruleSection(
+            page,
+            loc=(x_n, y_b),
+            size=(cell_w, inner_h),
+            padding=2*mm,
+            spacing=0.25 * inch,
+            above=None,
+            below=None,
+            linecolor=40,
+            linewidth=0.5 * gridline,
+            boundingbox=0)
+
+    # days centered above their columns, hours at the top of their rows
+
+    with stage('labels'):
+        text = page.beginText()
+        text.setFont(font_days, 10)
+        for (i, day) in enumerate(days):
+            text.setTextOrigin(x_l + (i + 0.5) * cell_w - 0.5
+                               * page.stringWidth(day, font_days, 10), y_t
+                               + 0.5 * (DAYS_LABEL_SIZE - 7))
+            text.textOut(day)
+        text.setFont(font_hours, 8)
+        for (i, hour) in enumerate(hours):
+            label = _hourLabel(hour, twentyfour)
+            text.setTextOrigin(x_l - 3 - page.stringWidth(label, font_hours,
+                               8), y_t - i * cell_h - 9)
+            text.textOut(label)
+        page.setFillColor(grey(100))
+        page.drawText(text)
 
     # restore canvas state
 
     page.restoreState()
 
 
+def _hourLabel(hour, twentyfour):
+    """
+    Returns the label of an hour in range [0,23], such as '13:00' or '1 PM'.
+    """
+
+    if twentyfour:
+        return '%d:00' % hour
+    return '%d %s' % ((hour - 1) % 12 + 1, ('AM' if hour < 12 else 'PM'))
+
+
+def _dayLabels(includeweekend, collapseweekend):
+    """
+    Returns the labels of the day columns of a week.
+
+    Keyword arguments:
+    includeweekend -- includes column(s) for weekend, else includes weekdays only and a single notes column
+    collapseweekend -- Sat and Sun are collapsed into a single 'Weekend' column and notes column is omitted; ignored if 'includeweekend' is false
+    """
+
+    weekday_labels = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+    if includeweekend:
+        if collapseweekend:
+            return weekday_labels + ['Weekend']
+        return weekday_labels + ['Saturday', 'Sunday'] + ['Notes']
+    return weekday_labels + ['Notes']
+
+
+def _weekBoxes(page_h, margins, halfpage, indent):
+    """
+    Returns the lower left corners of the 'Week' boxes of a page, one per
+    half page.
+
+    Keyword arguments:
+    page_h -- height of page as drawn
+    margins -- size of margins around page
+    halfpage -- two half-page duplicates, else one full-page spread
+    indent -- space between the left margin and a box
+    """
+
+    key_offset = margins + KEY_SPACER_ABOVE + KEY_H
+    if halfpage:
+        return [(margins + indent, page_h - key_offset),  # top
+                (margins + indent, page_h / 2 - key_offset)]  # bottom
+    return [(margins + indent, page_h - key_offset)]
+
+
+def _makeWeekBox(page, origin, gridline, gridcolor):
+    """
+    Draws a 'Week' box with its lower left corner at origin.
+    """
+
+    (x_o, y_o) = origin
+
+    page.setStrokeColor(grey(gridcolor))
+    page.setLineWidth(gridline)
+    page.rect(x_o, y_o, KEY_W, KEY_H)
+
+    page.setFillColor(grey(100))
+    page.setFont('LearningCurve', 16)
+    week_padding = 0.5 * (KEY_H - 16)
+    page.drawString(x_o + week_padding, y_o + week_padding + 2, 'Week:')
+
+
 if __name__ == '__main__':
     itemizedTodo(
         'output.pdf',